@@ -19,7 +19,7 @@ sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..'
 from app.database import Base
 from app.models import (
     User, GCCCompany, Builder, Property, CommuteScore,
-    BuyingGroup, GroupMember, SavedProperty
+    BuyingGroup, GroupMember, SavedProperty, LocationPriceStats
 )
 
 # Load environment variables
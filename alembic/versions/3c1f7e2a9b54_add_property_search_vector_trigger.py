@@ -0,0 +1,72 @@
+"""add_property_search_vector_trigger
+
+Revision ID: 3c1f7e2a9b54
+Revises: 95fe9ffe65ee
+Create Date: 2025-12-02 09:41:03.552190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7e2a9b54'
+down_revision = '95fe9ffe65ee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build the weighted document for a property row: name and location rank
+    # highest, then builder name, amenities and finally the description.
+    # Config must match TEXT_SEARCH_CONFIG in app/api/properties.py
+    op.execute("""
+        CREATE OR REPLACE FUNCTION properties_search_vector_update() RETURNS trigger AS $$
+        DECLARE
+            builder_name text;
+        BEGIN
+            SELECT name INTO builder_name FROM builders WHERE id = NEW.builder_id;
+
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.location, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(builder_name, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(array_to_string(NEW.amenities, ' '), '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_properties_search_vector
+        BEFORE INSERT OR UPDATE OF name, location, description, amenities, builder_id
+        ON properties
+        FOR EACH ROW EXECUTE FUNCTION properties_search_vector_update();
+    """)
+
+    # Renaming a builder re-indexes its properties (touching builder_id fires the trigger above)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION builders_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE properties SET builder_id = builder_id WHERE builder_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_builders_search_vector
+        AFTER UPDATE OF name ON builders
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION builders_search_vector_update();
+    """)
+
+    # Backfill existing rows through the trigger
+    op.execute("UPDATE properties SET builder_id = builder_id")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_builders_search_vector ON builders")
+    op.execute("DROP FUNCTION IF EXISTS builders_search_vector_update()")
+    op.execute("DROP TRIGGER IF EXISTS trg_properties_search_vector ON properties")
+    op.execute("DROP FUNCTION IF EXISTS properties_search_vector_update()")
+    op.execute("UPDATE properties SET search_vector = NULL")
@@ -0,0 +1,38 @@
+"""add_property_keyset_indexes
+
+Revision ID: 95fe9ffe65ee
+Revises: 517f072731b6
+Create Date: 2025-12-01 10:12:44.318027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '95fe9ffe65ee'
+down_revision = '517f072731b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination compares (sort column, id) tuples, so sort columns must not be NULL
+    op.execute("UPDATE properties SET smart_score = 0 WHERE smart_score IS NULL")
+    op.execute("UPDATE properties SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('properties', 'smart_score', existing_type=sa.Numeric(precision=5, scale=2), nullable=False)
+    op.alter_column('properties', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+    # One (sort column, id) index per sort_by option
+    op.create_index('idx_properties_price_id', 'properties', ['price', 'id'], unique=False)
+    op.create_index('idx_properties_smart_score_id', 'properties', ['smart_score', 'id'], unique=False)
+    op.create_index('idx_properties_created_at_id', 'properties', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_properties_created_at_id', table_name='properties')
+    op.drop_index('idx_properties_smart_score_id', table_name='properties')
+    op.drop_index('idx_properties_price_id', table_name='properties')
+
+    op.alter_column('properties', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.alter_column('properties', 'smart_score', existing_type=sa.Numeric(precision=5, scale=2), nullable=True)
@@ -0,0 +1,28 @@
+"""add_properties_updated_at_default
+
+Revision ID: a1f3c8e5d729
+Revises: d9a4c7e1f352
+Create Date: 2026-10-16 22:05:12.318467
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f3c8e5d729'
+down_revision = 'd9a4c7e1f352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The model declares server_default=now() but 001 created the column
+    # without one, so ORM inserts stored NULL and were invisible to the
+    # max(updated_at) catalog version the in-memory indexes and ETags use
+    op.alter_column('properties', 'updated_at', server_default=sa.text('now()'))
+    op.execute("UPDATE properties SET updated_at = coalesce(created_at, now()) WHERE updated_at IS NULL")
+
+
+def downgrade() -> None:
+    op.alter_column('properties', 'updated_at', server_default=None)
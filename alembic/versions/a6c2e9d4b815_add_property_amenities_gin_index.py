@@ -0,0 +1,40 @@
+"""add_property_amenities_gin_index
+
+Revision ID: a6c2e9d4b815
+Revises: e8b3f5a1c290
+Create Date: 2025-12-09 10:41:52.270183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2e9d4b815'
+down_revision = 'e8b3f5a1c290'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lowercased copy for case-insensitive filters; the displayed amenities are left as entered
+    op.add_column('properties', sa.Column('amenities_lower', postgresql.ARRAY(sa.String()), nullable=True))
+
+    # Same form the model writes: trimmed, single spaces, lowercased, blanks dropped
+    op.execute(r"""
+        UPDATE properties
+        SET amenities_lower = ARRAY(
+            SELECT DISTINCT lower(btrim(regexp_replace(name, '\s+', ' ', 'g')))
+            FROM unnest(amenities) AS name
+            WHERE name ~ '\S'
+        )
+        WHERE amenities IS NOT NULL
+    """)
+
+    op.create_index('idx_properties_amenities_lower', 'properties', ['amenities_lower'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_properties_amenities_lower', table_name='properties')
+    op.drop_column('properties', 'amenities_lower')
@@ -0,0 +1,91 @@
+"""add_commute_cache_cell_key
+
+Revision ID: b3e8f1c6a472
+Revises: f7b4a2c9d053
+Create Date: 2025-12-12 11:26:48.530719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1c6a472'
+down_revision = 'f7b4a2c9d053'
+branch_labels = None
+depends_on = None
+
+# Cell encoding as of this revision (app.services.geo may change later):
+# an 18-bit-per-axis prefix of the 26-bit Z-order key
+CELL_BITS = 26
+COMMUTE_CELL_BITS = 18
+
+
+def _axis_index(value: float, low: float, span: float) -> int:
+    cells = 1 << CELL_BITS
+    index = int((value - low) / span * cells)
+    return min(max(index, 0), cells - 1)
+
+
+def commute_cell(lat: float, lng: float) -> int:
+    """Coarse Z-order key, longitude bit first in every pair"""
+    lat_index = _axis_index(float(lat), -90.0, 180.0)
+    lng_index = _axis_index(float(lng), -180.0, 360.0)
+    key = 0
+    for bit in range(CELL_BITS - 1, -1, -1):
+        key = (key << 1) | ((lng_index >> bit) & 1)
+        key = (key << 1) | ((lat_index >> bit) & 1)
+    return key >> (2 * (CELL_BITS - COMMUTE_CELL_BITS))
+
+
+def upgrade() -> None:
+    op.add_column('commute_cache', sa.Column('origin_cell', sa.BigInteger(), nullable=True))
+    op.add_column('commute_cache', sa.Column('dest_cell', sa.BigInteger(), nullable=True))
+
+    # Backfill the cells from the stored coordinates
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, origin_lat, origin_lng, dest_lat, dest_lng FROM commute_cache")).fetchall()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE commute_cache SET origin_cell = :origin_cell, dest_cell = :dest_cell WHERE id = :id"),
+            [
+                {
+                    "id": row.id,
+                    "origin_cell": commute_cell(row.origin_lat, row.origin_lng),
+                    "dest_cell": commute_cell(row.dest_lat, row.dest_lng),
+                }
+                for row in rows
+            ],
+        )
+
+    # Overlapping entries now share a key; keep the newest of each
+    op.execute("""
+        DELETE FROM commute_cache
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY origin_cell, dest_cell, travel_mode
+                    ORDER BY created_at DESC, id
+                ) AS rank
+                FROM commute_cache
+            ) ranked
+            WHERE rank > 1
+        )
+    """)
+
+    op.alter_column('commute_cache', 'origin_cell', existing_type=sa.BigInteger(), nullable=False)
+    op.alter_column('commute_cache', 'dest_cell', existing_type=sa.BigInteger(), nullable=False)
+
+    op.create_index('uq_commute_cache_cells', 'commute_cache', ['origin_cell', 'dest_cell', 'travel_mode'], unique=True)
+    op.drop_index('idx_commute_lookup', table_name='commute_cache')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'idx_commute_lookup',
+        'commute_cache',
+        ['origin_lat', 'origin_lng', 'dest_lat', 'dest_lng', 'travel_mode']
+    )
+    op.drop_index('uq_commute_cache_cells', table_name='commute_cache')
+    op.drop_column('commute_cache', 'dest_cell')
+    op.drop_column('commute_cache', 'origin_cell')
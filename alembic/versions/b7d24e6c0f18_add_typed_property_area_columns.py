@@ -0,0 +1,48 @@
+"""add_typed_property_area_columns
+
+Revision ID: b7d24e6c0f18
+Revises: 3c1f7e2a9b54
+Create Date: 2025-12-03 11:05:27.804412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d24e6c0f18'
+down_revision = '3c1f7e2a9b54'
+branch_labels = None
+depends_on = None
+
+
+# Accepts "1650", "1,650" and "1650.5"; anything else backfills as NULL
+NUMERIC_PATTERN = r"^\s*[0-9][0-9,]*(\.[0-9]+)?\s*$"
+
+# Rounded values from 2^31 up do not fit an integer column and backfill as
+# NULL, as parse_sqft_number does for new writes
+INTEGER_LIMIT = 2**31
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('carpet_area_sqft', sa.Integer(), nullable=True))
+    op.add_column('properties', sa.Column('price_per_sqft_inr', sa.Integer(), nullable=True))
+
+    # Backfill from the string columns, skipping values that are not numeric
+    for source, target in (('carpet_area', 'carpet_area_sqft'), ('price_per_sqft', 'price_per_sqft_inr')):
+        value = f"round(replace({source}, ',', '')::numeric)"
+        op.execute(
+            f"UPDATE properties "
+            f"SET {target} = CASE WHEN {value} < {INTEGER_LIMIT} THEN {value}::integer END "
+            f"WHERE {source} ~ '{NUMERIC_PATTERN}'"
+        )
+
+    op.create_index('ix_properties_carpet_area_sqft', 'properties', ['carpet_area_sqft'], unique=False)
+    op.create_index('ix_properties_price_per_sqft_inr', 'properties', ['price_per_sqft_inr'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_price_per_sqft_inr', table_name='properties')
+    op.drop_index('ix_properties_carpet_area_sqft', table_name='properties')
+    op.drop_column('properties', 'price_per_sqft_inr')
+    op.drop_column('properties', 'carpet_area_sqft')
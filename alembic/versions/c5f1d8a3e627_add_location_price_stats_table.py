@@ -0,0 +1,54 @@
+"""add_location_price_stats_table
+
+Revision ID: c5f1d8a3e627
+Revises: a6c2e9d4b815
+Create Date: 2025-12-10 09:18:04.665120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f1d8a3e627'
+down_revision = 'a6c2e9d4b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'location_price_stats',
+        sa.Column('location', sa.String(length=100), nullable=False),
+        sa.Column('configuration', sa.String(length=50), nullable=False),
+        sa.Column('property_count', sa.Integer(), nullable=False),
+        sa.Column('min_price', sa.BigInteger(), nullable=False),
+        sa.Column('median_price', sa.BigInteger(), nullable=False),
+        sa.Column('p90_price', sa.BigInteger(), nullable=False),
+        sa.Column('median_price_per_sqft', sa.Integer(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('location', 'configuration')
+    )
+
+    # Backfill from the current catalog (same statement as app.services.price_stats)
+    op.execute("""
+        INSERT INTO location_price_stats (
+            location, configuration, property_count,
+            min_price, median_price, p90_price, median_price_per_sqft, refreshed_at
+        )
+        SELECT
+            location,
+            COALESCE(configuration, ''),
+            count(*),
+            min(price),
+            round(percentile_cont(0.5) WITHIN GROUP (ORDER BY price))::bigint,
+            round(percentile_cont(0.9) WITHIN GROUP (ORDER BY price))::bigint,
+            round(percentile_cont(0.5) WITHIN GROUP (ORDER BY price_per_sqft_inr))::integer,
+            now()
+        FROM properties
+        GROUP BY GROUPING SETS ((location, configuration), (location))
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('location_price_stats')
@@ -0,0 +1,55 @@
+"""add_commute_cache_maps_backend
+
+Revision ID: c8d2e4f6a913
+Revises: a1f3c8e5d729
+Create Date: 2026-10-16 22:31:48.905214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2e4f6a913'
+down_revision = 'a1f3c8e5d729'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows were calculated with the API's hard-coded mock, so they
+    # are tagged as such and no longer served once another backend is set
+    op.add_column(
+        'commute_cache',
+        sa.Column('maps_backend', sa.String(length=10), nullable=False, server_default='mock',
+                  comment='Maps backend that calculated the commute'),
+    )
+    op.alter_column('commute_cache', 'maps_backend', server_default=None)
+
+    op.drop_index('uq_commute_cache_cells', table_name='commute_cache')
+    op.create_index(
+        'uq_commute_cache_cells',
+        'commute_cache',
+        ['origin_cell', 'dest_cell', 'travel_mode', 'maps_backend'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    # Several backends may have a row per cell pair; keep the newest of each
+    op.execute("""
+        DELETE FROM commute_cache
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY origin_cell, dest_cell, travel_mode
+                    ORDER BY created_at DESC, id
+                ) AS rank
+                FROM commute_cache
+            ) ranked
+            WHERE rank > 1
+        )
+    """)
+    op.drop_index('uq_commute_cache_cells', table_name='commute_cache')
+    op.create_index('uq_commute_cache_cells', 'commute_cache', ['origin_cell', 'dest_cell', 'travel_mode'], unique=True)
+    op.drop_column('commute_cache', 'maps_backend')
@@ -0,0 +1,56 @@
+"""add_property_geo_cell
+
+Revision ID: d41a8c93e2f7
+Revises: b7d24e6c0f18
+Create Date: 2025-12-04 15:22:10.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a8c93e2f7'
+down_revision = 'b7d24e6c0f18'
+branch_labels = None
+depends_on = None
+
+# Z-order encoding as of this revision (app.services.geo may change later)
+CELL_BITS = 26
+
+
+def _axis_index(value: float, low: float, span: float) -> int:
+    cells = 1 << CELL_BITS
+    index = int((value - low) / span * cells)
+    return min(max(index, 0), cells - 1)
+
+
+def geo_cell(lat: float, lng: float) -> int:
+    """Full-precision Z-order key, longitude bit first in every pair"""
+    lat_index = _axis_index(lat, -90.0, 180.0)
+    lng_index = _axis_index(lng, -180.0, 360.0)
+    key = 0
+    for bit in range(CELL_BITS - 1, -1, -1):
+        key = (key << 1) | ((lng_index >> bit) & 1)
+        key = (key << 1) | ((lat_index >> bit) & 1)
+    return key
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('geo_cell', sa.BigInteger(), nullable=True))
+
+    # Backfill the Z-order cell from the stored coordinates
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, latitude, longitude FROM properties")).fetchall()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE properties SET geo_cell = :cell WHERE id = :id"),
+            [{"id": row.id, "cell": geo_cell(float(row.latitude), float(row.longitude))} for row in rows],
+        )
+
+    op.create_index('ix_properties_geo_cell', 'properties', ['geo_cell'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_geo_cell', table_name='properties')
+    op.drop_column('properties', 'geo_cell')
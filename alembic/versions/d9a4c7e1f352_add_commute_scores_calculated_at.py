@@ -0,0 +1,38 @@
+"""add_commute_scores_calculated_at
+
+Revision ID: d9a4c7e1f352
+Revises: b3e8f1c6a472
+Create Date: 2025-12-15 10:42:17.204583
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4c7e1f352'
+down_revision = 'b3e8f1c6a472'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Columns the model has always declared but the initial schema never created
+    op.add_column('commute_scores', sa.Column('calculated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('commute_scores', sa.Column('osrm_response', sa.String(), nullable=True))
+
+    # Scores go with their property or office
+    op.drop_constraint('commute_scores_property_id_fkey', 'commute_scores', type_='foreignkey')
+    op.drop_constraint('commute_scores_company_id_fkey', 'commute_scores', type_='foreignkey')
+    op.create_foreign_key('commute_scores_property_id_fkey', 'commute_scores', 'properties', ['property_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('commute_scores_company_id_fkey', 'commute_scores', 'gcc_companies', ['company_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    op.drop_constraint('commute_scores_company_id_fkey', 'commute_scores', type_='foreignkey')
+    op.drop_constraint('commute_scores_property_id_fkey', 'commute_scores', type_='foreignkey')
+    op.create_foreign_key('commute_scores_property_id_fkey', 'commute_scores', 'properties', ['property_id'], ['id'])
+    op.create_foreign_key('commute_scores_company_id_fkey', 'commute_scores', 'gcc_companies', ['company_id'], ['id'])
+
+    op.drop_column('commute_scores', 'osrm_response')
+    op.drop_column('commute_scores', 'calculated_at')
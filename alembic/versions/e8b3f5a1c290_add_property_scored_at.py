@@ -0,0 +1,25 @@
+"""add_property_scored_at
+
+Revision ID: e8b3f5a1c290
+Revises: d41a8c93e2f7
+Create Date: 2025-12-05 10:41:37.502913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f5a1c290'
+down_revision = 'd41a8c93e2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL = never scored, so the first incremental run scores everything
+    op.add_column('properties', sa.Column('scored_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('properties', 'scored_at')
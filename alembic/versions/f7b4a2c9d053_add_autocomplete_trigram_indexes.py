@@ -0,0 +1,38 @@
+"""add_autocomplete_trigram_indexes
+
+Revision ID: f7b4a2c9d053
+Revises: c5f1d8a3e627
+Create Date: 2025-12-11 14:07:33.918245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b4a2c9d053'
+down_revision = 'c5f1d8a3e627'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, column): trigram indexes serving ILIKE 'x%' and '% x%' autocomplete matches
+TRIGRAM_INDEXES = [
+    ('idx_properties_name_trgm', 'properties', 'name'),
+    ('idx_properties_location_trgm', 'properties', 'location'),
+    ('idx_builders_name_trgm', 'builders', 'name'),
+]
+
+
+def upgrade() -> None:
+    # Supabase ships pg_trgm; it only needs enabling
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for index, table, column in TRIGRAM_INDEXES:
+        op.create_index(index, table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for index, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index, table_name=table)
+    # pg_trgm is left installed: other objects may depend on it
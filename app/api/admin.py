@@ -15,14 +15,102 @@ from uuid import UUID
 from datetime import datetime
 from decimal import Decimal
 
-from app.database import get_db
+from app.database import get_db, get_session_maker
 from app.models.property import Property
 from app.models.builder import Builder
+from app.models.commute_score import CommuteScore
 from app.schemas.property import PropertyResponse
+from app.services.catalog_engine import get_catalog_engine, discard_catalog_engine
+from app.services.similarity import get_similarity_index, reset_similarity_index
+from app.services.autocomplete import get_autocomplete_index, reset_autocomplete_index
+from app.services.price_stats import refresh_location_price_stats
+from app.services.cache import get_response_cache, CATALOG_ROUTES
+from app.services.commute_cache import get_commute_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+# Catalog write hooks: keep in-memory read paths, aggregates and caches in step with admin writes
+
+async def _refresh_price_stats(*locations: str):
+    """
+    Recompute location_price_stats for the touched locations
+
+    Runs in its own session: the property write is already committed, so a
+    failure here is logged rather than failing the request, and the
+    scheduled full refresh repairs it. The price_stats route is retired
+    again once the new figures are in, so nothing cached in between stays.
+    """
+    async with get_session_maker()() as session:
+        try:
+            await refresh_location_price_stats(session, locations)
+            await session.commit()
+            await get_response_cache().invalidate("price_stats")
+        except Exception as e:
+            await session.rollback()
+            print(f"⚠️  Price stats refresh failed for {', '.join(locations)}: {e}")
+
+
+def _update_indexes(action: str, update_engine, update_similarity, update_autocomplete):
+    """
+    Apply one write to each loaded in-memory index
+
+    The write is already committed, so a failing index is dropped and
+    reloaded rather than failing the request; the others still update.
+    """
+    engine = get_catalog_engine()
+    if engine is not None:
+        try:
+            update_engine(engine)
+        except Exception as e:
+            print(f"⚠️  Catalog engine {action} failed, reloading: {e}")
+            discard_catalog_engine()
+
+    index = get_similarity_index()
+    if index.size:
+        try:
+            update_similarity(index)
+        except Exception as e:
+            print(f"⚠️  Similarity index {action} failed, reloading on next use: {e}")
+            reset_similarity_index()
+
+    autocomplete = get_autocomplete_index()
+    if autocomplete is not None and autocomplete.size:
+        try:
+            update_autocomplete(autocomplete)
+        except Exception as e:
+            print(f"⚠️  Autocomplete index {action} failed, reloading on next use: {e}")
+            reset_autocomplete_index()
+
+
+async def _on_property_saved(property_obj: Property, previous_location: Optional[str] = None):
+    """Call after a property is created or updated (builder relationship loaded)"""
+    await get_response_cache().invalidate(*CATALOG_ROUTES)
+
+    _update_indexes(
+        "upsert",
+        lambda engine: engine.upsert(property_obj),
+        lambda index: index.upsert(property_obj),
+        lambda autocomplete: autocomplete.upsert(property_obj),
+    )
+
+    await _refresh_price_stats(property_obj.location, *([previous_location] if previous_location else []))
+
+
+async def _on_property_deleted(property_id: UUID, location: str):
+    """Call after a property is deleted"""
+    await get_response_cache().invalidate(*CATALOG_ROUTES)
+
+    _update_indexes(
+        "remove",
+        lambda engine: engine.remove(property_id),
+        lambda index: index.remove(property_id),
+        lambda autocomplete: autocomplete.remove(property_id),
+    )
+
+    await _refresh_price_stats(location)
+
+
 # Schemas for Admin Operations
 
 class PropertyCreateUpdate(BaseModel):
@@ -136,6 +224,8 @@ async def admin_create_property(
         # Load builder relationship
         await db.refresh(new_property, ["builder"])
 
+        await _on_property_saved(new_property)
+
         return new_property
 
     except HTTPException:
@@ -183,6 +273,12 @@ async def admin_update_property(
                     detail="Builder not found"
                 )
 
+        previous_location = property_obj.location
+        moved = (
+            property_obj.latitude != Decimal(str(property_data.latitude))
+            or property_obj.longitude != Decimal(str(property_data.longitude))
+        )
+
         # Update property fields
         property_obj.builder_id = UUID(property_data.builder_id)
         property_obj.name = property_data.name
@@ -199,12 +295,19 @@ async def admin_update_property(
         property_obj.supports_group_buying = property_data.supports_group_buying
         property_obj.group_discount_percentage = property_data.group_discount_percentage
 
+        # Commutes from the old coordinates are stale; the incremental
+        # commute_scores run recalculates the missing pairs
+        if moved:
+            await db.execute(delete(CommuteScore).where(CommuteScore.property_id == property_obj.id))
+
         await db.commit()
         await db.refresh(property_obj)
 
         # Load builder relationship
         await db.refresh(property_obj, ["builder"])
 
+        await _on_property_saved(property_obj, previous_location)
+
         return property_obj
 
     except HTTPException:
@@ -242,6 +345,8 @@ async def admin_delete_property(
         await db.delete(property_obj)
         await db.commit()
 
+        await _on_property_deleted(property_obj.id, property_obj.location)
+
         return {"message": "Property deleted successfully", "property_id": property_id}
 
     except HTTPException:
@@ -292,6 +397,17 @@ async def admin_get_stats(
         )
 
 
+@router.get("/cache/stats")
+async def admin_cache_stats():
+    """
+    Response cache hit/miss counters per route, plus commute cache tiers
+
+    Counters are per worker process; use them to tune CACHE_TTL_* and
+    COMMUTE_CACHE_* values.
+    """
+    return {**get_response_cache().stats(), "commute": get_commute_cache().stats()}
+
+
 # Builders Management (read-only for Phase 1)
 
 @router.get("/builders")
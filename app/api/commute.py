@@ -8,14 +8,23 @@ Calculate and cache commute times from work location to properties
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from decimal import Decimal
+from datetime import datetime
+from uuid import UUID
 
 from app.database import get_db
 from app.models.commute import CommuteCache
 from app.models.property import Property
+from app.models.commute_score import CommuteScore
+from app.models.gcc_company import GCCCompany
 from app.services.maps import get_maps_service
+from app.services.commute_matrix import commute_matrix
+from app.services.geo import commute_cell
+from app.services.commute_cache import get_commute_cache, commute_key, DATABASE_TIER
+from app.services.commute_scores import current_estimate
 
 router = APIRouter(prefix="/commute", tags=["Commute"])
 
@@ -41,6 +50,56 @@ class CommuteResponse(BaseModel):
     duration_in_traffic_text: Optional[str] = None
     travel_mode: str
     from_cache: bool = Field(description="Whether result was retrieved from cache")
+    cache_tier: Optional[str] = Field(None, description="Tier that served a cached result: memory, redis or database")
+
+
+class BatchCommuteItem(BaseModel):
+    """Commute to one property of a batch; error is set instead of commute when no route was found"""
+    property_id: str
+    property_name: str
+    commute: Optional[CommuteResponse] = None
+    error: Optional[str] = None
+
+
+class Coordinates(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
+
+class CommuteMatrixRequest(BaseModel):
+    """Origins x destinations to estimate"""
+    origins: List[Coordinates] = Field(..., min_length=1, max_length=1000)
+    destinations: List[Coordinates] = Field(..., min_length=1, max_length=10000)
+    mode: str = Field(default="driving", description="Travel mode: driving, transit, walking, bicycling")
+
+
+class CommuteMatrixResponse(BaseModel):
+    """Row i is origins[i], column j is destinations[j]"""
+    travel_mode: str
+    distance_meters: List[List[int]]
+    duration_seconds: List[List[int]]
+    duration_in_traffic_seconds: Optional[List[List[int]]] = None
+
+
+class OfficeCommute(BaseModel):
+    """Precomputed driving commute from one GCC office"""
+    company_id: str
+    company_name: str
+    short_name: Optional[str] = None
+    location: str
+    distance_km: float
+    normal_minutes: float
+    peak_morning_minutes: float
+    peak_evening_minutes: float
+    current_minutes: float = Field(description="Estimate for the current time of day")
+    traffic_level: str
+    calculated_at: Optional[datetime] = None
+
+
+class PropertyOfficeCommutesResponse(BaseModel):
+    """A property's commutes to every GCC office, shortest current commute first"""
+    property_id: str
+    offices: List[OfficeCommute]
 
 
 class PropertyCommuteRequest(BaseModel):
@@ -51,6 +110,83 @@ class PropertyCommuteRequest(BaseModel):
     mode: str = "driving"
 
 
+# Most origin x destination pairs one matrix request may ask for
+MAX_MATRIX_ELEMENTS = 100_000
+
+
+# Cache
+
+# Commute result values, as cached in every tier
+COMMUTE_DATA_FIELDS = [
+    "distance_meters", "distance_text", "duration_seconds", "duration_text",
+    "duration_in_traffic_seconds", "duration_in_traffic_text",
+]
+
+# Result columns replaced when a cached (origin cell, destination cell, mode, backend) is recomputed
+COMMUTE_RESULT_FIELDS = ["origin_lat", "origin_lng", "dest_lat", "dest_lng"] + COMMUTE_DATA_FIELDS + ["created_at"]
+
+
+async def _cached_commute(
+    db: AsyncSession, origin_cell: int, dest_cell: int, mode: str, backend: str,
+) -> Optional[CommuteCache]:
+    """Cached result for a cell pair: one probe of the unique (origin_cell, dest_cell, travel_mode, maps_backend) index"""
+    result = await db.execute(
+        select(CommuteCache).where(
+            CommuteCache.origin_cell == origin_cell,
+            CommuteCache.dest_cell == dest_cell,
+            CommuteCache.travel_mode == mode,
+            CommuteCache.maps_backend == backend,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+def _commute_row(
+    origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float,
+    origin_cell: int, dest_cell: int, mode: str, backend: str, commute_data: dict,
+) -> dict:
+    """commute_cache column values for one calculated commute"""
+    return {
+        "origin_lat": origin_lat,
+        "origin_lng": origin_lng,
+        "dest_lat": dest_lat,
+        "dest_lng": dest_lng,
+        "origin_cell": origin_cell,
+        "dest_cell": dest_cell,
+        "travel_mode": mode,
+        "maps_backend": backend,
+        **{name: commute_data.get(name) for name in COMMUTE_DATA_FIELDS},
+    }
+
+
+async def _store_commutes(db: AsyncSession, rows: List[dict]):
+    """
+    Insert or replace cached results in one statement (concurrent misses cannot duplicate them)
+
+    Rows must have distinct (origin_cell, dest_cell, travel_mode, maps_backend):
+    Postgres rejects an upsert that touches the same row twice.
+    """
+    statement = pg_insert(CommuteCache).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CommuteCache.origin_cell, CommuteCache.dest_cell, CommuteCache.travel_mode, CommuteCache.maps_backend],
+        set_={name: statement.excluded[name] for name in COMMUTE_RESULT_FIELDS},
+    ))
+
+
+def _commute_response(commute_data: dict, mode: str, cache_tier: Optional[str] = None) -> CommuteResponse:
+    return CommuteResponse(
+        distance_meters=commute_data['distance_meters'],
+        distance_text=commute_data['distance_text'],
+        duration_seconds=commute_data['duration_seconds'],
+        duration_text=commute_data['duration_text'],
+        duration_in_traffic_seconds=commute_data.get('duration_in_traffic_seconds'),
+        duration_in_traffic_text=commute_data.get('duration_in_traffic_text'),
+        travel_mode=mode,
+        from_cache=cache_tier is not None,
+        cache_tier=cache_tier,
+    )
+
+
 # API Endpoints
 
 @router.post("/calculate", response_model=CommuteResponse)
@@ -63,37 +199,31 @@ async def calculate_commute(
 
     Phase 2: Commute Calculator
     Uses mock data by default to avoid API costs during development
+
+    cache_tier says where a cached result came from (memory, redis or
+    database); it is null for a freshly calculated commute.
     """
     try:
-        # Check cache first
-        tolerance = 0.001  # ~111 meters tolerance
-        cache_query = select(CommuteCache).where(
-            CommuteCache.origin_lat.between(request.origin_lat - tolerance, request.origin_lat + tolerance),
-            CommuteCache.origin_lng.between(request.origin_lng - tolerance, request.origin_lng + tolerance),
-            CommuteCache.dest_lat.between(request.dest_lat - tolerance, request.dest_lat + tolerance),
-            CommuteCache.dest_lng.between(request.dest_lng - tolerance, request.dest_lng + tolerance),
-            CommuteCache.travel_mode == request.mode
-        )
+        # Check cache first (points within ~100 m share a cell):
+        # worker memory, then Redis, then the commute_cache table
+        maps_service = get_maps_service(use_mock=True)  # Use mock for now
+        origin_cell = commute_cell(request.origin_lat, request.origin_lng)
+        dest_cell = commute_cell(request.dest_lat, request.dest_lng)
+        key = commute_key(origin_cell, dest_cell, request.mode, maps_service.backend)
+        tiers = get_commute_cache()
 
-        result = await db.execute(cache_query)
-        cached = result.scalar_one_or_none()
+        commute_data, tier = await tiers.get(key)
+        if commute_data is not None:
+            return _commute_response(commute_data, request.mode, tier)
 
+        cached = await _cached_commute(db, origin_cell, dest_cell, request.mode, maps_service.backend)
         if cached:
-            # Return cached result
-            return CommuteResponse(
-                distance_meters=cached.distance_meters,
-                distance_text=cached.distance_text,
-                duration_seconds=cached.duration_seconds,
-                duration_text=cached.duration_text,
-                duration_in_traffic_seconds=cached.duration_in_traffic_seconds,
-                duration_in_traffic_text=cached.duration_in_traffic_text,
-                travel_mode=cached.travel_mode,
-                from_cache=True
-            )
+            commute_data = {name: getattr(cached, name) for name in COMMUTE_DATA_FIELDS}
+            await tiers.set(key, commute_data)
+            return _commute_response(commute_data, request.mode, DATABASE_TIER)
 
         # Calculate new commute
-        maps_service = get_maps_service(use_mock=True)  # Use mock for now
-        commute_data = maps_service.calculate_commute(
+        commute_data = await maps_service.calculate_commute(
             origin_lat=request.origin_lat,
             origin_lng=request.origin_lng,
             dest_lat=request.dest_lat,
@@ -101,38 +231,56 @@ async def calculate_commute(
             mode=request.mode
         )
 
-        # Cache the result
-        cache_entry = CommuteCache(
-            origin_lat=request.origin_lat,
-            origin_lng=request.origin_lng,
-            dest_lat=request.dest_lat,
-            dest_lng=request.dest_lng,
-            travel_mode=request.mode,
-            distance_meters=commute_data['distance_meters'],
-            distance_text=commute_data['distance_text'],
-            duration_seconds=commute_data['duration_seconds'],
-            duration_text=commute_data['duration_text'],
-            duration_in_traffic_seconds=commute_data.get('duration_in_traffic_seconds'),
-            duration_in_traffic_text=commute_data.get('duration_in_traffic_text'),
+        # Cache the result in the table, then the faster tiers
+        await _store_commutes(db, [_commute_row(
+            request.origin_lat, request.origin_lng, request.dest_lat, request.dest_lng,
+            origin_cell, dest_cell, request.mode, maps_service.backend, commute_data,
+        )])
+        await db.commit()
+        await tiers.set(key, {name: commute_data.get(name) for name in COMMUTE_DATA_FIELDS})
+
+        return _commute_response(commute_data, request.mode)
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Commute calculation failed: {str(e)}")
+
+
+@router.post("/matrix", response_model=CommuteMatrixResponse)
+async def calculate_commute_matrix(request: CommuteMatrixRequest):
+    """
+    Estimate commutes for every origin x destination pair
+
+    Straight-line estimates (the mock's per-mode speeds and traffic
+    factor), computed in one vectorised pass; nothing is cached or sent to
+    Google. Meant for ranking many properties against many offices, e.g.
+    origins = GCC offices, destinations = properties.
+    """
+    if len(request.origins) * len(request.destinations) > MAX_MATRIX_ELEMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_MATRIX_ELEMENTS} origin x destination pairs per request",
         )
 
-        db.add(cache_entry)
-        await db.commit()
+    try:
+        matrix = commute_matrix(
+            [point.lat for point in request.origins],
+            [point.lng for point in request.origins],
+            [point.lat for point in request.destinations],
+            [point.lng for point in request.destinations],
+            request.mode,
+        )
+        in_traffic = matrix.duration_in_traffic_seconds
 
-        return CommuteResponse(
-            distance_meters=commute_data['distance_meters'],
-            distance_text=commute_data['distance_text'],
-            duration_seconds=commute_data['duration_seconds'],
-            duration_text=commute_data['duration_text'],
-            duration_in_traffic_seconds=commute_data.get('duration_in_traffic_seconds'),
-            duration_in_traffic_text=commute_data.get('duration_in_traffic_text'),
+        return CommuteMatrixResponse(
             travel_mode=request.mode,
-            from_cache=False
+            distance_meters=matrix.distance_meters.tolist(),
+            duration_seconds=matrix.duration_seconds.tolist(),
+            duration_in_traffic_seconds=in_traffic.tolist() if in_traffic is not None else None,
         )
 
     except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=f"Commute calculation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Commute matrix calculation failed: {str(e)}")
 
 
 @router.post("/property", response_model=CommuteResponse)
@@ -148,7 +296,6 @@ async def calculate_property_commute(
     """
     try:
         # Get property
-        from uuid import UUID
         property_query = select(Property).where(Property.id == UUID(request.property_id))
         result = await db.execute(property_query)
         property_obj = result.scalar_one_or_none()
@@ -173,7 +320,64 @@ async def calculate_property_commute(
         raise HTTPException(status_code=500, detail=f"Failed to calculate property commute: {str(e)}")
 
 
-@router.get("/batch")
+@router.get("/property/{property_id}/offices", response_model=PropertyOfficeCommutesResponse)
+async def get_property_office_commutes(
+    property_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Commutes from every GCC office to a property
+
+    Read from commute_scores (filled by scripts/compute_commute_scores.py)
+    in one query on its (property_id, company_id) index; current_minutes and
+    traffic_level are for the time of the request. Offices without a score
+    yet are left out.
+    """
+    try:
+        result = await db.execute(
+            select(Property.id, CommuteScore, GCCCompany.name, GCCCompany.short_name, GCCCompany.location)
+            .select_from(Property)
+            .outerjoin(CommuteScore, CommuteScore.property_id == Property.id)
+            .outerjoin(GCCCompany, GCCCompany.id == CommuteScore.company_id)
+            .where(Property.id == property_id)
+        )
+        rows = result.all()
+
+        if not rows:
+            raise HTTPException(status_code=404, detail="Property not found")
+
+        offices = []
+        for _, score, company_name, short_name, location in rows:
+            if score is None:
+                continue
+            normal = float(score.normal_minutes)
+            peak_morning = float(score.peak_morning_minutes)
+            peak_evening = float(score.peak_evening_minutes)
+            current, traffic_level = current_estimate(normal, peak_morning, peak_evening)
+            offices.append(OfficeCommute(
+                company_id=str(score.company_id),
+                company_name=company_name,
+                short_name=short_name,
+                location=location,
+                distance_km=float(score.distance_km),
+                normal_minutes=normal,
+                peak_morning_minutes=peak_morning,
+                peak_evening_minutes=peak_evening,
+                current_minutes=current,
+                traffic_level=traffic_level,
+                calculated_at=score.calculated_at,
+            ))
+        offices.sort(key=lambda office: office.current_minutes)
+
+        return PropertyOfficeCommutesResponse(property_id=str(property_id), offices=offices)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch office commutes: {str(e)}")
+
+
+@router.get("/batch", response_model=List[BatchCommuteItem])
 async def calculate_batch_commutes(
     origin_lat: float = Query(..., description="Work location latitude"),
     origin_lng: float = Query(..., description="Work location longitude"),
@@ -186,45 +390,104 @@ async def calculate_batch_commutes(
 
     Phase 2: Commute Calculator
     Useful for showing commute times on property list pages
+
+    Resolved in bulk: one lookup per cache tier for every destination, one
+    Distance Matrix request per 25 misses, then one insert and one commit.
+    Results follow the order of property_ids (unknown IDs are left out); a
+    property with no route gets an error instead of a commute.
     """
     try:
-        from uuid import UUID
-
         # Parse property IDs
-        ids = [UUID(pid.strip()) for pid in property_ids.split(',')]
-
-        # Get properties
-        properties_query = select(Property).where(Property.id.in_(ids))
-        result = await db.execute(properties_query)
-        properties = result.scalars().all()
+        try:
+            ids = list(dict.fromkeys(UUID(pid.strip()) for pid in property_ids.split(',') if pid.strip()))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="property_ids must be comma-separated UUIDs")
+
+        # Get properties (coordinates only)
+        result = await db.execute(
+            select(Property.id, Property.name, Property.latitude, Property.longitude).where(Property.id.in_(ids))
+        )
+        properties = {row.id: row for row in result.all()}
+        properties = [properties[pid] for pid in ids if pid in properties]
 
         if not properties:
             return []
 
-        # Calculate commutes
+        # Properties within ~100 m of each other share a destination cell
+        maps_service = get_maps_service(use_mock=True)  # Use mock for now
+        origin_cell = commute_cell(origin_lat, origin_lng)
+        dest_cells = {prop.id: commute_cell(float(prop.latitude), float(prop.longitude)) for prop in properties}
+        keys = {cell: commute_key(origin_cell, cell, mode, maps_service.backend) for cell in dest_cells.values()}
+
+        # Worker memory and Redis first, then the commute_cache table
+        tiers = get_commute_cache()
+        found = await tiers.get_many(list(keys.values()))
+        commutes = {cell: found[key] for cell, key in keys.items() if key in found}
+
+        missing = [cell for cell in keys if cell not in commutes]
+        if missing:
+            result = await db.execute(
+                select(CommuteCache).where(
+                    CommuteCache.origin_cell == origin_cell,
+                    CommuteCache.dest_cell.in_(missing),
+                    CommuteCache.travel_mode == mode,
+                    CommuteCache.maps_backend == maps_service.backend,
+                )
+            )
+            cached = {
+                row.dest_cell: {name: getattr(row, name) for name in COMMUTE_DATA_FIELDS}
+                for row in result.scalars().all()
+            }
+            for cell, commute_data in cached.items():
+                commutes[cell] = (commute_data, DATABASE_TIER)
+            await tiers.set_many({keys[cell]: commute_data for cell, commute_data in cached.items()})
+
+        # Calculate the rest: one destination per cell, 25 per Distance Matrix request
+        errors = {}
+        missing = [cell for cell in keys if cell not in commutes]
+        if missing:
+            destinations = {}
+            for prop in properties:
+                destinations.setdefault(dest_cells[prop.id], (float(prop.latitude), float(prop.longitude)))
+
+            calculated = await maps_service.calculate_commutes(
+                origin_lat=origin_lat,
+                origin_lng=origin_lng,
+                destinations=[destinations[cell] for cell in missing],
+                mode=mode,
+            )
+
+            rows, fresh = [], {}
+            for cell, commute_data in zip(missing, calculated):
+                if isinstance(commute_data, str):
+                    errors[cell] = commute_data
+                    continue
+                dest_lat, dest_lng = destinations[cell]
+                rows.append(_commute_row(origin_lat, origin_lng, dest_lat, dest_lng, origin_cell, cell, mode, maps_service.backend, commute_data))
+                fresh[keys[cell]] = {name: commute_data.get(name) for name in COMMUTE_DATA_FIELDS}
+                commutes[cell] = (commute_data, None)
+
+            # Cache the results in the table, then the faster tiers
+            if rows:
+                await _store_commutes(db, rows)
+                await db.commit()
+                await tiers.set_many(fresh)
+
         results = []
         for prop in properties:
-            try:
-                commute_request = CommuteRequest(
-                    origin_lat=origin_lat,
-                    origin_lng=origin_lng,
-                    dest_lat=float(prop.latitude),
-                    dest_lng=float(prop.longitude),
-                    mode=mode
-                )
-                commute = await calculate_commute(commute_request, db)
-
-                results.append({
-                    "property_id": str(prop.id),
-                    "property_name": prop.name,
-                    "commute": commute
-                })
-            except Exception as e:
-                # Skip failed calculations
-                print(f"Failed to calculate commute for {prop.name}: {e}")
-                continue
+            cell = dest_cells[prop.id]
+            item = BatchCommuteItem(property_id=str(prop.id), property_name=prop.name)
+            if cell in commutes:
+                commute_data, tier = commutes[cell]
+                item.commute = _commute_response(commute_data, mode, tier)
+            else:
+                item.error = errors[cell]
+            results.append(item)
 
         return results
 
+    except HTTPException:
+        raise
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Batch calculation failed: {str(e)}")
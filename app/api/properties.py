@@ -3,43 +3,500 @@ Property API endpoints
 Days 8-9: Property Search (P1-F05, P1-F06)
 
 Endpoints:
-- GET /properties - Search and filter properties with pagination
+- GET /properties - Search and filter properties with pagination (page or cursor)
+- GET /properties/facets - Facet counts for the filter sidebar
+- GET /properties/export - Stream the filtered catalog as NDJSON or CSV
+- POST /properties/batch - Many properties by ID in one call
 - GET /properties/{id} - Get single property detail (Day 10-11)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi import status as http_status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, func, or_, and_, tuple_, cast, BigInteger, Float, String
+from sqlalchemy.dialects.postgresql import array, ARRAY
 from sqlalchemy.orm import joinedload
-from typing import Optional
+from typing import Optional, List, Tuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+from functools import lru_cache
+from pydantic import TypeAdapter
+import base64
+import binascii
+import csv
+import io
+import json
 import math
 
-from app.database import get_db
+from app.database import get_db, get_session_maker
+from app.core.conditional import make_etag, is_not_modified, set_validators, not_modified
 from app.schemas.property import (
     PropertyResponse,
     PropertyListResponse,
     PropertySearchParams,
+    PropertyFilters,
+    PropertyFacetsResponse,
+    FacetCount,
+    PriceBucketCount,
+    PropertyBatchRequest,
+    AutocompleteSuggestion,
+    AutocompleteResponse,
+    LocationPriceStatsItem,
+    LocationPriceStatsResponse,
+    SimilarPropertiesResponse,
+    PropertyBatchResponse,
+    PROPERTY_CARD_FIELDS,
+    property_fields_models,
 )
-from app.models.property import Property
+from app.models.property import Property, amenity_keys
 from app.models.builder import Builder
+from app.models.location_price_stats import LocationPriceStats, ALL_CONFIGURATIONS
+from app.services.catalog_engine import get_catalog_engine, BUILDER_FIELDS
+from app.services.cache import get_response_cache, cache_key
+from app.services.autocomplete import get_autocomplete_index, normalise_text, KIND_ORDER, MAX_SUGGESTIONS
+from app.services.similarity import get_similarity_index, SIMILAR_TOP_K
+from app.services.geo import EARTH_RADIUS_KM, cover_ranges, radius_box
 
 router = APIRouter(prefix="/properties", tags=["properties"])
 
 
-@router.get("", response_model=PropertyListResponse)
-async def search_properties(
+# Sortable columns and how their cursor values round-trip through JSON
+SORT_COLUMNS = {
+    "price": (Property.price, int),
+    "smart_score": (Property.smart_score, Decimal),
+    "created_at": (Property.created_at, datetime.fromisoformat),
+}
+
+# Lower bounds (INR) of the facet price buckets after the first; bucket i
+# holds prices with i thresholds at or below them
+PRICE_BUCKET_THRESHOLDS = [20_000_000, 50_000_000, 75_000_000, 100_000_000, 150_000_000]
+
+# Text search ranking; only valid together with q
+RELEVANCE_SORT = "relevance"
+
+# Distance from (near_lat, near_lng); only valid together with them
+DISTANCE_SORT = "distance"
+
+# Every PropertyResponse field: what a search without fields= returns
+PROPERTY_FIELDS = tuple(PropertyResponse.model_fields)
+
+# Text search configuration, must match the search_vector trigger
+TEXT_SEARCH_CONFIG = "english"
+
+
+def _text_query(q: str):
+    """Parse free text (quotes, OR, -negation) into a tsquery"""
+    return func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, q)
+
+
+def _encode_cursor(sort_by: str, sort_order: str, value, property_id: UUID) -> str:
+    """Encode the (sort value, id) of the last row on a page as an opaque cursor"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+
+    payload = json.dumps(
+        {"s": sort_by, "o": sort_order, "v": value, "id": str(property_id)},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """Decode a cursor back into (sort value, id), validating it matches the current sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor was issued for a different sort")
+
+        value_type = float if sort_by in (RELEVANCE_SORT, DISTANCE_SORT) else SORT_COLUMNS[sort_by][1]
+        return value_type(payload["v"]), UUID(payload["id"])
+
+    except (ValueError, KeyError, TypeError, InvalidOperation, binascii.Error) as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}"
+        )
+
+
+def _keyset_filter(sort_column, descending: bool, last_value, last_id: UUID):
+    """Seek predicate for rows after (last_value, last_id), served by the (sort column, id) indexes
+
+    sort_column may also be the ts_rank or distance expression, which seeks
+    over the (already filtered) matches without an index.
+    """
+    if descending:
+        return tuple_(sort_column, Property.id) < tuple_(last_value, last_id)
+    return tuple_(sort_column, Property.id) > tuple_(last_value, last_id)
+
+
+def property_filters(
+    q: Optional[str] = Query(None, description="Full-text search over name, location, description, builder and amenities"),
     location: Optional[str] = Query(None, description="Filter by location"),
     min_price: Optional[int] = Query(None, ge=0, description="Minimum price in INR"),
     max_price: Optional[int] = Query(None, ge=0, description="Maximum price in INR"),
     configuration: Optional[str] = Query(None, description="Filter by configuration (e.g., '3BHK')"),
     min_carpet_area: Optional[int] = Query(None, ge=0, description="Minimum carpet area"),
     max_carpet_area: Optional[int] = Query(None, ge=0, description="Maximum carpet area"),
+    min_price_per_sqft: Optional[int] = Query(None, ge=0, description="Minimum price per sqft in INR"),
+    max_price_per_sqft: Optional[int] = Query(None, ge=0, description="Maximum price per sqft in INR"),
     group_buying_only: bool = Query(False, description="Show only group buying properties"),
-    sort_by: str = Query("price", description="Sort field: price, smart_score, created_at"),
-    sort_order: str = Query("asc", description="Sort order: asc or desc"),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the search centre"),
+    near_lng: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the search centre"),
+    radius_km: Optional[float] = Query(None, gt=0, le=100, description="Only properties within this distance of near_lat/near_lng"),
+    bbox: Optional[str] = Query(None, description="Map viewport as west,south,east,north (lng/lat degrees)"),
+    amenities: Optional[str] = Query(None, description="Comma-separated amenities (e.g., 'Swimming Pool,Gym')"),
+    amenities_match: str = Query("all", pattern="^(all|any)$", description="all: every listed amenity; any: at least one"),
+) -> PropertyFilters:
+    """Dependency collecting the filter query parameters shared by catalog endpoints"""
+    if (near_lat is None) != (near_lng is None):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="near_lat and near_lng must be given together"
+        )
+
+    if radius_km is not None and near_lat is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="radius_km requires near_lat and near_lng"
+        )
+
+    return PropertyFilters(
+        q=q,
+        location=location,
+        min_price=min_price,
+        max_price=max_price,
+        configuration=configuration,
+        min_carpet_area=min_carpet_area,
+        max_carpet_area=max_carpet_area,
+        min_price_per_sqft=min_price_per_sqft,
+        max_price_per_sqft=max_price_per_sqft,
+        group_buying_only=group_buying_only,
+        near_lat=near_lat,
+        near_lng=near_lng,
+        radius_km=radius_km,
+        bbox=_parse_bbox(bbox) if bbox else None,
+        amenities=(amenity_keys(amenities.split(",")) or None) if amenities else None,
+        amenities_match=amenities_match,
+    )
+
+
+def _parse_bbox(bbox: str) -> list:
+    """Parse "west,south,east,north" into floats"""
+    try:
+        west, south, east, north = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be four numbers: west,south,east,north"
+        )
+
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="bbox must satisfy west <= east and south <= north within lng/lat bounds"
+        )
+
+    return [west, south, east, north]
+
+
+def _distance_km(lat: float, lng: float):
+    """Haversine distance (km) from a point to each property"""
+    latitude, longitude = cast(Property.latitude, Float), cast(Property.longitude, Float)
+    dlat = func.radians(latitude - lat, type_=Float)
+    dlng = func.radians(longitude - lng, type_=Float)
+    a = (
+        func.power(func.sin(dlat * 0.5), 2)
+        + func.cos(func.radians(lat)) * func.cos(func.radians(latitude)) * func.power(func.sin(dlng * 0.5), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def _region_clauses(south: float, west: float, north: float, east: float) -> list:
+    """
+    Restrict to a lat/lng box
+
+    The geo_cell ranges are index range scans (BitmapOr over the B-tree); the
+    coordinate comparisons then trim the cells' overhang exactly.
+    """
+    cells = or_(*[
+        and_(Property.geo_cell >= start, Property.geo_cell < end)
+        for start, end in cover_ranges(south, west, north, east)
+    ])
+    return [
+        cells,
+        Property.latitude.between(south, north),
+        Property.longitude.between(west, east),
+    ]
+
+
+def _build_filters(filters: PropertyFilters) -> list:
+    """Build the WHERE clauses shared by the page query and the count query"""
+    clauses = []
+
+    if filters.q:
+        # Served by the GIN index on search_vector
+        clauses.append(Property.search_vector.op("@@")(_text_query(filters.q)))
+
+    if filters.location:
+        clauses.append(Property.location.ilike(f"%{filters.location}%"))
+
+    if filters.min_price is not None:
+        clauses.append(Property.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        clauses.append(Property.price <= filters.max_price)
+
+    if filters.configuration:
+        clauses.append(Property.configuration.ilike(f"%{filters.configuration}%"))
+
+    if filters.min_carpet_area is not None:
+        clauses.append(Property.carpet_area_sqft >= filters.min_carpet_area)
+
+    if filters.max_carpet_area is not None:
+        clauses.append(Property.carpet_area_sqft <= filters.max_carpet_area)
+
+    if filters.min_price_per_sqft is not None:
+        clauses.append(Property.price_per_sqft_inr >= filters.min_price_per_sqft)
+
+    if filters.max_price_per_sqft is not None:
+        clauses.append(Property.price_per_sqft_inr <= filters.max_price_per_sqft)
+
+    if filters.group_buying_only:
+        clauses.append(Property.supports_group_buying == "true")
+
+    if filters.amenities:
+        # Served by the GIN index on the lowercased copy (kept in step by the model)
+        operator = "@>" if filters.amenities_match == "all" else "&&"
+        clauses.append(Property.amenities_lower.op(operator)(cast(array(filters.amenities), ARRAY(String))))
+
+    if filters.bbox:
+        west, south, east, north = filters.bbox
+        clauses.extend(_region_clauses(south, west, north, east))
+
+    if filters.radius_km is not None:
+        clauses.extend(_region_clauses(*radius_box(filters.near_lat, filters.near_lng, filters.radius_km)))
+        clauses.append(_distance_km(filters.near_lat, filters.near_lng) <= filters.radius_km)
+
+    return clauses
+
+
+def _count_query(clauses: list):
+    """COUNT(*) over properties matching the given filter clauses"""
+    count_query = select(func.count()).select_from(Property)
+    if clauses:
+        count_query = count_query.where(and_(*clauses))
+    return count_query
+
+
+def _normalise_filters(filters: PropertyFilters) -> dict:
+    """
+    Canonical form of a filter set for cache keys
+
+    Text filters are case-insensitive (ILIKE / tsquery), so case and
+    surrounding whitespace do not change the result.
+    """
+    params = filters.model_dump()
+    for name in ("q", "location", "configuration"):
+        if params[name] is not None:
+            params[name] = " ".join(params[name].lower().split()) if name == "q" else params[name].lower()
+    if params["amenities"] is not None:
+        params["amenities"] = sorted(params["amenities"])
+    return params
+
+
+def _parse_fields(fields: str) -> tuple:
+    """
+    Validate a fields= list into PropertyResponse field names
+
+    "card" expands to PROPERTY_CARD_FIELDS. id is always included (cursors
+    need it) and fields keep PropertyResponse order, so equivalent lists
+    share a cache entry.
+    """
+    requested = {"id"}
+    for name in (part.strip() for part in fields.split(",")):
+        if name == "card":
+            requested.update(PROPERTY_CARD_FIELDS)
+        elif name in PropertyResponse.model_fields:
+            requested.add(name)
+        elif name:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid field: {name}. Use card or any of: {', '.join(PropertyResponse.model_fields)}"
+            )
+
+    return tuple(name for name in PropertyResponse.model_fields if name in requested)
+
+
+def _fields_query(fields: tuple, sort_column=None):
+    """Core select of the requested response columns (builder via an outer join)"""
+    columns = [getattr(Property, name) for name in fields if name != "builder"]
+    query = select(*columns)
+    if sort_column is not None:
+        query = query.add_columns(sort_column.label("sort_value"))
+
+    if "builder" in fields:
+        query = query.add_columns(
+            *[getattr(Builder, name).label(f"builder__{name}") for name in BUILDER_FIELDS]
+        ).outerjoin(Builder, Property.builder_id == Builder.id)
+
+    return query
+
+
+def _fields_record(row, fields: tuple) -> dict:
+    """Response dict for one row of _fields_query"""
+    mapping = row._mapping
+    record = {name: mapping[name] for name in fields if name != "builder"}
+
+    if "builder" in fields:
+        builder = {name: mapping[f"builder__{name}"] for name in BUILDER_FIELDS}
+        record["builder"] = builder if builder["id"] is not None else None
+
+    return record
+
+
+async def _search_database(
+    db: AsyncSession,
+    filters: PropertyFilters,
+    sort_column,
+    descending: bool,
+    page: int,
+    limit: int,
+    keyset,
+    include_total: bool,
+    fields: tuple = PROPERTY_FIELDS,
+):
+    """
+    Run the search in Postgres
+
+    Returns (properties, total, next_key) where next_key is the
+    (sort value, id) of the last row when another page exists.
+
+    Only the requested response fields are selected, and properties are
+    plain response dicts built from Core rows (no ORM entities, identity
+    map or from_attributes validation).
+    """
+    # Select the response columns with the builder joined in; the sort value
+    # is selected alongside so cursors can be built for computed sorts
+    query = _fields_query(fields, sort_column)
+
+    # Apply filters
+    clauses = _build_filters(filters)
+    if clauses:
+        query = query.where(and_(*clauses))
+
+    # Total count rides along in the page query: a window count over the
+    # filtered rows in page mode, or an uncorrelated count subquery in
+    # cursor mode (where the seek predicate would shrink a window count)
+    if include_total:
+        if keyset:
+            total_column = _count_query(clauses).correlate(None).scalar_subquery()
+        else:
+            total_column = func.count().over()
+        query = query.add_columns(total_column.label("total"))
+
+    # Apply sorting (id breaks ties so page and cursor order are stable)
+    if descending:
+        query = query.order_by(sort_column.desc(), Property.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Property.id.asc())
+
+    # Apply pagination: seek past the cursor, or fall back to OFFSET.
+    # One extra row is fetched to know whether a next page exists.
+    if keyset:
+        query = query.where(_keyset_filter(sort_column, descending, *keyset))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    query = query.limit(limit + 1)
+
+    # Execute query
+    result = await db.execute(query)
+    rows = result.all()
+    properties = [_fields_record(row, fields) for row in rows[:limit]]
+
+    next_key = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_key = (last.sort_value, last.id)
+
+    total = None
+    if include_total:
+        if rows:
+            total = rows[0].total
+        elif keyset or page > 1:
+            # Past the last row there is nothing to carry the count
+            result = await db.execute(_count_query(clauses))
+            total = result.scalar() or 0
+        else:
+            total = 0
+
+    return properties, total, next_key
+
+
+async def _catalog_version(db: AsyncSession):
+    """
+    (max updated_at, row count) of the catalog
+
+    Any insert or update moves the max and any delete moves the count, so
+    the pair versions every list response. It is cached like a response and
+    retired by the same admin-write invalidation, so conditional requests
+    normally answer without a database round trip.
+    """
+    cache = get_response_cache()
+    cached, generation = await cache.get("catalog_version", "current")
+    if cached is not None:
+        updated_at = datetime.fromisoformat(cached["updated_at"]) if cached["updated_at"] else None
+        return updated_at, cached["count"]
+
+    result = await db.execute(select(func.max(Property.updated_at), func.count(Property.id)))
+    updated_at, count = result.one()
+    await cache.set("catalog_version", "current", {
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "count": count,
+    }, generation)
+    return updated_at, count
+
+
+def _detail_validators(property_id: str, updated_at: Optional[datetime]):
+    """(ETag, Last-Modified) for one property"""
+    return make_etag(property_id, updated_at.timestamp() if updated_at else None), updated_at
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(response_model) -> TypeAdapter:
+    """Prebuilt validator/serialiser for a list response model"""
+    return TypeAdapter(response_model)
+
+
+def _encode_list_response(response_model, content: dict) -> bytes:
+    """
+    JSON body for a list response, straight from response dicts
+
+    Validates plain dicts (no from_attributes) and serialises in
+    pydantic-core, skipping FastAPI's response_model re-validation and
+    jsonable_encoder pass. The bytes are identical to what FastAPI renders
+    for the same model (compact separators, UTF-8, Decimal as string).
+    """
+    adapter = _list_adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(content))
+
+
+@router.get("", response_model=PropertyListResponse)
+async def search_properties(
+    request: Request,
+    filters: PropertyFilters = Depends(property_filters),
+    sort_by: Optional[str] = Query(None, description="Sort field: price, smart_score, created_at, relevance (with q), distance (with near_lat/near_lng); defaults to relevance with q, else price"),
+    sort_order: str = Query("asc", description="Sort order: asc or desc (relevance is always best match first)"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Include total and total_pages (set false to skip counting)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, or card for the listing card set (id always included)"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -48,111 +505,660 @@ async def search_properties(
     P1-F05: Property Search API
 
     Filters:
+    - q: Full-text search (web search syntax: "quoted phrase", or, -exclude)
+      over name, location, builder name, amenities and description
     - location: Exact match on location name
     - min_price/max_price: Price range filter
     - configuration: Exact match on configuration (2BHK, 3BHK, 4BHK)
-    - min_carpet_area/max_carpet_area: Carpet area range
+    - min_carpet_area/max_carpet_area: Carpet area range (sqft)
+    - min_price_per_sqft/max_price_per_sqft: Price per sqft range
     - group_buying_only: Only show properties with group buying support
+    - near_lat/near_lng + radius_km: Within a distance of a point
+    - bbox: Inside a map viewport (west,south,east,north)
 
     Sorting:
-    - price: Sort by price (default)
+    - price: Sort by price (default without q)
     - smart_score: Sort by smart score
     - created_at: Sort by creation date
+    - relevance: Sort by ts_rank of the q match, best first (requires q;
+      default with q)
+    - distance: Nearest first from near_lat/near_lng
 
     Pagination:
     - page: Page number (default 1)
     - limit: Items per page (default 20, max 100)
+    - cursor: Seek past the last row of the previous page instead of using
+      OFFSET. Every response carries next_cursor while more rows remain, so
+      infinite-scroll clients can start from page 1 and follow it; deep pages
+      cost the same as the first and do not shift when rows are inserted.
+    - include_total: The total is computed in the same statement as the page;
+      pass false to skip counting entirely (total/total_pages are null)
+
+    Sparse fieldsets:
+    - fields: Return only these PropertyResponse fields, e.g. fields=card
+      (what a listing card shows) or fields=id,name,price,images. Only the
+      requested columns are read from Postgres.
+
+    Conditional requests:
+    - Responses carry an ETag (request signature + catalog version) and
+      Last-Modified (latest property update). Send them back as
+      If-None-Match / If-Modified-Since to get an empty 304 while nothing
+      in the catalog has changed.
     """
+    if sort_by is None:
+        sort_by = RELEVANCE_SORT if filters.q else "price"
+    sort_order = sort_order.lower()
+    if sort_by == RELEVANCE_SORT:
+        # Best match first regardless of sort_order, and normalised before
+        # the cursor and cache key are built so both agree on it
+        sort_order = "desc"
+        if not filters.q:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="sort_by=relevance requires q"
+            )
+        sort_column = func.ts_rank(Property.search_vector, _text_query(filters.q))
+    elif sort_by == DISTANCE_SORT:
+        if filters.near_lat is None:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="sort_by=distance requires near_lat and near_lng"
+            )
+        sort_column = _distance_km(filters.near_lat, filters.near_lng)
+    elif sort_by in SORT_COLUMNS:
+        sort_column = SORT_COLUMNS[sort_by][0]
+    else:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort_by: {sort_by}. Use one of: {', '.join(SORT_COLUMNS)}, {RELEVANCE_SORT}, {DISTANCE_SORT}"
+        )
+
+    descending = sort_order == "desc"
+    keyset = _decode_cursor(cursor, sort_by, sort_order) if cursor else None
+    field_names = _parse_fields(fields) if fields else PROPERTY_FIELDS
+
+    cache = get_response_cache()
+    key = cache_key({
+        **_normalise_filters(filters),
+        "sort_by": sort_by,
+        "sort_order": sort_order,
+        "page": page,
+        "limit": limit,
+        "cursor": cursor,
+        "include_total": include_total,
+        "fields": ",".join(field_names) if fields else None,
+    })
+
     try:
-        # Build base query with builder join
-        query = select(Property).options(joinedload(Property.builder))
+        catalog_updated_at, catalog_count = await _catalog_version(db)
+        etag = make_etag(key, catalog_updated_at.timestamp() if catalog_updated_at else None, catalog_count)
+        if is_not_modified(request, etag, catalog_updated_at, collection=True):
+            return not_modified(etag, catalog_updated_at)
 
-        # Apply filters
-        filters = []
+        # The cache holds the encoded body, so a hit is returned as is
+        cached, generation = await cache.get("property_search", key)
+        if isinstance(cached, str):
+            response = Response(content=cached, media_type="application/json")
+            set_validators(response, etag, catalog_updated_at)
+            return response
 
-        if location:
-            filters.append(Property.location.ilike(f"%{location}%"))
+        # Served from memory when the catalog engine is loaded, up to date and
+        # understands the request; full-text and relevance queries always go
+        # to Postgres
+        engine = get_catalog_engine()
+        if engine is not None and engine.can_serve(filters, sort_by, (catalog_updated_at, catalog_count)):
+            properties, total, next_key = engine.search(
+                filters, sort_by, descending, page, limit, keyset, include_total
+            )
+            if fields:
+                properties = [{name: record[name] for name in field_names} for record in properties]
+        else:
+            properties, total, next_key = await _search_database(
+                db, filters, sort_column, descending, page, limit, keyset, include_total, field_names
+            )
 
-        if min_price is not None:
-            filters.append(Property.price >= min_price)
+        next_cursor = _encode_cursor(sort_by, sort_order, *next_key) if next_key else None
 
-        if max_price is not None:
-            filters.append(Property.price <= max_price)
+        # Calculate total pages
+        total_pages = None
+        if total is not None:
+            total_pages = math.ceil(total / limit) if total > 0 else 0
 
-        if configuration:
-            filters.append(Property.configuration.ilike(f"%{configuration}%"))
+        body = _encode_list_response(
+            property_fields_models(field_names)[1] if fields else PropertyListResponse,
+            {
+                "properties": properties,
+                "total": total,
+                "page": page,
+                "limit": limit,
+                "total_pages": total_pages,
+                "next_cursor": next_cursor,
+            },
+        )
+        await cache.set("property_search", key, body.decode(), generation)
 
-        if min_carpet_area is not None:
-            # carpet_area is stored as string, convert for comparison
-            # Filter properties where carpet_area can be cast to int and is >= min_carpet_area
-            # Note: This is a simplified approach for Phase 1 MVP
-            filters.append(Property.carpet_area.cast(func.integer) >= min_carpet_area)
+        response = Response(content=body, media_type="application/json")
+        set_validators(response, etag, catalog_updated_at)
+        return response
 
-        if max_carpet_area is not None:
-            filters.append(Property.carpet_area.cast(func.integer) <= max_carpet_area)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching properties: {str(e)}"
+        )
+
+
+def _crore(amount: int) -> str:
+    return f"{amount / 10_000_000:g} Cr"
+
+
+def _price_buckets(bucket_counts: dict) -> list:
+    """Every price bucket with its bounds, label and count (0 when empty)"""
+    bounds = [0] + PRICE_BUCKET_THRESHOLDS + [None]
+    buckets = []
+    for i, (low, high) in enumerate(zip(bounds, bounds[1:])):
+        if high is None:
+            label = f"{_crore(low)}+"
+        elif low == 0:
+            label = f"Under {_crore(high)}"
+        else:
+            label = f"{_crore(low)} - {_crore(high)}"
+        buckets.append(PriceBucketCount(label=label, min_price=low, max_price=high, count=bucket_counts.get(i, 0)))
+    return buckets
+
+
+async def _facets_database(db: AsyncSession, filters: PropertyFilters) -> dict:
+    """
+    All facet counts in one grouped query
+
+    The filtered rows are projected in a subquery, then counted with one
+    grouping set per facet plus the empty set for the overall total.
+    """
+    matching = select(
+        Property.location.label("location"),
+        Property.configuration.label("configuration"),
+        func.width_bucket(Property.price, cast(array(PRICE_BUCKET_THRESHOLDS), ARRAY(BigInteger))).label("price_bucket"),
+        func.coalesce(Property.supports_group_buying == "true", False).label("group_buying"),
+    )
+    clauses = _build_filters(filters)
+    if clauses:
+        matching = matching.where(and_(*clauses))
+    matching = matching.subquery()
+
+    columns = (matching.c.location, matching.c.configuration, matching.c.price_bucket, matching.c.group_buying)
+    query = (
+        select(*columns, func.count().label("count"), func.grouping(*columns).label("grouping_set"))
+        .group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+    )
+    result = await db.execute(query)
+
+    # GROUPING() sets a bit (leftmost column = highest bit) for each column
+    # that is NOT part of the row's grouping set
+    facets = {"total": 0, "locations": {}, "configurations": {}, "price_buckets": {}, "group_buying": 0}
+    for row in result.all():
+        if row.grouping_set == 0b0111:
+            facets["locations"][row.location] = row.count
+        elif row.grouping_set == 0b1011:
+            facets["configurations"][row.configuration] = row.count
+        elif row.grouping_set == 0b1101:
+            facets["price_buckets"][row.price_bucket] = row.count
+        elif row.grouping_set == 0b1110:
+            if row.group_buying:
+                facets["group_buying"] = row.count
+        else:
+            facets["total"] = row.count
+
+    return facets
 
-        if group_buying_only:
-            filters.append(Property.supports_group_buying == "true")
 
-        # Apply all filters
-        if filters:
-            query = query.where(and_(*filters))
+def _facet_counts(counts: dict) -> list:
+    """Facet values ordered by count, then alphabetically"""
+    return [
+        FacetCount(value=value, count=count)
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
 
-        # Get total count (before pagination)
-        count_query = select(func.count()).select_from(Property)
-        if filters:
-            count_query = count_query.where(and_(*filters))
 
-        result = await db.execute(count_query)
-        total = result.scalar() or 0
+@router.get("/facets", response_model=PropertyFacetsResponse)
+async def get_property_facets(
+    filters: PropertyFilters = Depends(property_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Facet counts for the property filter sidebar
+
+    Takes the same filters as GET /properties and returns, for that filter
+    set, the number of matching properties per location, per configuration,
+    per price bucket and with group buying, in a single query.
+    """
+    cache = get_response_cache()
+    key = cache_key(_normalise_filters(filters))
 
-        # Apply sorting
-        if sort_order.lower() == "desc":
-            order_column = getattr(Property, sort_by).desc()
+    try:
+        cached, generation = await cache.get("property_facets", key)
+        if cached is not None:
+            return cached
+
+        engine = get_catalog_engine()
+        if engine is not None and engine.can_serve(filters, "price", await _catalog_version(db)):
+            facets = engine.facets(filters, PRICE_BUCKET_THRESHOLDS)
         else:
-            order_column = getattr(Property, sort_by).asc()
+            facets = await _facets_database(db, filters)
+
+        response = PropertyFacetsResponse(
+            total=facets["total"],
+            locations=_facet_counts(facets["locations"]),
+            configurations=_facet_counts(facets["configurations"]),
+            price_buckets=_price_buckets(facets["price_buckets"]),
+            group_buying=facets["group_buying"],
+        )
+
+        await cache.set("property_facets", key, response.model_dump(mode="json"), generation)
+
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error computing facets: {str(e)}"
+        )
+
+
+@router.get("/price-stats", response_model=LocationPriceStatsResponse)
+async def get_price_stats(
+    location: Optional[str] = Query(None, description="Filter by location"),
+    configuration: Optional[str] = Query(None, description="Filter by configuration (e.g., '3BHK'); omit for every configuration and the location totals"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Price statistics per location and configuration (market insights page)
 
-        query = query.order_by(order_column)
+    Count, min, median, p90 and median price per sqft, read from the
+    precomputed location_price_stats table. Each location has one row per
+    configuration plus a total row with configuration null.
+    """
+    cache = get_response_cache()
+    key = cache_key({
+        "location": location.lower() if location else None,
+        "configuration": configuration.lower() if configuration else None,
+    })
 
-        # Apply pagination
-        offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+    try:
+        cached, generation = await cache.get("price_stats", key)
+        if cached is not None:
+            return cached
+
+        query = select(LocationPriceStats)
+        if location:
+            query = query.where(LocationPriceStats.location.ilike(f"%{location}%"))
+        if configuration:
+            query = query.where(
+                LocationPriceStats.configuration != ALL_CONFIGURATIONS,
+                LocationPriceStats.configuration.ilike(f"%{configuration}%"),
+            )
+        query = query.order_by(LocationPriceStats.location, LocationPriceStats.configuration)
 
-        # Execute query
         result = await db.execute(query)
-        properties = result.scalars().unique().all()
+        stats = [
+            LocationPriceStatsItem(
+                location=row.location,
+                configuration=row.configuration if row.configuration != ALL_CONFIGURATIONS else None,
+                property_count=row.property_count,
+                min_price=row.min_price,
+                median_price=row.median_price,
+                p90_price=row.p90_price,
+                median_price_per_sqft=row.median_price_per_sqft,
+                refreshed_at=row.refreshed_at,
+            )
+            for row in result.scalars().all()
+        ]
 
-        # Calculate total pages
-        total_pages = math.ceil(total / limit) if total > 0 else 0
+        response = LocationPriceStatsResponse(stats=stats)
+        await cache.set("price_stats", key, response.model_dump(mode="json"), generation)
 
-        return PropertyListResponse(
-            properties=properties,
-            total=total,
-            page=page,
-            limit=limit,
-            total_pages=total_pages,
+        return response
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching price stats: {str(e)}"
         )
 
+
+def _like_escape(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally (backslash is Postgres' default escape)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _word_prefix_match(column, prefix: str):
+    """column starts with prefix, or has a word that does (trigram-index served)"""
+    pattern = _like_escape(prefix)
+    return or_(column.ilike(f"{pattern}%"), column.ilike(f"% {pattern}%"))
+
+
+async def _autocomplete_database(db: AsyncSession, prefix: str, limit: int) -> List[dict]:
+    """Suggestions from Postgres (pg_trgm indexes), ranked like the in-memory index"""
+    location_count = func.count(Property.id).label("count")
+    locations = await db.execute(
+        select(Property.location, location_count)
+        .where(_word_prefix_match(Property.location, prefix))
+        .group_by(Property.location)
+        .order_by(location_count.desc())
+        .limit(limit)
+    )
+
+    builder_count = func.count(Property.id).label("count")
+    builders = await db.execute(
+        select(Builder.id, Builder.name, builder_count)
+        .outerjoin(Property, Property.builder_id == Builder.id)
+        .where(_word_prefix_match(Builder.name, prefix))
+        .group_by(Builder.id, Builder.name)
+        .order_by(builder_count.desc())
+        .limit(limit)
+    )
+
+    properties = await db.execute(
+        select(Property.id, Property.name, Property.smart_score)
+        .where(_word_prefix_match(Property.name, prefix))
+        .order_by(func.similarity(Property.name, prefix).desc(), Property.smart_score.desc())
+        .limit(limit)
+    )
+
+    candidates = (
+        [({"type": "location", "text": row.location, "id": None, "count": row.count}, row.count) for row in locations.all()]
+        + [({"type": "builder", "text": row.name, "id": row.id, "count": row.count}, row.count) for row in builders.all()]
+        + [({"type": "property", "text": row.name, "id": row.id, "count": None}, float(row.smart_score or 0)) for row in properties.all()]
+    )
+    normalised = normalise_text(prefix)
+    candidates.sort(key=lambda item: (
+        not normalise_text(item[0]["text"]).startswith(normalised),
+        KIND_ORDER[item[0]["type"]],
+        -item[1],
+        len(item[0]["text"]),
+        item[0]["text"],
+    ))
+    return [suggestion for suggestion, _ in candidates[:limit]]
+
+
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete(
+    prefix: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Search-box suggestions: locations, builders and properties
+
+    Matches the start of the text or of any word in it, case-insensitively.
+    Served from the in-memory autocomplete index, which is rebuilt in the
+    background when the catalog version moves (the current index answers
+    meanwhile); falls back to pg_trgm-indexed ILIKE queries when the index
+    is disabled (AUTOCOMPLETE_INDEX_ENABLED=False), not built yet or cannot
+    load.
+    """
+    try:
+        index = get_autocomplete_index()
+        if index is not None:
+            try:
+                catalog_updated_at, catalog_count = await _catalog_version(db)
+                if not index.is_current(catalog_updated_at, catalog_count):
+                    index.refresh_in_background()
+                if index.ready:
+                    return AutocompleteResponse(prefix=prefix, suggestions=index.suggest(prefix, limit))
+            except Exception as e:
+                print(f"⚠️  Autocomplete index unavailable, using SQL: {e}")
+
+        suggestions = await _autocomplete_database(db, prefix, limit)
+        return AutocompleteResponse(prefix=prefix, suggestions=suggestions)
+
     except Exception as e:
         raise HTTPException(
             status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error searching properties: {str(e)}"
+            detail=f"Error fetching suggestions: {str(e)}"
+        )
+
+
+# Export: rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# CSV columns: the response fields with the builder flattened
+EXPORT_CSV_COLUMNS = [name for name in PROPERTY_FIELDS if name != "builder"] + [
+    f"builder_{name}" for name in BUILDER_FIELDS if name != "id"
+]
+
+
+def _csv_value(value) -> str:
+    """One CSV cell: lists joined with |, NULL as empty"""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "|".join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_export(records: List[dict], export_format: str) -> bytes:
+    """Encode one batch of response dicts"""
+    if export_format == "ndjson":
+        adapter = _list_adapter(PropertyResponse)
+        return b"".join(adapter.dump_json(adapter.validate_python(record)) + b"\n" for record in records)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        builder = record["builder"] or {}
+        writer.writerow(
+            [_csv_value(record[name]) for name in PROPERTY_FIELDS if name != "builder"]
+            + [_csv_value(builder.get(name)) for name in BUILDER_FIELDS if name != "id"]
+        )
+    return buffer.getvalue().encode()
+
+
+async def _stream_export(filters: PropertyFilters, export_format: str):
+    """
+    Yield the export in batches from a server-side cursor
+
+    Opens its own session: the request's get_db session is closed once the
+    endpoint returns, before the body is streamed. Only one batch of rows is
+    held at a time, so memory stays flat for any catalog size.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_CSV_COLUMNS)
+        yield buffer.getvalue().encode()
+
+    query = _fields_query(PROPERTY_FIELDS).order_by(Property.id)
+    clauses = _build_filters(filters)
+    if clauses:
+        query = query.where(and_(*clauses))
+
+    async with get_session_maker()() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield _encode_export([_fields_record(row, PROPERTY_FIELDS) for row in rows], export_format)
+
+
+@router.get("/export")
+async def export_properties(
+    filters: PropertyFilters = Depends(property_filters),
+    format: str = Query("ndjson", description="ndjson (one PropertyResponse JSON per line) or csv"),
+):
+    """
+    Stream the property catalog with builder info
+
+    Takes the same filters as GET /properties; with none, exports the whole
+    catalog. Rows are read through a server-side cursor and written as they
+    arrive, ordered by id.
+    """
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format: {format}. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    filename = f"properties-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        _stream_export(filters, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _property_query():
+    """Property select with its builder joined in (detail and batch responses)"""
+    return select(Property).options(joinedload(Property.builder))
+
+
+async def fetch_properties(db: AsyncSession, ids: List[UUID]) -> Tuple[list, List[UUID]]:
+    """
+    Load properties by ID in one query
+
+    Returns (properties in the order of ids, ids that were not found).
+    Repeated ids are returned once. Properties come from the catalog engine
+    when it is loaded (response dicts), otherwise from Postgres (ORM objects
+    with the builder loaded); both validate as PropertyResponse.
+    """
+    ids = list(dict.fromkeys(ids))
+
+    engine = get_catalog_engine()
+    if engine is not None:
+        found = {property_id: engine.get(property_id) for property_id in ids}
+        found = {property_id: record for property_id, record in found.items() if record is not None}
+    else:
+        result = await db.execute(_property_query().where(Property.id.in_(ids)))
+        found = {property_obj.id: property_obj for property_obj in result.scalars().unique().all()}
+
+    properties = [found[property_id] for property_id in ids if property_id in found]
+    missing_ids = [property_id for property_id in ids if property_id not in found]
+    return properties, missing_ids
+
+
+@router.post("/batch", response_model=PropertyBatchResponse)
+async def get_properties_batch(
+    batch: PropertyBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get many properties by ID in one request (saved lists, compare screen)
+
+    Up to 100 IDs. Properties come back in the requested order; IDs with no
+    property are listed in missing_ids instead of failing the request.
+    """
+    try:
+        properties, missing_ids = await fetch_properties(db, batch.ids)
+        return PropertyBatchResponse(properties=properties, missing_ids=missing_ids)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching properties: {str(e)}"
+        )
+
+
+@router.get("/{property_id}/similar", response_model=SimilarPropertiesResponse)
+async def get_similar_properties(
+    property_id: UUID,
+    limit: int = Query(6, ge=1, le=SIMILAR_TOP_K),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Properties most like this one (detail page "similar properties")
+
+    Neighbours come from the in-memory similarity index (price, carpet area,
+    configuration, location, coordinates and amenities), which keeps the
+    top matches of every property. When the catalog version moves the index
+    catches up in the background and the current neighbours are served
+    meanwhile; until the first build finishes the endpoint answers 503.
+    """
+    try:
+        index = get_similarity_index()
+        catalog_updated_at, catalog_count = await _catalog_version(db)
+        current = index.is_current(catalog_updated_at, catalog_count)
+        if not current:
+            index.refresh_in_background()
+            if not index.size:
+                raise HTTPException(
+                    status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Similar properties are being computed, retry shortly",
+                    headers={"Retry-After": "5"},
+                )
+
+        neighbours = index.neighbours(property_id, limit)
+        if neighbours is None:
+            if current:
+                raise HTTPException(
+                    status_code=http_status.HTTP_404_NOT_FOUND,
+                    detail="Property not found"
+                )
+            # Possibly added since the index was built: no neighbours yet
+            neighbours = []
+
+        distances = dict(neighbours)
+        properties, _ = await fetch_properties(db, list(distances))
+        similar = []
+        for property_obj in properties:
+            record = PropertyResponse.model_validate(property_obj).model_dump()
+            record["similarity"] = round(1.0 / (1.0 + distances[record["id"]]), 4)
+            similar.append(record)
+
+        return SimilarPropertiesResponse(property_id=property_id, properties=similar)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching similar properties: {str(e)}"
         )
 
 
 @router.get("/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get single property by ID
 
     P1-F07: Property Detail Page (Days 10-11)
+
+    Responses carry ETag/Last-Modified from the property's updated_at; a
+    matching If-None-Match or If-Modified-Since gets an empty 304.
     """
+    cache = get_response_cache()
+
     try:
-        query = select(Property).options(joinedload(Property.builder)).where(Property.id == property_id)
-        result = await db.execute(query)
+        cached, generation = await cache.get("property_detail", property_id)
+        if cached is not None:
+            updated_at = datetime.fromisoformat(cached["updated_at"]) if cached["updated_at"] else None
+            etag, last_modified = _detail_validators(property_id, updated_at)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+            set_validators(response, etag, last_modified)
+            return cached
+
+        # Revalidation without a cached copy: check updated_at alone first
+        # so an unchanged property is never loaded in full
+        if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+            result = await db.execute(select(Property.updated_at).where(Property.id == property_id))
+            row = result.one_or_none()
+            if row is not None:
+                etag, last_modified = _detail_validators(property_id, row.updated_at)
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified(etag, last_modified)
+
+        result = await db.execute(_property_query().where(Property.id == property_id))
         property_obj = result.scalar_one_or_none()
 
         if not property_obj:
@@ -161,7 +1167,11 @@ async def get_property(
                 detail="Property not found"
             )
 
-        return property_obj
+        property_response = PropertyResponse.model_validate(property_obj)
+        await cache.set("property_detail", property_id, property_response.model_dump(mode="json"), generation)
+
+        set_validators(response, *_detail_validators(property_id, property_obj.updated_at))
+        return property_response
 
     except HTTPException:
         raise
@@ -7,6 +7,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from app.services.catalog_engine import start_catalog_engine, stop_catalog_engine
+from app.services.cache import close_redis
+from app.services.maps import close_maps_service
+from app.services.routing import start_road_router
+
 # Version will be imported from config later
 VERSION = "1.0.0"
 
@@ -16,8 +21,13 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events"""
     print("🚀 Starting HyreBuy API...")
     # Database connection will be initialized here in Day 2
+    await start_catalog_engine()  # No-op unless CATALOG_ENGINE_ENABLED=True
+    await start_road_router()  # No-op unless MAPS_BACKEND=local
     yield
     print("👋 Shutting down HyreBuy API...")
+    await stop_catalog_engine()
+    await close_redis()
+    await close_maps_service()
     # Database cleanup will happen here
 
 
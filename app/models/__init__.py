@@ -11,6 +11,7 @@ from app.models.commute_score import CommuteScore
 from app.models.buying_group import BuyingGroup
 from app.models.group_member import GroupMember
 from app.models.saved_property import SavedProperty
+from app.models.location_price_stats import LocationPriceStats
 
 __all__ = [
     "User",
@@ -21,4 +22,5 @@ __all__ = [
     "BuyingGroup",
     "GroupMember",
     "SavedProperty",
+    "LocationPriceStats",
 ]
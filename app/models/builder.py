@@ -3,7 +3,7 @@ Builder model - Real estate builders/developers
 Examples: Aparna, My Home, Aliens, Mantri, Sobha, etc.
 """
 
-from sqlalchemy import Column, String, Numeric, DateTime, func
+from sqlalchemy import Column, String, Numeric, DateTime, func, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -42,5 +42,10 @@ class Builder(Base):
     # Relationships
     properties = relationship("Property", back_populates="builder")
 
+    __table_args__ = (
+        # Autocomplete fallback: ILIKE prefix/word matches (needs pg_trgm)
+        Index('idx_builders_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
     def __repr__(self):
         return f"<Builder {self.name} (Rating: {self.rating})>"
@@ -5,7 +5,7 @@ Days 22-24: Commute Calculator Backend
 Caches commute calculations to avoid repeated API calls
 """
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, Index
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
@@ -32,9 +32,16 @@ class CommuteCache(Base):
     dest_lat = Column(Float, nullable=False, comment="Property latitude")
     dest_lng = Column(Float, nullable=False, comment="Property longitude")
 
+    # Quantised cache key, see app.services.geo.commute_cell
+    origin_cell = Column(BigInteger, nullable=False, comment="Commute grid cell of the origin")
+    dest_cell = Column(BigInteger, nullable=False, comment="Commute grid cell of the destination")
+
     # Travel mode (driving, transit, walking, bicycling)
     travel_mode = Column(String(20), nullable=False, default="driving")
 
+    # Maps backend that produced the result (google, mock, local)
+    maps_backend = Column(String(10), nullable=False, comment="Maps backend that calculated the commute")
+
     # Commute details
     distance_meters = Column(Integer, nullable=False, comment="Distance in meters")
     distance_text = Column(String(50), nullable=False, comment="Human-readable distance")
@@ -49,13 +56,13 @@ class CommuteCache(Base):
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    # Indexes for fast lookups
+    # One row per (origin cell, destination cell, mode, backend): lookups are
+    # a single index probe and writes upsert on this key
     __table_args__ = (
         Index(
-            'idx_commute_lookup',
-            'origin_lat', 'origin_lng',
-            'dest_lat', 'dest_lng',
-            'travel_mode'
+            'uq_commute_cache_cells',
+            'origin_cell', 'dest_cell', 'travel_mode', 'maps_backend',
+            unique=True
         ),
     )
 
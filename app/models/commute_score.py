@@ -16,8 +16,8 @@ class CommuteScore(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Foreign Keys
-    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id"), nullable=False)
-    company_id = Column(UUID(as_uuid=True), ForeignKey("gcc_companies.id"), nullable=False)
+    property_id = Column(UUID(as_uuid=True), ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("gcc_companies.id", ondelete="CASCADE"), nullable=False)
 
     # Commute Data (from OSRM API)
     distance_km = Column(Numeric(8, 2), nullable=False)  # Distance in kilometers
@@ -0,0 +1,39 @@
+"""
+Location Price Stats Model
+Market insights: price statistics per locality
+
+Precomputed aggregate of the properties table, refreshed by
+app.services.price_stats (admin writes and scripts/refresh_price_stats.py)
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, func
+
+from app.database import Base
+
+
+# configuration value of the row covering every configuration in a location
+ALL_CONFIGURATIONS = ""
+
+
+class LocationPriceStats(Base):
+    """
+    Price statistics for one (location, configuration) group
+
+    Each location has one row per configuration plus a roll-up row whose
+    configuration is ALL_CONFIGURATIONS.
+    """
+    __tablename__ = "location_price_stats"
+
+    location = Column(String(100), primary_key=True)
+    configuration = Column(String(50), primary_key=True)
+
+    property_count = Column(Integer, nullable=False)
+    min_price = Column(BigInteger, nullable=False)  # In INR
+    median_price = Column(BigInteger, nullable=False)
+    p90_price = Column(BigInteger, nullable=False)
+    median_price_per_sqft = Column(Integer, nullable=True)  # NULL when no property has a numeric price per sqft
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<LocationPriceStats {self.location} {self.configuration or 'all'}: {self.property_count} properties>"
@@ -2,12 +2,52 @@
 Property model - Real estate listings
 """
 
-from sqlalchemy import Column, String, BigInteger, Numeric, DateTime, ForeignKey, Text, ARRAY, func, Index
+from sqlalchemy import Column, String, BigInteger, Integer, Numeric, DateTime, ForeignKey, Text, ARRAY, func, Index
 from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Optional
 import uuid
 
 from app.database import Base
+from app.services.geo import geo_cell
+
+
+def parse_sqft_number(value) -> Optional[int]:
+    """Parse a string area/price like "1650" or "5,758.5" into an int, or None if not numeric"""
+    if value is None:
+        return None
+    try:
+        number = Decimal(str(value).replace(",", "").strip())
+    except InvalidOperation:
+        return None
+    if not number.is_finite():
+        return None
+    # Half up, as Postgres round() does in the backfill migration
+    number = number.to_integral_value(rounding=ROUND_HALF_UP)
+    if not 0 <= number < 2**31:
+        return None
+    return int(number)
+
+
+def normalise_amenity(value: str) -> str:
+    """Amenity name as stored: trimmed, single spaces, case kept ("EV  Charging " -> "EV Charging")"""
+    return " ".join(value.split())
+
+
+def normalise_amenities(values) -> Optional[list]:
+    """Normalise each amenity, dropping blanks and duplicates (first occurrence kept)"""
+    if values is None:
+        return None
+    return list(dict.fromkeys(name for name in (normalise_amenity(value) for value in values if value) if name))
+
+
+def amenity_keys(values) -> Optional[list]:
+    """Lowercased amenities for case-insensitive matching ("EV Charging" -> "ev charging")"""
+    names = normalise_amenities(values)
+    if names is None:
+        return None
+    return list(dict.fromkeys(name.lower() for name in names))
 
 
 class Property(Base):
@@ -27,24 +67,29 @@ class Property(Base):
     # Geolocation
     latitude = Column(Numeric(10, 8), nullable=False)
     longitude = Column(Numeric(11, 8), nullable=False)
+    geo_cell = Column(BigInteger, nullable=True, index=True)  # Z-order cell of (latitude, longitude), see app.services.geo
 
     # Configuration
     configuration = Column(String(50), nullable=False)  # e.g., "3BHK", "4BHK"
     carpet_area = Column(String, nullable=False)  # Square feet (as string for Phase 1)
+    carpet_area_sqft = Column(Integer, nullable=True, index=True)  # Numeric copy of carpet_area for range filters
 
     # Pricing
     price = Column(BigInteger, nullable=False, index=True)  # In INR
     price_per_sqft = Column(String, nullable=True)
+    price_per_sqft_inr = Column(Integer, nullable=True, index=True)  # Numeric copy of price_per_sqft
 
     # Smart Scoring (Phase 1)
-    smart_score = Column(Numeric(5, 2), default=0.0)  # 0-100
+    smart_score = Column(Numeric(5, 2), nullable=False, default=0.0)  # 0-100
     location_score = Column(Numeric(5, 2), default=0.0)
     builder_score = Column(Numeric(5, 2), default=0.0)
     price_score = Column(Numeric(5, 2), default=0.0)
     commute_score = Column(Numeric(5, 2), default=0.0)
+    scored_at = Column(DateTime(timezone=True), nullable=True)  # Last run of app.services.scoring over this row
 
     # Amenities
     amenities = Column(ARRAY(String), nullable=True)  # ["Swimming Pool", "Gym", "Park"]
+    amenities_lower = Column(ARRAY(String), nullable=True)  # Lowercased copy of amenities for filters
 
     # Images
     images = Column(ARRAY(String), nullable=True)  # Array of image URLs
@@ -57,7 +102,7 @@ class Property(Base):
     search_vector = Column(TSVECTOR, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
     # Relationships
@@ -69,7 +114,43 @@ class Property(Base):
     __table_args__ = (
         Index('idx_properties_location_price', 'location', 'price'),
         Index('idx_properties_search_vector', 'search_vector', postgresql_using='gin'),
+        # amenities= filter: @> (all) and && (any) containment on the lowercased copy
+        Index('idx_properties_amenities_lower', 'amenities_lower', postgresql_using='gin'),
+        # Autocomplete fallback: ILIKE prefix/word matches (needs pg_trgm)
+        Index('idx_properties_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_properties_location_trgm', 'location', postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'}),
+        # Keyset pagination: one (sort column, id) index per sort_by option
+        Index('idx_properties_price_id', 'price', 'id'),
+        Index('idx_properties_smart_score_id', 'smart_score', 'id'),
+        Index('idx_properties_created_at_id', 'created_at', 'id'),
     )
 
+    @validates("latitude", "longitude")
+    def _sync_geo_cell(self, key, value):
+        """Recompute the spatial index cell whenever the coordinates change"""
+        latitude = value if key == "latitude" else self.__dict__.get("latitude")
+        longitude = value if key == "longitude" else self.__dict__.get("longitude")
+        if latitude is not None and longitude is not None:
+            self.geo_cell = geo_cell(float(latitude), float(longitude))
+        return value
+
+    @validates("amenities")
+    def _normalise_amenities(self, key, value):
+        """Collapse whitespace and keep the lowercased copy the filters match on in step"""
+        self.amenities_lower = amenity_keys(value)
+        return normalise_amenities(value)
+
+    @validates("carpet_area")
+    def _sync_carpet_area_sqft(self, key, value):
+        """Keep the typed column in step with the string one on every write"""
+        self.carpet_area_sqft = parse_sqft_number(value)
+        return value
+
+    @validates("price_per_sqft")
+    def _sync_price_per_sqft_inr(self, key, value):
+        """Keep the typed column in step with the string one on every write"""
+        self.price_per_sqft_inr = parse_sqft_number(value)
+        return value
+
     def __repr__(self):
         return f"<Property {self.name} - {self.location} - ₹{self.price}>"
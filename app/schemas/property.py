@@ -3,8 +3,9 @@ Property schemas for request/response validation
 Days 8-9: Property Search (P1-F05, P1-F06)
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, create_model
+from typing import Optional, List, Tuple, Type
+from functools import lru_cache
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
@@ -53,6 +54,26 @@ class PropertyResponse(BaseModel):
         from_attributes = True
 
 
+class PropertyFilters(BaseModel):
+    """Filter set shared by property search and other catalog endpoints"""
+    q: Optional[str] = None
+    location: Optional[str] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    configuration: Optional[str] = None
+    min_carpet_area: Optional[int] = None
+    max_carpet_area: Optional[int] = None
+    min_price_per_sqft: Optional[int] = None
+    max_price_per_sqft: Optional[int] = None
+    group_buying_only: bool = False
+    near_lat: Optional[float] = None
+    near_lng: Optional[float] = None
+    radius_km: Optional[float] = None
+    bbox: Optional[List[float]] = None  # [west, south, east, north]
+    amenities: Optional[List[str]] = None  # lowercased names (amenity_keys)
+    amenities_match: str = "all"  # "all" (every amenity) or "any" (at least one)
+
+
 class PropertySearchParams(BaseModel):
     """Query parameters for property search"""
     location: Optional[str] = Field(None, description="Filter by location (e.g., 'Gachibowli')")
@@ -61,6 +82,8 @@ class PropertySearchParams(BaseModel):
     configuration: Optional[str] = Field(None, description="Filter by configuration (e.g., '3BHK')")
     min_carpet_area: Optional[int] = Field(None, description="Minimum carpet area in sqft", ge=0)
     max_carpet_area: Optional[int] = Field(None, description="Maximum carpet area in sqft", ge=0)
+    min_price_per_sqft: Optional[int] = Field(None, description="Minimum price per sqft in INR", ge=0)
+    max_price_per_sqft: Optional[int] = Field(None, description="Maximum price per sqft in INR", ge=0)
     status: Optional[str] = Field("available", description="Filter by status")
     group_buying_only: Optional[bool] = Field(False, description="Show only group buying properties")
     sort_by: Optional[str] = Field("price", description="Sort field: price, smart_score, created_at")
@@ -72,7 +95,116 @@ class PropertySearchParams(BaseModel):
 class PropertyListResponse(BaseModel):
     """Paginated property list response"""
     properties: List[PropertyResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
+
+
+class PropertyBatchRequest(BaseModel):
+    """IDs for POST /properties/batch"""
+    ids: List[UUID] = Field(..., min_length=1, max_length=100, description="Property IDs, in the order wanted back")
+
+
+class PropertyBatchResponse(BaseModel):
+    """Properties in request order, plus the requested IDs that do not exist"""
+    properties: List[PropertyResponse]
+    missing_ids: List[UUID]
+
+
+class SimilarPropertyResponse(PropertyResponse):
+    """A property with how close it is to the one being viewed"""
+    similarity: float = Field(..., description="1 / (1 + feature distance); 1.0 is identical")
+
+
+class SimilarPropertiesResponse(BaseModel):
+    """Nearest properties to property_id, most similar first"""
+    property_id: UUID
+    properties: List[SimilarPropertyResponse]
+
+
+# fields=card: what a listing card shows (no description, amenities, score breakdown or timestamps)
+PROPERTY_CARD_FIELDS = (
+    "id", "name", "location", "latitude", "longitude", "configuration", "carpet_area",
+    "price", "price_per_sqft", "smart_score", "images", "supports_group_buying",
+    "group_discount_percentage", "builder",
+)
+
+
+@lru_cache(maxsize=128)
+def property_fields_models(fields: Tuple[str, ...]) -> Tuple[Type[BaseModel], Type[BaseModel]]:
+    """
+    (item model, list response model) for a sparse fieldset
+
+    fields are PropertyResponse field names; each keeps its type and default,
+    so a field serialises exactly as it does in the full response.
+    """
+    item_model = create_model(
+        "PropertyFieldsResponse",
+        __config__={"from_attributes": True},
+        **{
+            name: (PropertyResponse.model_fields[name].annotation, PropertyResponse.model_fields[name].default)
+            for name in fields
+        },
+    )
+    list_model = create_model(
+        "PropertyFieldsListResponse",
+        __base__=PropertyListResponse,
+        properties=(List[item_model], ...),
+    )
+    return item_model, list_model
+
+
+class FacetCount(BaseModel):
+    """Number of matching properties for one facet value"""
+    value: str
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    """Number of matching properties in a price range (max_price exclusive)"""
+    label: str
+    min_price: int
+    max_price: Optional[int] = None
+    count: int
+
+
+class PropertyFacetsResponse(BaseModel):
+    """Facet counts for the property filter sidebar"""
+    total: int
+    locations: List[FacetCount]
+    configurations: List[FacetCount]
+    price_buckets: List[PriceBucketCount]
+    group_buying: int
+
+
+class LocationPriceStatsItem(BaseModel):
+    """Price statistics for one location, overall or for one configuration"""
+    location: str
+    configuration: Optional[str] = None  # None: every configuration in the location
+    property_count: int
+    min_price: int
+    median_price: int
+    p90_price: int
+    median_price_per_sqft: Optional[int] = None
+    refreshed_at: datetime
+
+
+class LocationPriceStatsResponse(BaseModel):
+    """Market insights: price statistics per location and configuration"""
+    stats: List[LocationPriceStatsItem]
+
+
+class AutocompleteSuggestion(BaseModel):
+    """One search-box suggestion"""
+    type: str  # "location", "builder" or "property"
+    text: str
+    id: Optional[UUID] = None  # builder or property ID; None for a location
+    count: Optional[int] = None  # properties in the location / by the builder
+
+
+class AutocompleteResponse(BaseModel):
+    """Suggestions for a search-box prefix, best first"""
+    prefix: str
+    suggestions: List[AutocompleteSuggestion]
@@ -0,0 +1,362 @@
+"""
+Autocomplete Service
+Search-as-you-type suggestions over property names, locations and builders
+
+Every suggestion is indexed under each of its word suffixes ("Prestige
+Lakeside Habitat" under "prestige lakeside habitat", "lakeside habitat" and
+"habitat"), and the keys are kept in one sorted list. A prefix is then a
+contiguous range found with two binary searches; the best few entries of
+the range are picked by their rank. Ranges too wide to scan on every
+keystroke (one- and two-letter prefixes) are memoised until a key under
+them changes.
+
+Ranking: matches at the start of the text before matches at a later word,
+then locations, builders and properties, then more properties (locations,
+builders) or a higher smart score (properties), then shorter text.
+
+An admin write moves only the keys of the suggestions it changes (the
+property, and the counts of its location and builder), so it costs a few
+binary searches and list inserts instead of a rebuild.
+
+A full reload (first use, or a write made through another worker) builds a
+fresh index in a worker thread and swaps it in; keystrokes keep being
+answered from the old index, or by SQL before the first load, meanwhile.
+"""
+
+import asyncio
+import heapq
+import os
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session_maker
+from app.models.property import Property
+from app.models.builder import Builder
+
+
+# Most suggestions one request can ask for
+MAX_SUGGESTIONS = 20
+
+# Ranges wider than this are memoised per prefix instead of scanned per request
+SCAN_LIMIT = 512
+
+KIND_ORDER = {"location": 0, "builder": 1, "property": 2}
+
+# Sorts after every other character, closing the range of keys starting with a prefix
+_PREFIX_END = "\U0010ffff"
+
+
+def normalise_text(value: str) -> str:
+    """Lowercase with single spaces: the form keys and prefixes are compared in"""
+    return " ".join((value or "").lower().split())
+
+
+def _text_keys(text: str, entry: int) -> List[Tuple[str, int, int]]:
+    """(word suffix, entry, 1 if it starts at a later word else 0) for each word of text"""
+    words = normalise_text(text).split(" ")
+    return [(" ".join(words[position:]), entry, 1 if position else 0) for position in range(len(words)) if words[position]]
+
+
+class AutocompleteIndex:
+    """
+    Sorted prefix index over the catalog's searchable names
+
+    Source rows, location and builder counts are kept so an admin write can
+    replace one property and patch the suggestions it touches without a
+    database round trip.
+    """
+
+    def __init__(self):
+        # Source rows: property id -> (name, location, builder_id, smart_score)
+        self._properties: Dict[UUID, Tuple[str, str, Optional[UUID], float]] = {}
+        self._builders: Dict[UUID, str] = {}
+        self._location_counts: Dict[str, int] = {}
+        self._location_names: Dict[str, str] = {}
+        self._builder_counts: Dict[UUID, int] = {}
+
+        # Suggestions by entry number, their ranks, and the entry of each
+        # (kind, location key / id); keys sorted as (key, entry, later word)
+        self._suggestions: Dict[int, Dict[str, Any]] = {}
+        self._entry_ranks: Dict[int, tuple] = {}
+        self._entries: Dict[Tuple[str, Any], int] = {}
+        self._next_entry = 0
+        self._keys: List[Tuple[str, int, int]] = []
+        self._memo: Dict[str, List[int]] = {}
+
+        # Catalog version this index reflects: (max updated_at, row count)
+        self.max_updated_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._properties)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has been built and can answer"""
+        return bool(self._keys)
+
+    def is_current(self, max_updated_at: Optional[datetime], count: int) -> bool:
+        return self.max_updated_at == max_updated_at and self.size == count
+
+    # Loading
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Load property and builder names from the database and build the index
+
+        The build runs on a fresh index in a worker thread; this one keeps
+        answering until the result replaces its state.
+        """
+        property_rows = (await db.execute(select(
+            Property.id, Property.name, Property.location, Property.builder_id,
+            Property.smart_score, Property.updated_at,
+        ))).all()
+        builder_rows = (await db.execute(select(Builder.id, Builder.name))).all()
+
+        fresh = AutocompleteIndex()
+        await asyncio.to_thread(fresh.load_rows, property_rows, builder_rows)
+        for name, value in vars(fresh).items():
+            if name not in ("_lock", "_refresh_task"):
+                setattr(self, name, value)
+
+    def load_rows(self, property_rows, builder_rows) -> None:
+        """
+        property_rows: (id, name, location, builder_id, smart_score, updated_at)
+        builder_rows: (id, name)
+        """
+        self._properties = {
+            row[0]: (row[1], row[2], row[3], float(row[4] or 0)) for row in property_rows
+        }
+        self._builders = {row[0]: row[1] for row in builder_rows}
+
+        updated = [row[5] for row in property_rows if row[5] is not None]
+        self.max_updated_at = max(updated) if updated else None
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Rebuild every suggestion and the sorted keys from the source rows"""
+        self._location_counts, self._location_names, self._builder_counts = {}, {}, {}
+        for name, location, builder_id, smart_score in self._properties.values():
+            self._count(location, builder_id, 1)
+
+        self._suggestions, self._entry_ranks, self._entries = {}, {}, {}
+        self._next_entry = 0
+        keys = []
+        for key in self._location_counts:
+            keys.extend(self._register(("location", key), self._location_suggestion(key)))
+        for builder_id in self._builders:
+            keys.extend(self._register(("builder", builder_id), self._builder_suggestion(builder_id)))
+        for property_id in self._properties:
+            keys.extend(self._register(("property", property_id), self._property_suggestion(property_id)))
+
+        keys.sort()
+        self._keys = keys
+        self._memo = {}
+
+    # Suggestions
+
+    def _count(self, location: str, builder_id: Optional[UUID], delta: int) -> None:
+        """Add delta properties to a location and a builder"""
+        key = normalise_text(location)
+        if key:
+            count = self._location_counts.get(key, 0) + delta
+            if count > 0:
+                self._location_counts[key] = count
+                self._location_names.setdefault(key, location.strip())
+            else:
+                self._location_counts.pop(key, None)
+                self._location_names.pop(key, None)
+        if builder_id is not None:
+            self._builder_counts[builder_id] = self._builder_counts.get(builder_id, 0) + delta
+
+    def _location_suggestion(self, key: str) -> Tuple[Dict[str, Any], float]:
+        count = self._location_counts[key]
+        return {"type": "location", "text": self._location_names[key], "id": None, "count": count}, count
+
+    def _builder_suggestion(self, builder_id: UUID) -> Tuple[Dict[str, Any], float]:
+        count = self._builder_counts.get(builder_id, 0)
+        return {"type": "builder", "text": self._builders[builder_id], "id": builder_id, "count": count}, count
+
+    def _property_suggestion(self, property_id: UUID) -> Tuple[Dict[str, Any], float]:
+        name, _, _, smart_score = self._properties[property_id]
+        return {"type": "property", "text": name, "id": property_id, "count": None}, smart_score
+
+    def _register(self, ident: Tuple[str, Any], suggestion_weight) -> List[Tuple[str, int, int]]:
+        """Store one suggestion and its rank; returns its keys, still to be placed"""
+        suggestion, weight = suggestion_weight
+        entry = self._entries.get(ident)
+        if entry is None:
+            entry = self._entries[ident] = self._next_entry
+            self._next_entry += 1
+        self._suggestions[entry] = suggestion
+        self._entry_ranks[entry] = (KIND_ORDER[suggestion["type"]], -weight, len(suggestion["text"]), suggestion["text"])
+        return _text_keys(suggestion["text"], entry)
+
+    def _put(self, ident: Tuple[str, Any], suggestion_weight) -> None:
+        """Add or replace one suggestion, moving only its own keys"""
+        entry = self._entries.get(ident)
+        if entry is not None:
+            self._drop_keys(entry)
+        keys = self._register(ident, suggestion_weight)
+        for key in keys:
+            insort(self._keys, key)
+        self._forget(keys)
+
+    def _drop(self, ident: Tuple[str, Any]) -> None:
+        entry = self._entries.pop(ident, None)
+        if entry is not None:
+            self._drop_keys(entry)
+            del self._suggestions[entry], self._entry_ranks[entry]
+
+    def _drop_keys(self, entry: int) -> None:
+        keys = _text_keys(self._suggestions[entry]["text"], entry)
+        for key in keys:
+            del self._keys[bisect_left(self._keys, key)]
+        self._forget(keys)
+
+    def _forget(self, keys: List[Tuple[str, int, int]]) -> None:
+        """Drop memoised prefixes whose range holds any of the keys"""
+        stale = [prefix for prefix in self._memo if any(key.startswith(prefix) for key, _, _ in keys)]
+        for prefix in stale:
+            del self._memo[prefix]
+
+    def _refresh_location(self, key: str) -> None:
+        if key in self._location_counts:
+            self._put(("location", key), self._location_suggestion(key))
+        else:
+            self._drop(("location", key))
+
+    def _refresh_builder(self, builder_id: Optional[UUID]) -> None:
+        if builder_id in self._builders:
+            self._put(("builder", builder_id), self._builder_suggestion(builder_id))
+
+    # Queries
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best suggestions whose text, or a word in it, starts with prefix"""
+        prefix = normalise_text(prefix)
+        if not prefix:
+            return []
+
+        entries = self._memo.get(prefix)
+        if entries is None:
+            start = bisect_left(self._keys, (prefix,))
+            stop = bisect_left(self._keys, (prefix + _PREFIX_END,), lo=start)
+            entries = self._best_entries(start, stop)
+            if stop - start > SCAN_LIMIT:
+                self._memo[prefix] = entries
+
+        return [self._suggestions[entry] for entry in entries[:limit]]
+
+    def _best_entries(self, start: int, stop: int) -> List[int]:
+        """Up to MAX_SUGGESTIONS distinct entries from keys[start:stop], best first"""
+        # Start-of-text keys first; an entry can match under several of its
+        # words and its best key wins
+        ranks = self._entry_ranks
+        best = heapq.nsmallest(
+            MAX_SUGGESTIONS * 3, self._keys[start:stop], key=lambda key: (key[2], ranks[key[1]])
+        )
+        entries = list(dict.fromkeys(entry for _, entry, _ in best))
+        return entries[:MAX_SUGGESTIONS]
+
+    # Incremental updates (admin writes)
+
+    def upsert(self, property_obj: Property) -> None:
+        """Insert or replace one property (builder relationship loaded)"""
+        builders = set()
+        builder = property_obj.__dict__.get("builder")
+        if builder is not None and self._builders.get(builder.id) != builder.name:
+            self._builders[builder.id] = builder.name
+            builders.add(builder.id)
+
+        locations = set()
+        previous = self._properties.get(property_obj.id)
+        if previous is not None:
+            self._count(previous[1], previous[2], -1)
+            locations.add(normalise_text(previous[1]))
+            builders.add(previous[2])
+
+        self._properties[property_obj.id] = (
+            property_obj.name, property_obj.location, property_obj.builder_id,
+            float(property_obj.smart_score or 0),
+        )
+        self._count(property_obj.location, property_obj.builder_id, 1)
+        locations.add(normalise_text(property_obj.location))
+        builders.add(property_obj.builder_id)
+
+        self._put(("property", property_obj.id), self._property_suggestion(property_obj.id))
+        for key in locations - {""}:
+            self._refresh_location(key)
+        for builder_id in builders:
+            self._refresh_builder(builder_id)
+
+        updated_at = property_obj.updated_at
+        if updated_at is not None and (self.max_updated_at is None or updated_at > self.max_updated_at):
+            self.max_updated_at = updated_at
+
+    def remove(self, property_id: UUID) -> None:
+        previous = self._properties.pop(property_id, None)
+        if previous is None:
+            return
+        self._count(previous[1], previous[2], -1)
+        self._drop(("property", property_id))
+        location = normalise_text(previous[1])
+        if location:
+            self._refresh_location(location)
+        self._refresh_builder(previous[2])
+
+    # Cross-worker refresh
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload when the catalog changed through another worker (or on first use)"""
+        async with self._lock:
+            result = await db.execute(select(func.count(Property.id), func.max(Property.updated_at)))
+            count, max_updated_at = result.one()
+            if self._keys and self.is_current(max_updated_at, count):
+                return
+            await self.load(db)
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh in its own session unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with get_session_maker()() as session:
+                await self.refresh(session)
+        except Exception as e:
+            print(f"⚠️  Autocomplete index refresh failed: {e}")
+
+
+# Singleton instance
+_autocomplete_index: Optional[AutocompleteIndex] = None
+
+
+def autocomplete_index_enabled() -> bool:
+    """Whether suggestions come from memory (otherwise pg_trgm queries)"""
+    return os.getenv("AUTOCOMPLETE_INDEX_ENABLED", "True") == "True"
+
+
+def get_autocomplete_index() -> Optional[AutocompleteIndex]:
+    """The autocomplete index singleton (loaded on first use), or None when disabled"""
+    global _autocomplete_index
+    if not autocomplete_index_enabled():
+        return None
+    if _autocomplete_index is None:
+        _autocomplete_index = AutocompleteIndex()
+    return _autocomplete_index
+
+
+def reset_autocomplete_index() -> None:
+    """Drop the index (e.g. after a failed update); it reloads on next use"""
+    global _autocomplete_index
+    _autocomplete_index = None
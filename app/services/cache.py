@@ -0,0 +1,307 @@
+"""
+Cache Service
+Response caching for hot read endpoints
+
+Two backends:
+- Redis (REDIS_URL, Upstash in production): shared by all workers
+- In-process LRU: used when Redis is not configured or not reachable
+
+Entries are grouped by route (e.g. "property_search"), each with its own TTL.
+Invalidating a route bumps its generation number, which retires every entry
+for that route at once without scanning keys; stale entries then age out.
+A lookup returns the generation it read alongside the value, and the value
+computed after a miss is stored only if that generation is still current, so
+a response built from rows read before an invalidation is never cached
+under the generation that invalidation started.
+Only the Redis generation is shared: without Redis, an invalidation reaches
+the calling process alone, and other workers (or the API, when a script
+invalidates) serve their cached entries until the route's TTL expires.
+
+A Redis error marks Redis down for REDIS_RETRY_SECONDS; until then reads and
+writes (here and in the commute cache) go straight to the in-process tier
+instead of each paying a connect timeout. Invalidations still try Redis.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
+
+import redis.asyncio as redis
+
+
+# Per-route TTLs in seconds (override with CACHE_TTL_<ROUTE>, e.g. CACHE_TTL_PROPERTY_SEARCH)
+DEFAULT_ROUTE_TTLS = {
+    "property_search": 60,
+    "property_detail": 300,
+    "property_facets": 120,
+    "catalog_version": 30,
+    "price_stats": 600,
+}
+
+# Routes whose responses depend on the property catalog (invalidated by admin writes)
+CATALOG_ROUTES = ("property_search", "property_detail", "property_facets", "catalog_version", "price_stats")
+
+KEY_PREFIX = "hyrebuy:cache"
+
+# Seconds to skip Redis after an error
+REDIS_RETRY_SECONDS = float(os.getenv("REDIS_RETRY_SECONDS", "30"))
+
+
+def route_ttl(route: str) -> int:
+    """TTL for a route, from the environment or the defaults above"""
+    return int(os.getenv(f"CACHE_TTL_{route.upper()}", DEFAULT_ROUTE_TTLS.get(route, 60)))
+
+
+class LRUCache:
+    """Bounded in-process cache with a TTL per entry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by every user of the Redis client: monotonic time until which Redis is skipped
+_redis_down_until = 0.0
+
+
+def redis_available() -> bool:
+    """False while Redis is marked down after an error"""
+    return time.monotonic() >= _redis_down_until
+
+
+def mark_redis_down() -> None:
+    """Skip Redis for REDIS_RETRY_SECONDS (call on a Redis error)"""
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+
+def mark_redis_up() -> None:
+    """Use Redis again straight away (call when a Redis command succeeds)"""
+    global _redis_down_until
+    _redis_down_until = 0.0
+
+
+# Read against the route's current generation and return it with the value;
+# write only if the generation is still the one the read saw
+_GET_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2])}
+"""
+
+_SET_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+if generation ~= ARGV[5] then
+    return 0
+end
+redis.call('SET', ARGV[1] .. generation .. ':' .. ARGV[2], ARGV[3], 'EX', ARGV[4])
+return 1
+"""
+
+# (Redis generation or None when it was not read, local generation)
+Generation = Tuple[Optional[str], int]
+
+
+class ResponseCache:
+    """
+    Route-scoped JSON response cache
+
+    Values must be JSON-serialisable (use model_dump(mode="json")).
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, max_local_entries: int = 1024):
+        self.redis = redis_client
+        self.local = LRUCache(max_local_entries)
+        self._local_generations: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        if redis_client is not None:
+            self._get_script = redis_client.register_script(_GET_SCRIPT)
+            self._set_script = redis_client.register_script(_SET_SCRIPT)
+
+    def _count(self, route: str, outcome: str) -> None:
+        counters = self._stats.setdefault(route, {"hits": 0, "misses": 0, "redis_errors": 0})
+        counters[outcome] += 1
+
+    def _redis_error(self, route: str) -> None:
+        self._count(route, "redis_errors")
+        mark_redis_down()
+
+    def _use_redis(self) -> bool:
+        return self.redis is not None and redis_available()
+
+    def _local_key(self, route: str, key: str, generation: int) -> str:
+        return f"{route}:{generation}:{key}"
+
+    async def get(self, route: str, key: str) -> Tuple[Optional[Any], Generation]:
+        """
+        (cached value or None on a miss, generation read)
+
+        Pass the generation to set() when storing the value computed after a
+        miss.
+        """
+        local_generation = self._local_generations.get(route, 0)
+        redis_generation = None
+        value = None
+        if self._use_redis():
+            try:
+                redis_generation, raw = await self._get_script(
+                    keys=[f"{KEY_PREFIX}:{route}:generation"],
+                    args=[f"{KEY_PREFIX}:{route}:", key],
+                )
+                redis_generation = redis_generation.decode()
+                value = json.loads(raw) if raw is not None else None
+            except redis.RedisError:
+                self._redis_error(route)
+                redis_generation = None
+                value = self.local.get(self._local_key(route, key, local_generation))
+        else:
+            value = self.local.get(self._local_key(route, key, local_generation))
+
+        self._count(route, "hits" if value is not None else "misses")
+        return value, (redis_generation, local_generation)
+
+    async def set(self, route: str, key: str, value: Any, generation: Generation) -> None:
+        """
+        Store a value under the route's TTL
+
+        Skipped when the route was invalidated since the get() that returned
+        generation: the value may have been built from data read before it.
+        """
+        redis_generation, local_generation = generation
+        ttl = route_ttl(route)
+        if self._use_redis() and redis_generation is not None:
+            try:
+                await self._set_script(
+                    keys=[f"{KEY_PREFIX}:{route}:generation"],
+                    args=[f"{KEY_PREFIX}:{route}:", key, json.dumps(value, separators=(",", ":")), ttl, redis_generation],
+                )
+                return
+            except redis.RedisError:
+                self._redis_error(route)
+
+        if self._local_generations.get(route, 0) == local_generation:
+            self.local.set(self._local_key(route, key, local_generation), value, ttl)
+
+    async def invalidate(self, *routes: str) -> bool:
+        """
+        Retire every cached entry for the given routes
+
+        Returns True when the invalidation reached every process (through
+        Redis), False when only this process's entries were retired.
+        """
+        shared = self.redis is not None
+        for route in routes:
+            self._local_generations[route] = self._local_generations.get(route, 0) + 1
+            # Stop trying Redis for the remaining routes once one has failed
+            if self.redis is not None and shared:
+                try:
+                    await self.redis.incr(f"{KEY_PREFIX}:{route}:generation")
+                    mark_redis_up()
+                except redis.RedisError:
+                    self._redis_error(route)
+                    shared = False
+        return shared
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per route, for tuning TTLs"""
+        routes = {}
+        for route, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            routes[route] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+                "ttl_seconds": route_ttl(route),
+            }
+
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "redis_available": redis_available(),
+            "local_entries": len(self.local),
+            "routes": routes,
+        }
+
+
+def invalidation_skipped_message(*routes: str) -> str:
+    """Warning for scripts whose invalidation could not reach the API workers"""
+    ttl = max(route_ttl(route) for route in routes)
+    return (
+        f"⚠️  Cache not invalidated for the API ({', '.join(routes)}): Redis is not configured or not reachable; "
+        f"workers serve cached responses for up to {ttl} s"
+    )
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """Canonical key for a parameter set: unset (None) values dropped, keys sorted, hashed"""
+    canonical = {name: value for name, value in params.items() if value is not None}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+# Singleton instances
+_redis_client: Optional[redis.Redis] = None
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Shared Redis client, or None when REDIS_URL is not set"""
+    global _redis_client
+    if _redis_client is None:
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            _redis_client = redis.from_url(
+                redis_url,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+    return _redis_client
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the ResponseCache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            redis_client=get_redis(),
+            max_local_entries=int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024")),
+        )
+    return _response_cache
+
+
+async def close_redis():
+    """Close the shared Redis connection pool"""
+    global _redis_client, _response_cache
+    if _redis_client is not None:
+        await _redis_client.close()
+    _redis_client = None
+    _response_cache = None
@@ -0,0 +1,606 @@
+"""
+Catalog Engine
+In-memory columnar copy of the property catalog for search
+
+The catalog is read-heavy and only changes through the admin endpoints, so
+property search can be answered from NumPy column arrays instead of Postgres:
+- Filters become vectorised boolean masks over the columns
+- sort_by=distance sorts only the filtered rows, by distances computed per request
+- The other sort_by options keep a precomputed (sort key, id) permutation, so a
+  page is a masked slice of that permutation with no per-request sort
+- Admin writes patch the arrays and permutations in place
+
+Enable with CATALOG_ENGINE_ENABLED=True. Admin writes update the engine of the
+worker that served them immediately; other workers pick changes up from the
+periodic refresh (CATALOG_ENGINE_REFRESH_SECONDS, default 60).
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.database import get_session_maker
+from app.models.property import Property, amenity_keys
+from app.models.builder import Builder
+from app.schemas.property import PropertyFilters, PropertyResponse, BuilderInfo
+from app.services.geo import haversine_km, radius_box
+
+
+# Response fields kept per property; builder info is kept once per builder
+RECORD_FIELDS = [name for name in PropertyResponse.model_fields if name != "builder"]
+BUILDER_FIELDS = list(BuilderInfo.model_fields)
+
+# Extra typed columns loaded alongside the record for range filters
+NUMERIC_FIELDS = ["carpet_area_sqft", "price_per_sqft_inr"]
+
+# Presorted sort options; relevance needs Postgres text ranking
+SORT_FIELDS = ("price", "smart_score", "created_at")
+
+# Computed per request from near_lat/near_lng, so it has no presorted order
+DISTANCE_SORT = "distance"
+
+# A refresh that finds more than this share of rows changed (e.g. after a
+# scoring run) reloads everything instead of upserting row by row
+RELOAD_FRACTION = 0.05
+
+_FIELD_INDEX = {name: i for i, name in enumerate(RECORD_FIELDS)}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_LOW_64 = (1 << 64) - 1
+
+
+def _sort_key(field: str, value) -> float:
+    """Map a sort value (int, Decimal, datetime) onto the engine's numeric key"""
+    if field == "created_at":
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - _EPOCH) // timedelta(microseconds=1)
+    if field == "smart_score":
+        return float(value or 0)
+    return value
+
+
+def _optional_float(value) -> float:
+    """NULL becomes NaN so range comparisons drop it, matching SQL"""
+    return np.nan if value is None else float(value)
+
+
+class CatalogEngine:
+    """
+    Columnar property catalog
+
+    Rows live at positions 0..size-1. Each row keeps its response record and
+    builder id in Python lists, and its filter/sort columns in NumPy arrays at
+    the same position. Deleting a row moves the last row into its slot.
+    """
+
+    def __init__(self):
+        self._records: List[tuple] = []
+        self._positions: Dict[UUID, int] = {}
+        self._builders: Dict[UUID, Dict[str, Any]] = {}
+
+        # Distinct location/configuration strings and their codes
+        self._location_values: List[str] = []
+        self._location_codes_by_value: Dict[str, int] = {}
+        self._configuration_values: List[str] = []
+        self._configuration_codes_by_value: Dict[str, int] = {}
+
+        self._columns: Dict[str, np.ndarray] = {}
+        self._orders: Dict[str, np.ndarray] = {}
+
+        # High-water mark for incremental refresh
+        self.max_updated_at: Optional[datetime] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._records)
+
+    def is_current(self, max_updated_at: Optional[datetime], count: int) -> bool:
+        return self.max_updated_at == max_updated_at and self.size == count
+
+    # Loading
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Load every property and builder from the database
+
+        The columns are built on a fresh engine in a worker thread; this one
+        keeps answering until the result replaces its state.
+        """
+        columns = [getattr(Property, name) for name in RECORD_FIELDS + NUMERIC_FIELDS]
+        property_rows = (await db.execute(select(*columns))).all()
+
+        builder_columns = [getattr(Builder, name) for name in BUILDER_FIELDS]
+        builder_rows = (await db.execute(select(*builder_columns))).all()
+
+        fresh = CatalogEngine()
+        await asyncio.to_thread(fresh.load_rows, property_rows, builder_rows)
+        vars(self).update(vars(fresh))
+
+    def load_rows(self, property_rows, builder_rows) -> None:
+        """
+        Build all columns from row tuples
+
+        property_rows: RECORD_FIELDS values followed by NUMERIC_FIELDS values
+        builder_rows: BUILDER_FIELDS values
+        """
+        n_record = len(RECORD_FIELDS)
+        self._records = [tuple(row[:n_record]) for row in property_rows]
+        self._positions = {record[_FIELD_INDEX["id"]]: i for i, record in enumerate(self._records)}
+        self._builders = {row[0]: dict(zip(BUILDER_FIELDS, row)) for row in builder_rows}
+
+        self._location_values, self._location_codes_by_value = [], {}
+        self._configuration_values, self._configuration_codes_by_value = [], {}
+
+        n = len(property_rows)
+        self._columns = {
+            name: np.fromiter(values, dtype=dtype, count=n)
+            for name, dtype, values in self._column_values(property_rows)
+        }
+        self._orders = {field: self._full_order(field) for field in SORT_FIELDS}
+
+        updated = [record[_FIELD_INDEX["updated_at"]] for record in self._records]
+        updated = [value for value in updated if value is not None]
+        self.max_updated_at = max(updated) if updated else None
+
+    def _column_values(self, property_rows):
+        """(column name, dtype, value iterator) for every array column"""
+        n_record = len(RECORD_FIELDS)
+        f = _FIELD_INDEX
+        yield "price", np.int64, (row[f["price"]] for row in property_rows)
+        yield "smart_score", np.float64, (_sort_key("smart_score", row[f["smart_score"]]) for row in property_rows)
+        yield "created_at", np.int64, (_sort_key("created_at", row[f["created_at"]]) for row in property_rows)
+        yield "carpet_area", np.float64, (_optional_float(row[n_record]) for row in property_rows)
+        yield "price_per_sqft", np.float64, (_optional_float(row[n_record + 1]) for row in property_rows)
+        yield "latitude", np.float64, (float(row[f["latitude"]]) for row in property_rows)
+        yield "longitude", np.float64, (float(row[f["longitude"]]) for row in property_rows)
+        yield "group_buying", np.bool_, (row[f["supports_group_buying"]] == "true" for row in property_rows)
+        yield "location", np.int32, (self._location_code(row[f["location"]]) for row in property_rows)
+        yield "configuration", np.int32, (self._configuration_code(row[f["configuration"]]) for row in property_rows)
+        yield "id_high", np.uint64, (row[f["id"]].int >> 64 for row in property_rows)
+        yield "id_low", np.uint64, (row[f["id"]].int & _LOW_64 for row in property_rows)
+
+    def _location_code(self, value: str) -> int:
+        value = value or ""
+        if value not in self._location_codes_by_value:
+            self._location_codes_by_value[value] = len(self._location_values)
+            self._location_values.append(value)
+        return self._location_codes_by_value[value]
+
+    def _configuration_code(self, value: str) -> int:
+        value = value or ""
+        if value not in self._configuration_codes_by_value:
+            self._configuration_codes_by_value[value] = len(self._configuration_values)
+            self._configuration_values.append(value)
+        return self._configuration_codes_by_value[value]
+
+    def _full_order(self, field: str) -> np.ndarray:
+        """Positions sorted ascending by (sort key, id), like ORDER BY col, id"""
+        c = self._columns
+        return np.lexsort((c["id_low"], c["id_high"], c[field]))
+
+    # Incremental updates (admin writes)
+
+    def upsert(self, property_obj: Property) -> None:
+        """Insert or replace one property; its builder relationship should be loaded"""
+        builder = property_obj.__dict__.get("builder")
+        if builder is not None:
+            self._builders[builder.id] = {name: getattr(builder, name) for name in BUILDER_FIELDS}
+
+        record = tuple(getattr(property_obj, name) for name in RECORD_FIELDS)
+        numeric = tuple(getattr(property_obj, name) for name in NUMERIC_FIELDS)
+        self.upsert_row(record + numeric)
+
+    def upsert_row(self, row) -> None:
+        """Insert or replace one row given as RECORD_FIELDS + NUMERIC_FIELDS values"""
+        record = tuple(row[:len(RECORD_FIELDS)])
+        property_id = record[_FIELD_INDEX["id"]]
+        values = {name: next(iter(column_values)) for name, _, column_values in self._column_values([row])}
+
+        position = self._positions.get(property_id)
+        if position is None:
+            position = self.size
+            self._records.append(record)
+            self._positions[property_id] = position
+            for name, column in self._columns.items():
+                self._columns[name] = np.append(column, np.array([values[name]], dtype=column.dtype))
+        else:
+            self._records[position] = record
+            for field in SORT_FIELDS:
+                order = self._orders[field]
+                self._orders[field] = order[order != position]
+            for name, column in self._columns.items():
+                column[position] = values[name]
+
+        for field in SORT_FIELDS:
+            self._orders[field] = self._insert_into_order(field, position)
+
+        updated_at = record[_FIELD_INDEX["updated_at"]]
+        if updated_at is not None and (self.max_updated_at is None or updated_at > self.max_updated_at):
+            self.max_updated_at = updated_at
+
+    def _insert_into_order(self, field: str, position: int) -> np.ndarray:
+        """Insert a position into a sort permutation that does not contain it yet"""
+        c = self._columns
+        order = self._orders[field]
+        key = c[field][position]
+
+        keys = c[field][order]
+        start = np.searchsorted(keys, key, side="left")
+        stop = np.searchsorted(keys, key, side="right")
+
+        # Among equal keys, rows are ordered by id
+        tied = order[start:stop]
+        high, low = c["id_high"][position], c["id_low"][position]
+        smaller_ids = (c["id_high"][tied] < high) | ((c["id_high"][tied] == high) & (c["id_low"][tied] < low))
+
+        return np.insert(order, start + int(np.count_nonzero(smaller_ids)), position)
+
+    def remove(self, property_id: UUID) -> None:
+        """Drop one property, moving the last row into its slot"""
+        position = self._positions.pop(property_id, None)
+        if position is None:
+            return
+
+        last = self.size - 1
+        for field in SORT_FIELDS:
+            order = self._orders[field]
+            order = order[order != position]
+            order[order == last] = position
+            self._orders[field] = order
+
+        if position != last:
+            moved = self._records[last]
+            self._records[position] = moved
+            self._positions[moved[_FIELD_INDEX["id"]]] = position
+            for column in self._columns.values():
+                column[position] = column[last]
+
+        self._records.pop()
+        for name, column in self._columns.items():
+            self._columns[name] = column[:last].copy()
+
+    # Search
+
+    def can_serve(
+        self, filters: PropertyFilters, sort_by: str, catalog_version: Tuple[Optional[datetime], int],
+    ) -> bool:
+        """
+        Whether search() reproduces the SQL results for this request
+
+        catalog_version is the (max updated_at, row count) the caller read;
+        until the engine has caught up with it (writes made through another
+        worker or a script), requests go to Postgres so a response cached or
+        validated under that version never carries older data.
+        """
+        if not self.is_current(*catalog_version):
+            return False
+
+        if filters.q or sort_by not in SORT_FIELDS + (DISTANCE_SORT,):
+            return False
+
+        # ILIKE treats % and _ as wildcards; leave those patterns to Postgres
+        for pattern in (filters.location, filters.configuration):
+            if pattern and ("%" in pattern or "_" in pattern):
+                return False
+
+        return True
+
+    def search(
+        self,
+        filters: PropertyFilters,
+        sort_by: str,
+        descending: bool,
+        page: int,
+        limit: int,
+        keyset: Optional[Tuple[Any, UUID]] = None,
+        include_total: bool = True,
+    ):
+        """
+        Same contract as the SQL search path
+
+        Returns (properties, total, next_key): response dicts for the page, the
+        filtered total (None unless include_total), and the (sort value, id)
+        of the page's last row when another page exists.
+        """
+        mask = self._filter_mask(filters)
+        total = int(np.count_nonzero(mask)) if include_total else None
+
+        if sort_by == DISTANCE_SORT:
+            return self._search_by_distance(filters, mask, descending, page, limit, keyset, total)
+
+        if keyset:
+            mask &= self._after_mask(sort_by, descending, *keyset)
+
+        # Walk the presorted permutation, keeping matching rows
+        order = self._orders[sort_by]
+        matches = np.flatnonzero(mask[order])
+        if descending:
+            matches = matches[::-1]
+
+        start = 0 if keyset else (page - 1) * limit
+        positions = order[matches[start:start + limit + 1]]
+
+        properties = [self._response(position) for position in positions[:limit]]
+
+        next_key = None
+        if len(positions) > limit:
+            record = self._records[positions[limit - 1]]
+            next_key = (record[_FIELD_INDEX[sort_by]], record[_FIELD_INDEX["id"]])
+
+        return properties, total, next_key
+
+    def _search_by_distance(self, filters, mask, descending, page, limit, keyset, total):
+        """search() for sort_by=distance: sort only the filtered rows by computed distance"""
+        c = self._columns
+        candidates = np.flatnonzero(mask)
+        distances = haversine_km(
+            filters.near_lat, filters.near_lng, c["latitude"][candidates], c["longitude"][candidates]
+        )
+
+        if keyset:
+            after = self._after(distances, candidates, descending, *keyset)
+            candidates, distances = candidates[after], distances[after]
+
+        order = np.lexsort((c["id_low"][candidates], c["id_high"][candidates], distances))
+        if descending:
+            order = order[::-1]
+
+        start = 0 if keyset else (page - 1) * limit
+        selected = order[start:start + limit + 1]
+        positions = candidates[selected]
+
+        properties = [self._response(position) for position in positions[:limit]]
+
+        next_key = None
+        if len(positions) > limit:
+            last = selected[limit - 1]
+            next_key = (float(distances[last]), self._records[positions[limit - 1]][_FIELD_INDEX["id"]])
+
+        return properties, total, next_key
+
+    def _filter_mask(self, filters: PropertyFilters) -> np.ndarray:
+        """Boolean mask of rows matching the filters"""
+        c = self._columns
+        mask = np.ones(self.size, dtype=bool)
+
+        if filters.location:
+            mask &= self._contains_mask(self._location_values, c["location"], filters.location)
+
+        if filters.min_price is not None:
+            mask &= c["price"] >= filters.min_price
+
+        if filters.max_price is not None:
+            mask &= c["price"] <= filters.max_price
+
+        if filters.configuration:
+            mask &= self._contains_mask(self._configuration_values, c["configuration"], filters.configuration)
+
+        if filters.min_carpet_area is not None:
+            mask &= c["carpet_area"] >= filters.min_carpet_area
+
+        if filters.max_carpet_area is not None:
+            mask &= c["carpet_area"] <= filters.max_carpet_area
+
+        if filters.min_price_per_sqft is not None:
+            mask &= c["price_per_sqft"] >= filters.min_price_per_sqft
+
+        if filters.max_price_per_sqft is not None:
+            mask &= c["price_per_sqft"] <= filters.max_price_per_sqft
+
+        if filters.group_buying_only:
+            mask &= c["group_buying"]
+
+        if filters.bbox:
+            west, south, east, north = filters.bbox
+            mask &= self._box_mask(south, west, north, east)
+
+        if filters.amenities:
+            # Set test per remaining row, after the vectorised filters narrowed them
+            wanted = set(filters.amenities)
+            amenities_index = _FIELD_INDEX["amenities"]
+            candidates = np.flatnonzero(mask)
+            # Records keep the display names; filters arrive lowercased
+            if filters.amenities_match == "all":
+                matches = (wanted.issubset(amenity_keys(self._records[i][amenities_index] or ())) for i in candidates)
+            else:
+                matches = (not wanted.isdisjoint(amenity_keys(self._records[i][amenities_index] or ())) for i in candidates)
+            mask[candidates] = np.fromiter(matches, dtype=bool, count=len(candidates))
+
+        if filters.radius_km is not None:
+            # Cheap box test first; haversine only for rows inside it
+            mask &= self._box_mask(*radius_box(filters.near_lat, filters.near_lng, filters.radius_km))
+            candidates = np.flatnonzero(mask)
+            distances = haversine_km(
+                filters.near_lat, filters.near_lng, c["latitude"][candidates], c["longitude"][candidates]
+            )
+            mask[candidates[distances > filters.radius_km]] = False
+
+        return mask
+
+    def _box_mask(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        c = self._columns
+        return (
+            (c["latitude"] >= south) & (c["latitude"] <= north)
+            & (c["longitude"] >= west) & (c["longitude"] <= east)
+        )
+
+    @staticmethod
+    def _contains_mask(values: List[str], codes: np.ndarray, pattern: str) -> np.ndarray:
+        """ILIKE '%pattern%': match each distinct value once, then gather by code"""
+        pattern = pattern.lower()
+        matching = np.fromiter((pattern in value.lower() for value in values), dtype=bool, count=len(values))
+        return matching[codes]
+
+    def facets(self, filters: PropertyFilters, price_thresholds: List[int]) -> Dict[str, Any]:
+        """
+        Counts per location, configuration, price bucket and group buying
+
+        Price bucket i holds prices with i thresholds at or below them, like
+        Postgres width_bucket(price, thresholds).
+        """
+        c = self._columns
+        mask = self._filter_mask(filters)
+
+        def value_counts(values: List[str], codes: np.ndarray) -> Dict[str, int]:
+            counts = np.bincount(codes[mask], minlength=len(values))
+            return {values[code]: int(count) for code, count in enumerate(counts) if count}
+
+        buckets = np.searchsorted(np.asarray(price_thresholds), c["price"][mask], side="right")
+        bucket_counts = np.bincount(buckets, minlength=len(price_thresholds) + 1)
+
+        return {
+            "total": int(np.count_nonzero(mask)),
+            "locations": value_counts(self._location_values, c["location"]),
+            "configurations": value_counts(self._configuration_values, c["configuration"]),
+            "price_buckets": {bucket: int(count) for bucket, count in enumerate(bucket_counts) if count},
+            "group_buying": int(np.count_nonzero(c["group_buying"][mask])),
+        }
+
+    def _after_mask(self, sort_by: str, descending: bool, last_value, last_id: UUID) -> np.ndarray:
+        """Rows strictly after (last_value, last_id) in the requested direction"""
+        return self._after(self._columns[sort_by], slice(None), descending, _sort_key(sort_by, last_value), last_id)
+
+    def _after(self, key: np.ndarray, positions, descending: bool, last_key, last_id: UUID) -> np.ndarray:
+        """(key, id) strictly after (last_key, last_id) for the rows at positions"""
+        id_high, id_low = self._columns["id_high"][positions], self._columns["id_low"][positions]
+        high, low = np.uint64(last_id.int >> 64), np.uint64(last_id.int & _LOW_64)
+
+        if descending:
+            ids_after = (id_high < high) | ((id_high == high) & (id_low < low))
+            return (key < last_key) | ((key == last_key) & ids_after)
+
+        ids_after = (id_high > high) | ((id_high == high) & (id_low > low))
+        return (key > last_key) | ((key == last_key) & ids_after)
+
+    def get(self, property_id: UUID) -> Optional[Dict[str, Any]]:
+        """PropertyResponse-shaped dict for one property, or None"""
+        position = self._positions.get(property_id)
+        return self._response(position) if position is not None else None
+
+    def _response(self, position: int) -> Dict[str, Any]:
+        """PropertyResponse-shaped dict for one row"""
+        record = self._records[position]
+        response = dict(zip(RECORD_FIELDS, record))
+        response["builder"] = self._builders.get(record[_FIELD_INDEX["builder_id"]])
+        return response
+
+    # Cross-worker refresh
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """
+        Catch up with writes made through other workers
+
+        Rows updated since the last load are upserted; if the row count still
+        disagrees (a delete happened elsewhere), or more than RELOAD_FRACTION
+        of the rows changed, the catalog is reloaded instead.
+        """
+        changed_count = func.count(Property.id)
+        if self.max_updated_at is not None:
+            changed_count = changed_count.filter(Property.updated_at > self.max_updated_at)
+        result = await db.execute(select(func.count(Property.id), func.max(Property.updated_at), changed_count))
+        count, max_updated_at, changed_count = result.one()
+
+        if changed_count > RELOAD_FRACTION * max(self.size, 1):
+            await self.load(db)
+            return
+
+        if changed_count:
+            query = select(Property).options(joinedload(Property.builder))
+            if self.max_updated_at is not None:
+                query = query.where(Property.updated_at > self.max_updated_at)
+            changed = await db.execute(query)
+            for property_obj in changed.scalars().unique().all():
+                self.upsert(property_obj)
+
+        if count != self.size:
+            await self.load(db)
+        else:
+            # Every row newer than the old mark is in; a delete of the newest
+            # row can still leave the mark above the table's
+            self.max_updated_at = max_updated_at
+
+
+# Singleton instance
+_catalog_engine: Optional[CatalogEngine] = None
+_refresh_task: Optional[asyncio.Task] = None
+_reload_task: Optional[asyncio.Task] = None
+
+
+def catalog_engine_enabled() -> bool:
+    """Whether the in-memory engine is switched on for this deployment"""
+    return os.getenv("CATALOG_ENGINE_ENABLED", "False") == "True"
+
+
+def get_catalog_engine() -> Optional[CatalogEngine]:
+    """The loaded engine, or None when disabled or not loaded (search uses SQL)"""
+    return _catalog_engine
+
+
+async def _refresh_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        if _catalog_engine is None:
+            continue
+        try:
+            async with get_session_maker()() as session:
+                await _catalog_engine.refresh(session)
+        except Exception as e:
+            print(f"⚠️  Catalog engine refresh failed: {e}")
+
+
+async def _load_catalog_engine() -> bool:
+    """Load a fresh engine and publish it; False (search uses SQL) on failure"""
+    global _catalog_engine
+    try:
+        engine = CatalogEngine()
+        async with get_session_maker()() as session:
+            await engine.load(session)
+        _catalog_engine = engine
+        print(f"📚 Catalog engine loaded {engine.size} properties")
+        return True
+    except Exception as e:
+        print(f"⚠️  Catalog engine failed to load, using SQL search: {e}")
+        return False
+
+
+async def start_catalog_engine():
+    """Load the engine at startup if enabled; search keeps using SQL if loading fails"""
+    global _refresh_task
+    if not catalog_engine_enabled():
+        return
+
+    if not await _load_catalog_engine():
+        return
+
+    interval = float(os.getenv("CATALOG_ENGINE_REFRESH_SECONDS", "60"))
+    if interval > 0:
+        _refresh_task = asyncio.create_task(_refresh_loop(interval))
+
+
+def discard_catalog_engine() -> None:
+    """
+    Drop the engine after a failed update and reload it in the background
+
+    Search uses SQL until the fresh engine is published.
+    """
+    global _catalog_engine, _reload_task
+    _catalog_engine = None
+    if _reload_task is None or _reload_task.done():
+        _reload_task = asyncio.create_task(_load_catalog_engine())
+
+
+async def stop_catalog_engine():
+    """Stop the refresh task and drop the engine"""
+    global _catalog_engine, _refresh_task, _reload_task
+    for task in (_refresh_task, _reload_task):
+        if task is not None:
+            task.cancel()
+    _refresh_task = _reload_task = None
+    _catalog_engine = None
@@ -0,0 +1,162 @@
+"""
+Commute Cache Service
+Memory and Redis tiers in front of the commute_cache table
+
+Lookups go memory -> Redis -> commute_cache and fill the faster tiers on the
+way back (read-through); new results are written to every tier
+(write-through). Keys are the quantised (origin cell, destination cell,
+mode, maps backend) of the table's unique index, so all three tiers agree
+on what counts as the same trip, and results from one backend (e.g. the
+straight-line mock) are never served once another is configured.
+
+- memory: bounded LRU per worker (COMMUTE_CACHE_LOCAL_MAX_ENTRIES,
+  COMMUTE_CACHE_LOCAL_TTL seconds)
+- redis: shared by all workers (COMMUTE_CACHE_REDIS_TTL seconds); Redis
+  evicts under memory pressure according to its maxmemory-policy, and is
+  skipped while marked down after an error (see app.services.cache)
+"""
+
+import json
+import os
+from typing import Optional, Any, Dict, List, Tuple
+
+import redis.asyncio as redis
+
+from app.services.cache import LRUCache, get_redis, redis_available, mark_redis_down
+
+
+KEY_PREFIX = "hyrebuy:commute"
+
+# Tiers reported in responses, fastest first
+MEMORY_TIER = "memory"
+REDIS_TIER = "redis"
+DATABASE_TIER = "database"
+
+
+def commute_key(origin_cell: int, dest_cell: int, mode: str, backend: str) -> str:
+    return f"{origin_cell}:{dest_cell}:{mode}:{backend}"
+
+
+class CommuteResultCache:
+    """Memory + Redis tiers for commute results (dicts as returned by MapsService)"""
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        max_local_entries: int = 10000,
+        local_ttl: float = 3600,
+        redis_ttl: int = 7 * 24 * 3600,
+    ):
+        self.redis = redis_client
+        self.local = LRUCache(max_local_entries)
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0}
+
+    def _redis_error(self) -> None:
+        self._stats["redis_errors"] += 1
+        mark_redis_down()
+
+    def _use_redis(self) -> bool:
+        return self.redis is not None and redis_available()
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(result, tier that had it), or (None, None) when neither tier has it"""
+        value = self.local.get(key)
+        if value is not None:
+            self._stats["memory_hits"] += 1
+            return value, MEMORY_TIER
+
+        if self._use_redis():
+            try:
+                raw = await self.redis.get(f"{KEY_PREFIX}:{key}")
+            except redis.RedisError:
+                self._redis_error()
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value, self.local_ttl)
+                self._stats["redis_hits"] += 1
+                return value, REDIS_TIER
+
+        self._stats["misses"] += 1
+        return None, None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in both tiers"""
+        self.local.set(key, value, self.local_ttl)
+        if self._use_redis():
+            try:
+                await self.redis.set(
+                    f"{KEY_PREFIX}:{key}", json.dumps(value, separators=(",", ":")), ex=self.redis_ttl
+                )
+            except redis.RedisError:
+                self._redis_error()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+        """{key: (result, tier)} for the keys either tier has: one MGET for the memory misses"""
+        found = {}
+        remote = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = (value, MEMORY_TIER)
+            else:
+                remote.append(key)
+        self._stats["memory_hits"] += len(found)
+
+        if remote and self._use_redis():
+            try:
+                raws = await self.redis.mget([f"{KEY_PREFIX}:{key}" for key in remote])
+            except redis.RedisError:
+                self._redis_error()
+                raws = [None] * len(remote)
+            for key, raw in zip(remote, raws):
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local.set(key, value, self.local_ttl)
+                    self._stats["redis_hits"] += 1
+                    found[key] = (value, REDIS_TIER)
+
+        self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    async def set_many(self, values: Dict[str, Dict[str, Any]]) -> None:
+        """Store several results in both tiers: one pipelined round trip to Redis"""
+        for key, value in values.items():
+            self.local.set(key, value, self.local_ttl)
+        if values and self._use_redis():
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, value in values.items():
+                    pipe.set(f"{KEY_PREFIX}:{key}", json.dumps(value, separators=(",", ":")), ex=self.redis_ttl)
+                await pipe.execute()
+            except redis.RedisError:
+                self._redis_error()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters per tier (per worker process)"""
+        lookups = self._stats["memory_hits"] + self._stats["redis_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round((lookups - self._stats["misses"]) / lookups, 4) if lookups else None,
+            "local_entries": len(self.local),
+            "backend": "redis" if self.redis is not None else "memory",
+        }
+
+
+# Singleton instance
+_commute_cache: Optional[CommuteResultCache] = None
+
+
+def get_commute_cache() -> CommuteResultCache:
+    """Get or create the CommuteResultCache singleton"""
+    global _commute_cache
+    if _commute_cache is None:
+        _commute_cache = CommuteResultCache(
+            redis_client=get_redis(),
+            max_local_entries=int(os.getenv("COMMUTE_CACHE_LOCAL_MAX_ENTRIES", "10000")),
+            local_ttl=float(os.getenv("COMMUTE_CACHE_LOCAL_TTL", "3600")),
+            redis_ttl=int(os.getenv("COMMUTE_CACHE_REDIS_TTL", str(7 * 24 * 3600))),
+        )
+    return _commute_cache
@@ -0,0 +1,176 @@
+"""
+Commute Scores Service
+Precomputed commutes from every GCC office to every property
+
+commute_scores holds one row per (property, office) pair: the free-flow
+commute plus morning and evening peak estimates. A refresh goes office by
+office, sends chunks of properties to MapsService.calculate_commutes (one
+vectorised row with the mock, one graph search with the local backend, 25
+destinations per request with Google), and upserts each chunk on the
+unique (property_id, company_id) index, committing as it goes: an
+interrupted run keeps its progress and an incremental run finishes it.
+
+- full: every pair
+- incremental: pairs without a row (new properties or offices, or
+  properties whose coordinates changed, whose rows admin writes delete)
+
+current_minutes and traffic_level describe the time of calculation (IST);
+readers that show live values use current_estimate() on the stored columns.
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional, Dict, Any, List, Tuple
+
+from sqlalchemy import select, cast, and_, true, func, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.property import Property
+from app.models.gcc_company import GCCCompany
+from app.models.commute_score import CommuteScore
+from app.services.maps import get_maps_service
+
+
+# Peak-hour duration vs normal traffic
+PEAK_MORNING_MULTIPLIER = 1.5   # 8-10 AM
+PEAK_EVENING_MULTIPLIER = 1.6   # 6-8 PM
+PEAK_MORNING_HOURS = range(8, 10)
+PEAK_EVENING_HOURS = range(18, 20)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Properties per calculate_commutes call and per upsert (11 parameters a row)
+DEFAULT_CHUNK_SIZE = 500
+
+# Columns replaced when a pair is recalculated
+SCORE_FIELDS = [
+    "distance_km", "duration_seconds", "normal_minutes", "peak_morning_minutes",
+    "peak_evening_minutes", "current_minutes", "traffic_level", "calculated_at",
+]
+
+
+@dataclass
+class CommuteScoreResult:
+    """Outcome of one commute_scores refresh"""
+    mode: str
+    pairs: int
+    written: int
+    failed: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "pairs": self.pairs, "written": self.written, "failed": self.failed}
+
+
+def current_estimate(normal: float, peak_morning: float, peak_evening: float, at: Optional[datetime] = None) -> Tuple[float, str]:
+    """(minutes, traffic_level) for the time of day at `at` (default now) in Hyderabad"""
+    hour = (at or datetime.now(timezone.utc)).astimezone(IST).hour
+    if hour in PEAK_MORNING_HOURS:
+        return peak_morning, "heavy"
+    if hour in PEAK_EVENING_HOURS:
+        return peak_evening, "heavy"
+    return normal, "normal"
+
+
+def _score_row(property_id, company_id, commute: Dict[str, Any], at: datetime) -> Dict[str, Any]:
+    """commute_scores column values for one calculated commute"""
+    normal = commute["duration_seconds"] / 60
+    peak_morning = normal * PEAK_MORNING_MULTIPLIER
+    peak_evening = normal * PEAK_EVENING_MULTIPLIER
+    current, traffic_level = current_estimate(normal, peak_morning, peak_evening, at)
+    return {
+        "id": uuid.uuid4(),
+        "property_id": property_id,
+        "company_id": company_id,
+        "distance_km": Decimal(f"{commute['distance_meters'] / 1000:.2f}"),
+        "duration_seconds": str(commute["duration_seconds"]),
+        "normal_minutes": f"{normal:.1f}",
+        "peak_morning_minutes": f"{peak_morning:.1f}",
+        "peak_evening_minutes": f"{peak_evening:.1f}",
+        "current_minutes": f"{current:.1f}",
+        "traffic_level": traffic_level,
+        "calculated_at": at,
+    }
+
+
+async def _store_scores(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert or replace scores on the unique (property_id, company_id) index"""
+    statement = pg_insert(CommuteScore).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CommuteScore.property_id, CommuteScore.company_id],
+        set_={**{name: statement.excluded[name] for name in SCORE_FIELDS}, "updated_at": func.now()},
+    ))
+
+
+async def refresh_commute_scores(
+    db: AsyncSession,
+    incremental: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    maps_service=None,
+) -> CommuteScoreResult:
+    """
+    Calculate and upsert office -> property commutes (driving)
+
+    Commits after every chunk. Pairs without a route are counted in
+    `failed` and left without a row, so the next incremental run retries
+    them.
+    """
+    maps_service = maps_service or get_maps_service()
+    mode = "incremental" if incremental else "full"
+
+    office_rows = (await db.execute(
+        select(GCCCompany.id, cast(GCCCompany.latitude, Float), cast(GCCCompany.longitude, Float))
+    )).all()
+    offices = {row[0]: (row[1], row[2]) for row in office_rows}
+
+    # Destinations per office: (property_id, lat, lng)
+    work: Dict[Any, List[Tuple[Any, float, float]]] = {}
+    if incremental:
+        missing = (await db.execute(
+            select(GCCCompany.id, Property.id, cast(Property.latitude, Float), cast(Property.longitude, Float))
+            .select_from(Property)
+            .join(GCCCompany, true())
+            .outerjoin(CommuteScore, and_(
+                CommuteScore.property_id == Property.id,
+                CommuteScore.company_id == GCCCompany.id,
+            ))
+            .where(CommuteScore.id.is_(None))
+        )).all()
+        for company_id, property_id, lat, lng in missing:
+            work.setdefault(company_id, []).append((property_id, lat, lng))
+    else:
+        properties = [tuple(row) for row in (await db.execute(
+            select(Property.id, cast(Property.latitude, Float), cast(Property.longitude, Float))
+        )).all()]
+        if properties:
+            work = {company_id: properties for company_id in offices}
+
+    pairs = written = failed = 0
+    for company_id, destinations in work.items():
+        origin_lat, origin_lng = offices[company_id]
+        for start in range(0, len(destinations), chunk_size):
+            chunk = destinations[start:start + chunk_size]
+            commutes = await maps_service.calculate_commutes(
+                origin_lat=origin_lat,
+                origin_lng=origin_lng,
+                destinations=[(lat, lng) for _, lat, lng in chunk],
+                mode="driving",
+            )
+
+            at = datetime.now(timezone.utc)
+            rows = [
+                _score_row(property_id, company_id, commute, at)
+                for (property_id, _, _), commute in zip(chunk, commutes)
+                if not isinstance(commute, str)
+            ]
+            pairs += len(chunk)
+            failed += len(chunk) - len(rows)
+
+            if rows:
+                await _store_scores(db, rows)
+                await db.commit()
+                written += len(rows)
+
+    return CommuteScoreResult(mode, pairs, written, failed)
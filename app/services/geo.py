@@ -0,0 +1,111 @@
+"""
+Geo Utilities
+Spatial helpers for map-driven property search
+
+Properties carry a geo_cell: a 52-bit Z-order (geohash-style) key that
+interleaves 26 longitude bits with 26 latitude bits. Any geohash prefix is a
+contiguous integer range of geo_cell, so a map viewport or search radius is
+covered by a handful of B-tree range scans instead of a full-table distance
+computation. Exact bbox/distance checks then run only on the covered rows.
+"""
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+# Bits per axis in geo_cell (~0.6 m latitude resolution)
+CELL_BITS = 26
+
+# Upper bound on cells used to cover one query region
+MAX_COVER_CELLS = 16
+
+# Bits per axis in commute cache keys (~76 m latitude, ~146 m longitude at Hyderabad)
+COMMUTE_CELL_BITS = 18
+
+
+def _interleave(lng_index: int, lat_index: int, bits: int) -> int:
+    """Z-order key: longitude bit first in every pair, like geohash"""
+    key = 0
+    for bit in range(bits - 1, -1, -1):
+        key = (key << 1) | ((lng_index >> bit) & 1)
+        key = (key << 1) | ((lat_index >> bit) & 1)
+    return key
+
+
+def _axis_index(value: float, low: float, span: float, bits: int) -> int:
+    """Grid index of a coordinate at the given number of bits"""
+    cells = 1 << bits
+    index = int((value - low) / span * cells)
+    return min(max(index, 0), cells - 1)
+
+
+def geo_cell(lat: float, lng: float) -> int:
+    """Full-precision Z-order key for a point"""
+    lat_index = _axis_index(float(lat), -90.0, 180.0, CELL_BITS)
+    lng_index = _axis_index(float(lng), -180.0, 360.0, CELL_BITS)
+    return _interleave(lng_index, lat_index, CELL_BITS)
+
+
+def commute_cell(lat: float, lng: float) -> int:
+    """
+    Coarse Z-order key for commute caching
+
+    A geo_cell prefix: points within the same ~100 m cell share commute
+    results, so a cache lookup is one exact match instead of coordinate ranges.
+    """
+    return geo_cell(lat, lng) >> (2 * (CELL_BITS - COMMUTE_CELL_BITS))
+
+
+def cover_ranges(south: float, west: float, north: float, east: float) -> List[Tuple[int, int]]:
+    """
+    geo_cell ranges [start, end) covering a lat/lng box
+
+    Picks the finest grid level at which the box spans at most
+    MAX_COVER_CELLS cells, then merges cells that are adjacent in Z-order.
+    """
+    bits = CELL_BITS
+    while bits > 0:
+        lat_cells = _axis_index(north, -90.0, 180.0, bits) - _axis_index(south, -90.0, 180.0, bits) + 1
+        lng_cells = _axis_index(east, -180.0, 360.0, bits) - _axis_index(west, -180.0, 360.0, bits) + 1
+        if lat_cells * lng_cells <= MAX_COVER_CELLS:
+            break
+        bits -= 1
+
+    shift = 2 * (CELL_BITS - bits)
+    starts = sorted(
+        _interleave(lng_index, lat_index, bits)
+        for lat_index in range(_axis_index(south, -90.0, 180.0, bits), _axis_index(north, -90.0, 180.0, bits) + 1)
+        for lng_index in range(_axis_index(west, -180.0, 360.0, bits), _axis_index(east, -180.0, 360.0, bits) + 1)
+    )
+
+    ranges: List[Tuple[int, int]] = []
+    for start in starts:
+        if ranges and ranges[-1][1] == start << shift:
+            ranges[-1] = (ranges[-1][0], (start + 1) << shift)
+        else:
+            ranges.append((start << shift, (start + 1) << shift))
+    return ranges
+
+
+def radius_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) box enclosing a circle"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    lng_delta = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(lat - lat_delta, -90.0),
+        max(lng - lng_delta, -180.0),
+        min(lat + lat_delta, 90.0),
+        min(lng + lng_delta, 180.0),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km; accepts scalars or NumPy arrays (broadcasts)"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
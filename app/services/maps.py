@@ -6,12 +6,43 @@ Handles all Google Maps API interactions:
 - Distance Matrix API for commute calculations
 - Geocoding (future)
 - Places API (future)
+
+Backends: "google" (Distance Matrix), "mock" (straight-line estimates) and
+"local" (shortest paths over an OSM road graph, see routing.py). MAPS_BACKEND
+picks one for get_maps_service; otherwise use_mock decides between mock and
+google.
+
+AsyncMapsService (handed out by get_maps_service) calls the Distance
+Matrix web service over one pooled httpx client, so a request waiting on
+Google does not block the event loop. MapsService, on the synchronous
+googlemaps client, remains for scripts.
 """
 
+import asyncio
+import random
 import googlemaps
-from typing import Optional, Dict, Any
+import httpx
+from typing import Optional, Dict, Any, List, Tuple
 import os
 from datetime import datetime
+from math import radians, cos, sin, asin, sqrt
+
+from app.services.commute_matrix import commute_matrix, SPEED_KMH, DEFAULT_SPEED_KMH, TRAFFIC_FACTOR
+from app.services.geo import EARTH_RADIUS_KM
+from app.services.routing import get_road_router, load_road_router
+
+
+# Distance Matrix allows at most 25 origins or destinations per request
+MAX_DESTINATIONS_PER_REQUEST = 25
+
+MAPS_BACKENDS = ("google", "mock", "local")
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Transient failures worth another attempt: HTTP statuses and Distance Matrix statuses
+RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
 
 class MapsService:
     """
@@ -21,17 +52,18 @@ class MapsService:
     Switch to real API key in production.
     """
 
-    def __init__(self, api_key: Optional[str] = None, use_mock: bool = True):
+    def __init__(self, api_key: Optional[str] = None, use_mock: bool = True, backend: Optional[str] = None):
         """
         Initialize Maps Service
 
         Args:
             api_key: Google Maps API key (optional if using mock)
             use_mock: If True, returns mock data instead of calling real API
+            backend: "google", "mock" or "local" (overrides use_mock)
         """
-        self.use_mock = use_mock
+        self._init_backend(use_mock, backend)
 
-        if not use_mock:
+        if self.backend == "google":
             if not api_key:
                 api_key = os.getenv("GOOGLE_MAPS_API_KEY")
 
@@ -42,6 +74,13 @@ class MapsService:
         else:
             self.client = None
 
+    def _init_backend(self, use_mock: bool, backend: Optional[str], load_router: bool = True) -> None:
+        self.backend = backend or ("mock" if use_mock else "google")
+        if self.backend not in MAPS_BACKENDS:
+            raise ValueError(f"Unknown maps backend {self.backend!r}; expected one of {', '.join(MAPS_BACKENDS)}")
+        self.use_mock = self.backend == "mock"
+        self.router = get_road_router() if self.backend == "local" and load_router else None
+
     def calculate_commute(
         self,
         origin_lat: float,
@@ -73,6 +112,9 @@ class MapsService:
                 mode
             )
 
+        if self.router is not None:
+            return self._local_commute(origin_lat, origin_lng, dest_lat, dest_lng, mode)
+
         # Real Google Maps API call
         origin = f"{origin_lat},{origin_lng}"
         destination = f"{dest_lat},{dest_lng}"
@@ -91,26 +133,113 @@ class MapsService:
             )
 
             # Extract data from response
-            if result['status'] == 'OK':
-                element = result['rows'][0]['elements'][0]
-
-                if element['status'] == 'OK':
-                    return {
-                        'distance_meters': element['distance']['value'],
-                        'distance_text': element['distance']['text'],
-                        'duration_seconds': element['duration']['value'],
-                        'duration_text': element['duration']['text'],
-                        'duration_in_traffic_seconds': element.get('duration_in_traffic', {}).get('value'),
-                        'duration_in_traffic_text': element.get('duration_in_traffic', {}).get('text'),
-                    }
-                else:
-                    raise Exception(f"Route not found: {element['status']}")
-            else:
+            if result['status'] != 'OK':
                 raise Exception(f"Distance Matrix API error: {result['status']}")
 
+            commute = self._parse_element(result['rows'][0]['elements'][0])
+            if isinstance(commute, str):
+                raise Exception(commute)
+            return commute
+
         except Exception as e:
             raise Exception(f"Failed to calculate commute: {str(e)}")
 
+    def calculate_commutes(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]],
+        mode: str = "driving",
+        departure_time: Optional[datetime] = None
+    ) -> List[Any]:
+        """
+        Calculate commutes from one origin to many destinations
+
+        Sends one Distance Matrix request per MAX_DESTINATIONS_PER_REQUEST
+        destinations. Returns one entry per destination, in order: the
+        commute dict, or an error message (str) for a destination with no
+        route. A failed request raises.
+        """
+        if self.use_mock:
+            return self._mock_commutes(origin_lat, origin_lng, destinations, mode)
+
+        if self.router is not None:
+            return self._local_commutes(origin_lat, origin_lng, destinations, mode)
+
+        if not departure_time:
+            departure_time = datetime.now()
+
+        results = []
+        for start in range(0, len(destinations), MAX_DESTINATIONS_PER_REQUEST):
+            chunk = destinations[start:start + MAX_DESTINATIONS_PER_REQUEST]
+            try:
+                result = self.client.distance_matrix(
+                    origins=[f"{origin_lat},{origin_lng}"],
+                    destinations=[f"{dest_lat},{dest_lng}" for dest_lat, dest_lng in chunk],
+                    mode=mode,
+                    departure_time=departure_time,
+                    traffic_model="best_guess"
+                )
+            except Exception as e:
+                raise Exception(f"Failed to calculate commutes: {str(e)}")
+
+            if result['status'] != 'OK':
+                raise Exception(f"Distance Matrix API error: {result['status']}")
+
+            results.extend(self._parse_element(element) for element in result['rows'][0]['elements'])
+
+        return results
+
+    @staticmethod
+    def _parse_element(element: Dict[str, Any]) -> Any:
+        """Commute dict for one Distance Matrix element, or an error message"""
+        if element['status'] != 'OK':
+            return f"Route not found: {element['status']}"
+
+        return {
+            'distance_meters': element['distance']['value'],
+            'distance_text': element['distance']['text'],
+            'duration_seconds': element['duration']['value'],
+            'duration_text': element['duration']['text'],
+            'duration_in_traffic_seconds': element.get('duration_in_traffic', {}).get('value'),
+            'duration_in_traffic_text': element.get('duration_in_traffic', {}).get('text'),
+        }
+
+    def _local_commute(self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float, mode: str) -> Dict[str, Any]:
+        """Shortest-path commute over the local road graph"""
+        commute = self._local_commutes(origin_lat, origin_lng, [(dest_lat, dest_lng)], mode, single_pair=True)[0]
+        if isinstance(commute, str):
+            raise Exception(f"Failed to calculate commute: {commute}")
+        return commute
+
+    def _local_commutes(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]],
+        mode: str,
+        single_pair: bool = False
+    ) -> List[Any]:
+        """Shortest-path commutes over the local road graph (error message where there is no route)"""
+        routes = self.router.routes(origin_lat, origin_lng, destinations, mode, single_pair=single_pair)
+        results = []
+        for route in routes:
+            if route is None:
+                results.append("Route not found: NO_ROUTE")
+                continue
+            seconds, meters = route
+            duration_seconds = int(seconds)
+            duration_in_traffic_seconds = int(duration_seconds * TRAFFIC_FACTOR) if mode == 'driving' else None
+            results.append({
+                'distance_meters': int(meters),
+                'distance_text': f"{meters / 1000:.1f} km",
+                'duration_seconds': duration_seconds,
+                'duration_text': self._format_duration(duration_seconds),
+                'duration_in_traffic_seconds': duration_in_traffic_seconds,
+                'duration_in_traffic_text': self._format_duration(duration_in_traffic_seconds) if duration_in_traffic_seconds is not None else None,
+            })
+        return results
+
     def _mock_commute_calculation(
         self,
         origin_lat: float,
@@ -124,9 +253,6 @@ class MapsService:
 
         Calculates approximate time based on straight-line distance
         """
-        # Calculate approximate distance using Haversine formula
-        from math import radians, cos, sin, asin, sqrt
-
         # Convert to radians
         lon1, lat1, lon2, lat2 = map(radians, [origin_lng, origin_lat, dest_lng, dest_lat])
 
@@ -136,29 +262,20 @@ class MapsService:
         a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
         c = 2 * asin(sqrt(a))
 
-        # Radius of earth in kilometers
-        r = 6371
-        distance_km = c * r
+        distance_km = c * EARTH_RADIUS_KM
         distance_meters = int(distance_km * 1000)
 
         # Estimate time based on mode
-        speed_kmh = {
-            'driving': 40,      # Average city driving speed
-            'transit': 25,      # Public transit
-            'walking': 5,       # Walking speed
-            'bicycling': 15,    # Cycling speed
-        }
-
-        avg_speed = speed_kmh.get(mode, 40)
+        avg_speed = SPEED_KMH.get(mode, DEFAULT_SPEED_KMH)
         duration_hours = distance_km / avg_speed
         duration_seconds = int(duration_hours * 3600)
 
-        # Add traffic for driving (20% increase)
+        # Add traffic for driving
         duration_in_traffic_seconds = None
         duration_in_traffic_text = None
 
         if mode == 'driving':
-            duration_in_traffic_seconds = int(duration_seconds * 1.2)
+            duration_in_traffic_seconds = int(duration_seconds * TRAFFIC_FACTOR)
             duration_in_traffic_text = self._format_duration(duration_in_traffic_seconds)
 
         return {
@@ -170,6 +287,37 @@ class MapsService:
             'duration_in_traffic_text': duration_in_traffic_text,
         }
 
+    def _mock_commutes(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]],
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        """Mock commutes to many destinations, computed as one vectorised row"""
+        if not destinations:
+            return []
+
+        dest_lats, dest_lngs = zip(*destinations)
+        matrix = commute_matrix([origin_lat], [origin_lng], dest_lats, dest_lngs, mode)
+        in_traffic = matrix.duration_in_traffic_seconds
+        in_traffic = in_traffic[0].tolist() if in_traffic is not None else [None] * len(destinations)
+
+        return [
+            {
+                'distance_meters': distance_meters,
+                'distance_text': f"{distance_km:.1f} km",
+                'duration_seconds': duration_seconds,
+                'duration_text': self._format_duration(duration_seconds),
+                'duration_in_traffic_seconds': traffic_seconds,
+                'duration_in_traffic_text': self._format_duration(traffic_seconds) if traffic_seconds is not None else None,
+            }
+            for distance_km, distance_meters, duration_seconds, traffic_seconds in zip(
+                matrix.distance_km[0].tolist(), matrix.distance_meters[0].tolist(),
+                matrix.duration_seconds[0].tolist(), in_traffic,
+            )
+        ]
+
     def _format_duration(self, seconds: int) -> str:
         """Format duration in seconds to human-readable text"""
         hours = seconds // 3600
@@ -181,12 +329,195 @@ class MapsService:
             return f"{minutes} min{'s' if minutes != 1 else ''}"
 
 
+class AsyncMapsService(MapsService):
+    """
+    Non-blocking MapsService over a pooled httpx client
+
+    calculate_commute and calculate_commutes are coroutines with the same
+    arguments and results as MapsService's. Requests share one connection
+    pool; at most max_concurrency are in flight per worker, and transient
+    failures (timeouts, connection errors, 429/5xx, OVER_QUERY_LIMIT) are
+    retried with exponential backoff and full jitter.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        use_mock: bool = True,
+        backend: Optional[str] = None,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_concurrency: int = 10,
+    ):
+        # The road graph is loaded at startup or on first use in a worker
+        # thread (load_road_router), never here inside a request
+        self._init_backend(use_mock, backend, load_router=False)
+        self.client = None
+
+        if self.backend == "google":
+            if not api_key:
+                api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+
+            if not api_key:
+                raise ValueError("Google Maps API key required when not using mock mode")
+
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """The shared client (created on first use, inside the running loop)"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._http
+
+    async def close(self) -> None:
+        """Close the connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def calculate_commute(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        dest_lat: float,
+        dest_lng: float,
+        mode: str = "driving",
+        departure_time: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Calculate commute time between two points (see MapsService.calculate_commute)"""
+        if self.use_mock:
+            return self._mock_commute_calculation(origin_lat, origin_lng, dest_lat, dest_lng, mode)
+
+        if self.backend == "local":
+            # Graph searches are CPU-bound: keep them off the event loop
+            self.router = await load_road_router()
+            return await asyncio.to_thread(self._local_commute, origin_lat, origin_lng, dest_lat, dest_lng, mode)
+
+        try:
+            result = await self._distance_matrix(origin_lat, origin_lng, [(dest_lat, dest_lng)], mode, departure_time)
+            commute = self._parse_element(result['rows'][0]['elements'][0])
+            if isinstance(commute, str):
+                raise Exception(commute)
+            return commute
+
+        except Exception as e:
+            raise Exception(f"Failed to calculate commute: {str(e)}")
+
+    async def calculate_commutes(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]],
+        mode: str = "driving",
+        departure_time: Optional[datetime] = None
+    ) -> List[Any]:
+        """
+        Calculate commutes from one origin to many destinations (see MapsService.calculate_commutes)
+
+        The per-25 chunks are requested concurrently, within the service's
+        concurrency cap.
+        """
+        if self.use_mock:
+            return self._mock_commutes(origin_lat, origin_lng, destinations, mode)
+
+        if self.backend == "local":
+            self.router = await load_road_router()
+            return await asyncio.to_thread(self._local_commutes, origin_lat, origin_lng, destinations, mode)
+
+        chunks = [
+            destinations[start:start + MAX_DESTINATIONS_PER_REQUEST]
+            for start in range(0, len(destinations), MAX_DESTINATIONS_PER_REQUEST)
+        ]
+        try:
+            responses = await asyncio.gather(*(
+                self._distance_matrix(origin_lat, origin_lng, chunk, mode, departure_time) for chunk in chunks
+            ))
+        except Exception as e:
+            raise Exception(f"Failed to calculate commutes: {str(e)}")
+
+        return [
+            self._parse_element(element)
+            for result in responses
+            for element in result['rows'][0]['elements']
+        ]
+
+    async def _distance_matrix(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]],
+        mode: str,
+        departure_time: Optional[datetime],
+    ) -> Dict[str, Any]:
+        """One Distance Matrix request (status OK), retrying transient failures"""
+        params = {
+            "origins": f"{origin_lat},{origin_lng}",
+            "destinations": "|".join(f"{dest_lat},{dest_lng}" for dest_lat, dest_lng in destinations),
+            "mode": mode,
+            "departure_time": int(departure_time.timestamp()) if departure_time else "now",
+            "traffic_model": "best_guess",
+            "key": self.api_key,
+        }
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._get_http().get(DISTANCE_MATRIX_URL, params=params)
+                if response.status_code in RETRY_HTTP_STATUSES:
+                    error = f"HTTP {response.status_code}"
+                else:
+                    response.raise_for_status()
+                    result = response.json()
+                    if result['status'] == 'OK':
+                        return result
+                    if result['status'] not in RETRY_API_STATUSES:
+                        raise Exception(f"Distance Matrix API error: {result['status']}")
+                    error = f"Distance Matrix API error: {result['status']}"
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt >= self.max_retries:
+                raise Exception(f"{error} (after {attempt + 1} attempts)")
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+            attempt += 1
+
+
 # Singleton instance
 _maps_service = None
 
-def get_maps_service(use_mock: bool = True) -> MapsService:
-    """Get or create the MapsService singleton"""
+def get_maps_service(use_mock: bool = True) -> AsyncMapsService:
+    """Get or create the AsyncMapsService singleton"""
     global _maps_service
     if _maps_service is None:
-        _maps_service = MapsService(use_mock=use_mock)
+        _maps_service = AsyncMapsService(
+            use_mock=use_mock,
+            backend=os.getenv("MAPS_BACKEND") or None,
+            timeout=float(os.getenv("MAPS_TIMEOUT", "10")),
+            max_retries=int(os.getenv("MAPS_MAX_RETRIES", "3")),
+            max_concurrency=int(os.getenv("MAPS_MAX_CONCURRENCY", "10")),
+        )
     return _maps_service
+
+
+async def close_maps_service():
+    """Close the shared Maps connection pool"""
+    global _maps_service
+    if _maps_service is not None:
+        await _maps_service.close()
+    _maps_service = None
@@ -0,0 +1,70 @@
+"""
+Price Stats Service
+Market insights: location_price_stats refresh
+
+Percentiles need every price in a group, so they are computed in Postgres
+(percentile_cont over GROUPING SETS) and stored, rather than per request.
+A refresh replaces the rows of the given locations inside the caller's
+transaction: admin writes refresh the one or two locations they touch,
+scripts/refresh_price_stats.py refreshes everything.
+"""
+
+from typing import Optional, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.location_price_stats import ALL_CONFIGURATIONS
+
+
+_DELETE = "DELETE FROM location_price_stats {where}"
+
+# (location, configuration) groups plus one (location) roll-up per location
+_INSERT = f"""
+    INSERT INTO location_price_stats (
+        location, configuration, property_count,
+        min_price, median_price, p90_price, median_price_per_sqft, refreshed_at
+    )
+    SELECT
+        location,
+        COALESCE(configuration, '{ALL_CONFIGURATIONS}'),
+        count(*),
+        min(price),
+        round(percentile_cont(0.5) WITHIN GROUP (ORDER BY price))::bigint,
+        round(percentile_cont(0.9) WITHIN GROUP (ORDER BY price))::bigint,
+        round(percentile_cont(0.5) WITHIN GROUP (ORDER BY price_per_sqft_inr))::integer,
+        now()
+    FROM properties
+    {{where}}
+    GROUP BY GROUPING SETS ((location, configuration), (location))
+    ON CONFLICT (location, configuration) DO UPDATE SET
+        property_count = EXCLUDED.property_count,
+        min_price = EXCLUDED.min_price,
+        median_price = EXCLUDED.median_price,
+        p90_price = EXCLUDED.p90_price,
+        median_price_per_sqft = EXCLUDED.median_price_per_sqft,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+_LOCATIONS_WHERE = "WHERE location = ANY(CAST(:locations AS varchar[]))"
+
+
+async def refresh_location_price_stats(db: AsyncSession, locations: Optional[Iterable[str]] = None) -> int:
+    """
+    Recompute location_price_stats for the given locations (all when None)
+
+    Locations left without properties lose their rows. The upsert keeps two
+    concurrent refreshes of one location from colliding on the primary key.
+    Does not commit. Returns the number of rows written.
+    """
+    if locations is None:
+        where, params = "", {}
+    else:
+        locations = sorted({location for location in locations if location})
+        if not locations:
+            return 0
+        where, params = _LOCATIONS_WHERE, {"locations": locations}
+
+    await db.execute(text(_DELETE.format(where=where)), params)
+    result = await db.execute(text(_INSERT.format(where=where)), params)
+    return result.rowcount
@@ -0,0 +1,511 @@
+"""
+Routing Service
+Local road-network routing: an OSRM stand-in with no per-call cost
+
+Loads a road graph from an OpenStreetMap extract of Hyderabad and answers
+shortest travel times over it. Realistic commutes (real roads, one-way
+streets, road-class speeds) without a network call or an API bill.
+
+- OSM XML (.osm, .osm.gz, .osm.bz2) is parsed with the standard library in
+  two passes (road ways, then only the nodes they use). PBF extracts need
+  osmium, which is not a dependency: convert them with `osmium cat` first.
+- scripts/build_road_graph.py compiles an extract into a .npz graph once;
+  the API only loads compiled graphs (in a worker thread, at startup),
+  never parses XML.
+- Per-mode adjacency and the snapping index are built when the graph is
+  created, so searches from worker threads only read shared state.
+- One origin to many destinations (commute batches) is one Dijkstra search
+  that stops when every destination is settled; a single pair uses A* with
+  a straight-line-at-top-speed heuristic.
+- Coordinates snap to the nearest node of the graph's largest connected
+  piece; the straight-line legs to and from the road are added at the
+  mode's average speed.
+
+Walking, bicycling and transit route over the same roads with their speed
+capped at the mode's average (walking and bicycling may go against one-way
+streets, never on motorways). Other modes route as driving.
+"""
+
+import asyncio
+import bz2
+import gzip
+import heapq
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Optional, Dict, List, Tuple, Sequence
+
+import numpy as np
+
+from app.services.commute_matrix import SPEED_KMH, DEFAULT_SPEED_KMH
+from app.services.geo import EARTH_RADIUS_KM, haversine_km
+
+
+# Free-flow speed per OSM highway class when a way has no usable maxspeed (km/h)
+HIGHWAY_SPEEDS_KMH = {
+    'motorway': 80, 'motorway_link': 45,
+    'trunk': 60, 'trunk_link': 40,
+    'primary': 45, 'primary_link': 35,
+    'secondary': 35, 'secondary_link': 30,
+    'tertiary': 30, 'tertiary_link': 25,
+    'unclassified': 25, 'residential': 20, 'living_street': 10,
+    'service': 15, 'road': 20,
+}
+HIGHWAY_CLASSES = list(HIGHWAY_SPEEDS_KMH)
+
+# Classes closed to walking and bicycling
+MOTORWAY_CLASSES = {'motorway', 'motorway_link'}
+
+# Modes that may use one-way streets in both directions
+TWO_WAY_MODES = {'walking', 'bicycling'}
+
+# Modes with their own adjacency (anything else uses driving's)
+ROUTING_MODES = ('driving', 'walking', 'bicycling', 'transit')
+
+# Snap radius: points farther than this from any road have no route (m)
+MAX_SNAP_METERS = 2000.0
+
+# Grid cell size of the snapping index (m)
+SNAP_CELL_METERS = 250.0
+
+_MAXSPEED = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(mph|km/h|kmh|kph)?\s*$")
+
+
+def _open_extract(path: str):
+    if path.endswith(".pbf"):
+        raise ValueError("PBF extracts are not supported; convert with `osmium cat extract.osm.pbf -o extract.osm.gz`")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _elements(path: str):
+    """Yield the top-level node and way elements of an extract, discarding each after use"""
+    with _open_extract(path) as source:
+        events = ET.iterparse(source, events=("start", "end"))
+        _, root = next(events)
+        for event, element in events:
+            if event == "end" and element.tag in ('node', 'way'):
+                yield element
+                root.clear()
+
+
+def _way_speed(tags: Dict[str, str]) -> float:
+    """maxspeed in km/h when it parses, else the highway class speed"""
+    match = _MAXSPEED.match(tags.get('maxspeed', ''))
+    if match:
+        speed = float(match.group(1)) * (1.609344 if match.group(2) == 'mph' else 1.0)
+        if speed > 0:
+            return speed
+    return float(HIGHWAY_SPEEDS_KMH[tags['highway']])
+
+
+def _oneway(tags: Dict[str, str]) -> int:
+    """1 forward only, -1 backward only, 0 both ways"""
+    value = tags.get('oneway', '')
+    if value in ('yes', 'true', '1'):
+        return 1
+    if value == '-1':
+        return -1
+    if value == 'no':
+        return 0
+    if tags['highway'] in ('motorway', 'motorway_link') or tags.get('junction') in ('roundabout', 'circular'):
+        return 1
+    return 0
+
+
+def _is_road(tags: Dict[str, str]) -> bool:
+    return (
+        tags.get('highway') in HIGHWAY_SPEEDS_KMH
+        and tags.get('access') not in ('no', 'private')
+        and tags.get('area') != 'yes'
+    )
+
+
+class RoadGraph:
+    """
+    Road network as flat NumPy arrays
+
+    Nodes: node_lat, node_lng. Segments (one per consecutive pair of way
+    nodes): seg_from, seg_to, seg_meters, seg_speed_kmh, seg_class (index
+    into HIGHWAY_CLASSES) and seg_oneway (traversable seg_from -> seg_to
+    only). Per-mode adjacency and the snapping index are derived up front.
+    """
+
+    ARRAYS = ["node_lat", "node_lng", "seg_from", "seg_to", "seg_meters", "seg_speed_kmh", "seg_class", "seg_oneway"]
+
+    def __init__(self, node_lat, node_lng, seg_from, seg_to, seg_meters, seg_speed_kmh, seg_class, seg_oneway):
+        self.node_lat = np.asarray(node_lat, dtype=np.float64)
+        self.node_lng = np.asarray(node_lng, dtype=np.float64)
+        self.seg_from = np.asarray(seg_from, dtype=np.int32)
+        self.seg_to = np.asarray(seg_to, dtype=np.int32)
+        self.seg_meters = np.asarray(seg_meters, dtype=np.float32)
+        self.seg_speed_kmh = np.asarray(seg_speed_kmh, dtype=np.float32)
+        self.seg_class = np.asarray(seg_class, dtype=np.int8)
+        self.seg_oneway = np.asarray(seg_oneway, dtype=bool)
+
+        # Local equirectangular projection (m) for snapping and the A* heuristic
+        self._lat0 = float(np.mean(self.node_lat)) if len(self.node_lat) else 0.0
+        x, y = self._project(self.node_lat, self.node_lng)
+        self._x, self._y = x.tolist(), y.tolist()
+
+        self._profiles: Dict[str, Tuple[list, list, list, list, float]] = {
+            mode: self._build_profile(mode) for mode in ROUTING_MODES
+        }
+        self._snap_cells = self._build_snap_index()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.seg_from)
+
+    def _project(self, lat, lng):
+        scale = EARTH_RADIUS_KM * 1000 * math.pi / 180
+        return (
+            np.asarray(lng, dtype=np.float64) * scale * math.cos(math.radians(self._lat0)),
+            np.asarray(lat, dtype=np.float64) * scale,
+        )
+
+    # Loading
+
+    @classmethod
+    def from_osm(cls, path: str) -> "RoadGraph":
+        """Parse the drivable road network out of an OSM XML extract"""
+        # Pass 1: road ways (node refs, speed, class, direction)
+        ways = []
+        for element in _elements(path):
+            if element.tag != 'way':
+                continue
+            tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+            if _is_road(tags):
+                refs = [int(nd.get('ref')) for nd in element.iter('nd')]
+                if len(refs) > 1:
+                    oneway = _oneway(tags)
+                    if oneway < 0:
+                        refs.reverse()
+                    ways.append((refs, _way_speed(tags), HIGHWAY_CLASSES.index(tags['highway']), oneway != 0))
+
+        # Pass 2: coordinates of the nodes those ways use
+        wanted = {ref for refs, _, _, _ in ways for ref in refs}
+        index: Dict[int, int] = {}
+        node_lat, node_lng = [], []
+        for element in _elements(path):
+            if element.tag == 'node':
+                osm_id = int(element.get('id'))
+                if osm_id in wanted:
+                    index[osm_id] = len(node_lat)
+                    node_lat.append(float(element.get('lat')))
+                    node_lng.append(float(element.get('lon')))
+
+        # Consecutive node pairs of every way, flattened
+        uses: Dict[int, int] = {}
+        for refs, _, _, _ in ways:
+            for ref in refs:
+                uses[ref] = uses.get(ref, 0) + 1
+
+        pair_from, pair_to, pair_end, pair_way = [], [], [], []
+        for number, (refs, _, _, _) in enumerate(ways):
+            refs = [ref for ref in refs if ref in index]
+            for k in range(1, len(refs)):
+                pair_from.append(index[refs[k - 1]])
+                pair_to.append(index[refs[k]])
+                # A segment ends at a junction (node shared with another way or pass) or the way's end
+                pair_end.append(k == len(refs) - 1 or uses[refs[k]] > 1)
+                pair_way.append(number)
+
+        node_lat = np.array(node_lat)
+        node_lng = np.array(node_lng)
+        pair_from = np.array(pair_from, dtype=np.int64)
+        pair_to = np.array(pair_to, dtype=np.int64)
+        pair_end = np.array(pair_end, dtype=bool)
+        pair_way = np.array(pair_way, dtype=np.int64)
+        pair_meters = haversine_km(node_lat[pair_from], node_lng[pair_from], node_lat[pair_to], node_lng[pair_to]) * 1000
+
+        # Merge the shape-point chains between junctions into single segments
+        ends = np.flatnonzero(pair_end)
+        starts = np.concatenate(([0], ends[:-1] + 1)) if len(ends) else ends
+        seg_from = pair_from[starts]
+        seg_to = pair_to[ends]
+        seg_meters = np.add.reduceat(pair_meters, starts) if len(starts) else pair_meters
+        way_number = pair_way[ends]
+        keep = seg_from != seg_to
+        seg_from, seg_to, seg_meters, way_number = seg_from[keep], seg_to[keep], seg_meters[keep], way_number[keep]
+
+        # Keep only segment end nodes, renumbered
+        used = np.unique(np.concatenate([seg_from, seg_to]))
+        renumber = np.full(len(node_lat), -1, dtype=np.int64)
+        renumber[used] = np.arange(len(used))
+
+        return cls(
+            node_lat[used], node_lng[used],
+            renumber[seg_from], renumber[seg_to], seg_meters,
+            [ways[number][1] for number in way_number.tolist()],
+            [ways[number][2] for number in way_number.tolist()],
+            [ways[number][3] for number in way_number.tolist()],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        """Load a graph saved by save() (.npz)"""
+        if not path.endswith(".npz"):
+            raise ValueError(
+                f"{path} is not a compiled road graph (.npz); build one from the extract with "
+                f"`python scripts/build_road_graph.py {path} roads.npz` and point ROAD_GRAPH_PATH at it"
+            )
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.ARRAYS))
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, **{name: getattr(self, name) for name in self.ARRAYS})
+
+    # Per-mode adjacency
+
+    def _profile(self, mode: str) -> Tuple[list, list, list, list, float]:
+        return self._profiles.get(mode, self._profiles['driving'])
+
+    def _build_profile(self, mode: str) -> Tuple[list, list, list, list, float]:
+        """CSR adjacency for a mode: (offsets, heads, seconds, meters, top speed in m/s)"""
+        speed = self.seg_speed_kmh.astype(np.float64)
+        usable = np.ones(self.segment_count, dtype=bool)
+        if mode != 'driving':
+            speed = np.minimum(speed, SPEED_KMH.get(mode, DEFAULT_SPEED_KMH))
+        if mode in TWO_WAY_MODES:
+            motorway = [HIGHWAY_CLASSES.index(name) for name in MOTORWAY_CLASSES]
+            usable = ~np.isin(self.seg_class, motorway)
+            oneway = np.zeros(self.segment_count, dtype=bool)
+        else:
+            oneway = self.seg_oneway
+
+        seconds = self.seg_meters / (speed / 3.6)
+        forward = usable
+        backward = usable & ~oneway
+        tails = np.concatenate([self.seg_from[forward], self.seg_to[backward]])
+        heads = np.concatenate([self.seg_to[forward], self.seg_from[backward]])
+        edge_seconds = np.concatenate([seconds[forward], seconds[backward]])
+        edge_meters = np.concatenate([self.seg_meters[forward], self.seg_meters[backward]])
+
+        order = np.argsort(tails, kind="stable")
+        offsets = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=self.node_count), out=offsets[1:])
+
+        top_speed = float(speed[usable].max()) / 3.6 if usable.any() else 1.0
+        return (
+            offsets.tolist(), heads[order].tolist(), edge_seconds[order].tolist(),
+            edge_meters[order].astype(np.float64).tolist(), top_speed,
+        )
+
+    # Snapping
+
+    def _main_component(self) -> np.ndarray:
+        """Nodes of the largest connected piece (ignoring direction)"""
+        adjacency = [[] for _ in range(self.node_count)]
+        for a, b in zip(self.seg_from.tolist(), self.seg_to.tolist()):
+            adjacency[a].append(b)
+            adjacency[b].append(a)
+
+        component = [-1] * self.node_count
+        sizes = []
+        for start in range(self.node_count):
+            if component[start] >= 0 or not adjacency[start]:
+                continue
+            label = len(sizes)
+            component[start] = label
+            stack, size = [start], 0
+            while stack:
+                node = stack.pop()
+                size += 1
+                for neighbour in adjacency[node]:
+                    if component[neighbour] < 0:
+                        component[neighbour] = label
+                        stack.append(neighbour)
+            sizes.append(size)
+
+        if not sizes:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(np.array(component) == int(np.argmax(sizes)))
+
+    def _build_snap_index(self) -> Dict[Tuple[int, int], List[int]]:
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for node in self._main_component().tolist():
+            key = (int(self._x[node] // SNAP_CELL_METERS), int(self._y[node] // SNAP_CELL_METERS))
+            cells.setdefault(key, []).append(node)
+        return cells
+
+    def nearest_node(self, lat: float, lng: float) -> Tuple[Optional[int], float]:
+        """(nearest routable node, distance in m), or (None, inf) beyond MAX_SNAP_METERS"""
+        x, y = self._project(lat, lng)
+        x, y = float(x), float(y)
+        cx, cy = int(x // SNAP_CELL_METERS), int(y // SNAP_CELL_METERS)
+        best, best_distance = None, math.inf
+        max_ring = int(MAX_SNAP_METERS // SNAP_CELL_METERS) + 1
+
+        for ring in range(max_ring + 1):
+            # Every node in a farther ring is at least (ring - 1) cells away
+            if (ring - 1) * SNAP_CELL_METERS > best_distance:
+                break
+            for gx in range(cx - ring, cx + ring + 1):
+                for gy in range(cy - ring, cy + ring + 1):
+                    if max(abs(gx - cx), abs(gy - cy)) != ring:
+                        continue
+                    for node in self._snap_cells.get((gx, gy), ()):
+                        distance = math.hypot(self._x[node] - x, self._y[node] - y)
+                        if distance < best_distance:
+                            best, best_distance = node, distance
+
+        if best_distance > MAX_SNAP_METERS:
+            return None, math.inf
+        return best, best_distance
+
+    # Shortest paths
+
+    def shortest_paths(self, source: int, targets: Sequence[int], mode: str = "driving") -> Dict[int, Tuple[float, float]]:
+        """{target: (seconds, meters)} for the reachable targets: one Dijkstra search, stopped when all are settled"""
+        offsets, heads, seconds, meters, _ = self._profile(mode)
+        remaining = set(targets)
+        best = [math.inf] * self.node_count
+        length = [0.0] * self.node_count
+        best[source] = 0.0
+        settled = {}
+        heap = [(0.0, source)]
+        push, pop = heapq.heappush, heapq.heappop
+
+        while heap and remaining:
+            time, node = pop(heap)
+            if time > best[node]:
+                continue
+            if node in remaining:
+                settled[node] = (time, length[node])
+                remaining.discard(node)
+            start, stop = offsets[node], offsets[node + 1]
+            node_length = length[node]
+            for head, edge_seconds, edge_meters in zip(heads[start:stop], seconds[start:stop], meters[start:stop]):
+                candidate = time + edge_seconds
+                if candidate < best[head]:
+                    best[head] = candidate
+                    length[head] = node_length + edge_meters
+                    push(heap, (candidate, head))
+
+        return settled
+
+    def shortest_path(self, source: int, target: int, mode: str = "driving") -> Optional[Tuple[float, float]]:
+        """(seconds, meters) from source to target by A*, or None when unreachable"""
+        offsets, heads, seconds, meters, top_speed = self._profile(mode)
+        x, y = self._x, self._y
+        tx, ty = x[target], y[target]
+        hypot = math.hypot
+        # Straight line at the fastest speed never overestimates (projection error well under 1%)
+        scale = 0.99 / top_speed
+
+        best = [math.inf] * self.node_count
+        length = [0.0] * self.node_count
+        best[source] = 0.0
+        heap = [(hypot(x[source] - tx, y[source] - ty) * scale, 0.0, source)]
+        push, pop = heapq.heappush, heapq.heappop
+
+        while heap:
+            _, time, node = pop(heap)
+            if node == target:
+                return time, length[node]
+            if time > best[node]:
+                continue
+            start, stop = offsets[node], offsets[node + 1]
+            node_length = length[node]
+            for head, edge_seconds, edge_meters in zip(heads[start:stop], seconds[start:stop], meters[start:stop]):
+                candidate = time + edge_seconds
+                if candidate < best[head]:
+                    best[head] = candidate
+                    length[head] = node_length + edge_meters
+                    push(heap, (candidate + hypot(x[head] - tx, y[head] - ty) * scale, candidate, head))
+
+        return None
+
+
+class RoadRouter:
+    """Commute times between coordinates over a RoadGraph"""
+
+    def __init__(self, graph: RoadGraph):
+        self.graph = graph
+
+    def _access_seconds(self, meters: float, mode: str) -> float:
+        """Straight-line leg between a point and its snapped road node"""
+        return meters / (SPEED_KMH.get(mode, DEFAULT_SPEED_KMH) / 3.6)
+
+    def route(self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float, mode: str = "driving") -> Optional[Tuple[float, float]]:
+        """(seconds, meters) for one trip, or None when there is no route"""
+        return self.routes(origin_lat, origin_lng, [(dest_lat, dest_lng)], mode, single_pair=True)[0]
+
+    def routes(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: Sequence[Tuple[float, float]],
+        mode: str = "driving",
+        single_pair: bool = False,
+    ) -> List[Optional[Tuple[float, float]]]:
+        """(seconds, meters) per destination, None where there is no route"""
+        source, source_offset = self.graph.nearest_node(origin_lat, origin_lng)
+        if source is None:
+            return [None] * len(destinations)
+
+        snapped = [self.graph.nearest_node(lat, lng) for lat, lng in destinations]
+        targets = [node for node, _ in snapped if node is not None]
+        if single_pair and len(targets) == 1:
+            path = self.graph.shortest_path(source, targets[0], mode)
+            paths = {targets[0]: path} if path is not None else {}
+        else:
+            paths = self.graph.shortest_paths(source, targets, mode)
+
+        results = []
+        for node, offset in snapped:
+            path = paths.get(node) if node is not None else None
+            if path is None:
+                results.append(None)
+                continue
+            seconds, meters = path
+            access = source_offset + offset
+            results.append((seconds + self._access_seconds(access, mode), meters + access))
+        return results
+
+
+# Singleton instance
+_road_router: Optional[RoadRouter] = None
+_road_router_lock = asyncio.Lock()
+
+
+def _open_router(path: Optional[str]) -> RoadRouter:
+    path = path or os.getenv("ROAD_GRAPH_PATH")
+    if not path:
+        raise ValueError("ROAD_GRAPH_PATH (graph compiled by scripts/build_road_graph.py) required for local routing")
+    return RoadRouter(RoadGraph.load(path))
+
+
+def get_road_router(path: Optional[str] = None) -> RoadRouter:
+    """Get or create the RoadRouter singleton, loading in this thread (scripts)"""
+    global _road_router
+    if _road_router is None:
+        _road_router = _open_router(path)
+    return _road_router
+
+
+async def load_road_router(path: Optional[str] = None) -> RoadRouter:
+    """Get or create the RoadRouter singleton, loading in a worker thread (API)"""
+    global _road_router
+    if _road_router is None:
+        async with _road_router_lock:
+            if _road_router is None:
+                _road_router = await asyncio.to_thread(_open_router, path)
+    return _road_router
+
+
+async def start_road_router():
+    """Load the road graph at startup when MAPS_BACKEND=local"""
+    if os.getenv("MAPS_BACKEND") != "local":
+        return
+    router = await load_road_router()
+    print(f"🗺️  Road graph loaded: {router.graph.node_count:,} nodes, {router.graph.segment_count:,} segments")
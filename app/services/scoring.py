@@ -0,0 +1,304 @@
+"""
+Scoring Service
+Smart score computation for the property catalog
+
+Every property gets four component scores (0-100) and a weighted smart_score:
+- commute_score: employee-weighted average commute to the GCC offices, from
+  the normal-traffic minutes in commute_scores (straight-line estimate for
+  pairs not calculated yet); current_minutes depends on the hour the
+  commute job ran, so it is not used
+- price_score: price per sqft against the median of its location
+- builder_score: builder rating and on-time delivery record
+- location_score: access to GCC jobs (employees discounted by distance),
+  as a percentile across the catalog
+
+The catalog is pulled with a few bulk selects, scored with NumPy in one pass
+and written back with a single UPDATE ... FROM unnest(...). Incremental runs
+only write properties touched since they were last scored: the property,
+its builder or one of its commute_scores changed after scored_at.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Any
+
+import numpy as np
+from sqlalchemy import select, text, or_, exists, func, cast, true, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.property import Property
+from app.models.builder import Builder
+from app.models.commute_score import CommuteScore
+from app.models.gcc_company import GCCCompany
+from app.services.geo import haversine_km
+
+
+# Component weights in smart_score (sum to 1)
+SCORE_WEIGHTS = {
+    "commute_score": 0.35,
+    "price_score": 0.25,
+    "builder_score": 0.20,
+    "location_score": 0.20,
+}
+
+# Weighted average commute mapped linearly: <= 15 min scores 100, >= 75 min scores 0
+COMMUTE_BEST_MINUTES = 15.0
+COMMUTE_WORST_MINUTES = 75.0
+
+# Average city speed for commutes not in commute_scores yet
+FALLBACK_COMMUTE_KMPH = 25.0
+
+# Price per sqft this far below (above) the location median scores 100 (0)
+PRICE_SPREAD = 0.20
+
+# Builder score blend of rating (out of 5) and on-time delivery %
+BUILDER_RATING_WEIGHT = 0.6
+
+# Distance over which an office's job pull decays by 1/e
+JOB_ACCESS_DECAY_KM = 5.0
+
+# Score used when an input is missing
+NEUTRAL_SCORE = 50.0
+
+SCORE_COLUMNS = ["smart_score", "location_score", "builder_score", "price_score", "commute_score"]
+
+
+@dataclass
+class ScoringResult:
+    """Outcome of one scoring run"""
+    mode: str
+    scored: int
+    written: int
+    changed: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "scored": self.scored, "written": self.written, "changed": self.changed}
+
+
+def _to_float(values) -> np.ndarray:
+    """Strings/Decimals/None to float64, unparseable values becoming NaN"""
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _linear_score(values: np.ndarray, best: float, worst: float) -> np.ndarray:
+    """Map best..worst onto 100..0, clipped; NaN becomes NEUTRAL_SCORE"""
+    scores = np.clip((worst - values) / (worst - best) * 100.0, 0.0, 100.0)
+    return np.where(np.isnan(scores), NEUTRAL_SCORE, scores)
+
+
+def _group_medians(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Per-row median of values within the row's group, ignoring NaN"""
+    medians = np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return medians
+
+    group_ids, inverse, counts = np.unique(groups[valid], return_inverse=True, return_counts=True)
+    order = np.lexsort((values[valid], inverse))
+    ordered = values[valid][order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    group_medians = (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+    lookup = dict(zip(group_ids.tolist(), group_medians.tolist()))
+    return np.array([lookup.get(group, np.nan) for group in groups.tolist()])
+
+
+def compute_scores(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    location: np.ndarray,
+    price_per_sqft: np.ndarray,
+    builder_rating: np.ndarray,
+    builder_on_time: np.ndarray,
+    office_latitude: np.ndarray,
+    office_longitude: np.ndarray,
+    office_employees: np.ndarray,
+    commute_minutes: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    All scores for N properties against M offices, rounded to 2 places
+
+    Per-property arrays have length N; office arrays have length M;
+    commute_minutes is N x M with NaN where no commute_scores row exists.
+    """
+    n = len(latitude)
+
+    # Straight-line distance to every office (N x M), also the fallback commute
+    distances = haversine_km(latitude[:, None], longitude[:, None], office_latitude[None, :], office_longitude[None, :])
+    minutes = np.where(np.isnan(commute_minutes), distances / FALLBACK_COMMUTE_KMPH * 60.0, commute_minutes)
+
+    if len(office_employees):
+        # Offices without an employee count weigh as much as a typical office
+        known = office_employees[~np.isnan(office_employees)]
+        weights = np.where(np.isnan(office_employees), np.median(known) if len(known) else 1.0, office_employees)
+        average_minutes = minutes @ weights / weights.sum()
+        job_access = np.exp(-distances / JOB_ACCESS_DECAY_KM) @ weights
+    else:
+        average_minutes = np.full(n, np.nan)
+        job_access = np.zeros(n)
+
+    commute_score = _linear_score(average_minutes, COMMUTE_BEST_MINUTES, COMMUTE_WORST_MINUTES)
+
+    # Cheaper than the location median is better value
+    ratio = price_per_sqft / _group_medians(location, price_per_sqft)
+    price_score = _linear_score(ratio, 1.0 - PRICE_SPREAD, 1.0 + PRICE_SPREAD)
+
+    rating_score = np.clip(builder_rating / 5.0 * 100.0, 0.0, 100.0)
+    on_time_score = np.clip(builder_on_time, 0.0, 100.0)
+    rating_score = np.where(np.isnan(rating_score), NEUTRAL_SCORE, rating_score)
+    on_time_score = np.where(np.isnan(on_time_score), NEUTRAL_SCORE, on_time_score)
+    builder_score = BUILDER_RATING_WEIGHT * rating_score + (1 - BUILDER_RATING_WEIGHT) * on_time_score
+
+    # Percentile rank of job access (ties share the average rank)
+    if n > 1:
+        _, inverse, counts = np.unique(job_access, return_inverse=True, return_counts=True)
+        ranks = np.cumsum(counts) - counts + (counts - 1) / 2
+        location_score = ranks[inverse] / (n - 1) * 100.0
+    else:
+        location_score = np.full(n, NEUTRAL_SCORE)
+
+    scores = {
+        "commute_score": commute_score,
+        "price_score": price_score,
+        "builder_score": builder_score,
+        "location_score": location_score,
+    }
+    scores["smart_score"] = sum(SCORE_WEIGHTS[name] * scores[name] for name in SCORE_WEIGHTS)
+
+    return {name: np.round(values, 2) for name, values in scores.items()}
+
+
+# Touched since last scored: the row itself, its builder, or one of its commutes
+def _touched_clause():
+    return or_(
+        Property.scored_at.is_(None),
+        Property.updated_at > Property.scored_at,
+        Builder.updated_at > Property.scored_at,
+        exists().where(
+            CommuteScore.property_id == Property.id,
+            func.coalesce(CommuteScore.updated_at, CommuteScore.created_at) > Property.scored_at,
+        ),
+    )
+
+
+_BULK_UPDATE = text("""
+    UPDATE properties AS p
+    SET smart_score = v.smart_score,
+        location_score = v.location_score,
+        builder_score = v.builder_score,
+        price_score = v.price_score,
+        commute_score = v.commute_score,
+        scored_at = now(),
+        updated_at = CASE WHEN v.changed THEN now() ELSE p.updated_at END
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:smart_score AS numeric[]),
+        CAST(:location_score AS numeric[]),
+        CAST(:builder_score AS numeric[]),
+        CAST(:price_score AS numeric[]),
+        CAST(:commute_score AS numeric[]),
+        CAST(:changed AS boolean[])
+    ) AS v(id, smart_score, location_score, builder_score, price_score, commute_score, changed)
+    WHERE p.id = v.id
+""")
+
+
+async def score_properties(db: AsyncSession, incremental: bool = False) -> ScoringResult:
+    """
+    Recompute scores for the catalog and write them back in one statement
+
+    Scores are relative (location medians, job-access percentiles), so the
+    whole catalog is always loaded; incremental only narrows the write to
+    touched properties. Run a full pass periodically to re-rank the rest.
+    Changed rows get a new updated_at so catalog engines pick them up.
+    The caller commits.
+    """
+    property_rows = (await db.execute(
+        select(
+            Property.id,
+            cast(Property.latitude, Float),
+            cast(Property.longitude, Float),
+            Property.location,
+            Property.price,
+            Property.carpet_area_sqft,
+            Property.price_per_sqft_inr,
+            Builder.rating,
+            Builder.on_time_delivery_percentage,
+            *[getattr(Property, name) for name in SCORE_COLUMNS],
+            _touched_clause() if incremental else true(),
+        ).join(Builder, Property.builder_id == Builder.id, isouter=True)
+    )).all()
+
+    if not property_rows:
+        return ScoringResult("incremental" if incremental else "full", 0, 0, 0)
+
+    office_rows = (await db.execute(
+        select(GCCCompany.id, cast(GCCCompany.latitude, Float), cast(GCCCompany.longitude, Float), GCCCompany.employee_count)
+    )).all()
+
+    commute_rows = (await db.execute(
+        select(CommuteScore.property_id, CommuteScore.company_id, CommuteScore.normal_minutes)
+    )).all()
+
+    columns = list(zip(*property_rows))
+    ids = list(columns[0])
+    n_offices = len(office_rows)
+
+    price = np.array(columns[4], dtype=np.float64)
+    carpet_area = _to_float(columns[5])
+    price_per_sqft = _to_float(columns[6])
+    price_per_sqft = np.where(np.isnan(price_per_sqft), price / carpet_area, price_per_sqft)
+
+    # Scatter normal-traffic commute minutes into the N x M matrix
+    property_index = {property_id: i for i, property_id in enumerate(ids)}
+    office_index = {row[0]: j for j, row in enumerate(office_rows)}
+    commute_minutes = np.full((len(ids), n_offices), np.nan)
+    pairs = [
+        (property_index[row[0]], office_index[row[1]], row[2])
+        for row in commute_rows
+        if row[0] in property_index and row[1] in office_index
+    ]
+    if pairs:
+        rows_i, cols_j, minutes = zip(*pairs)
+        commute_minutes[list(rows_i), list(cols_j)] = _to_float(minutes)
+
+    scores = compute_scores(
+        latitude=np.array(columns[1], dtype=np.float64),
+        longitude=np.array(columns[2], dtype=np.float64),
+        location=np.array(columns[3], dtype=object),
+        price_per_sqft=price_per_sqft,
+        builder_rating=_to_float(columns[7]),
+        builder_on_time=_to_float(columns[8]),
+        office_latitude=np.array([row[1] for row in office_rows], dtype=np.float64),
+        office_longitude=np.array([row[2] for row in office_rows], dtype=np.float64),
+        office_employees=_to_float([row[3] for row in office_rows]),
+        commute_minutes=commute_minutes,
+    )
+
+    current = {name: _to_float(columns[9 + k]) for k, name in enumerate(SCORE_COLUMNS)}
+    changed = np.zeros(len(ids), dtype=bool)
+    for name in SCORE_COLUMNS:
+        changed |= ~np.isclose(scores[name], current[name])
+
+    write = np.array(columns[-1], dtype=bool)
+    positions = np.flatnonzero(write)
+
+    if len(positions):
+        await db.execute(_BULK_UPDATE, {
+            "ids": [ids[i] for i in positions],
+            **{name: [Decimal(f"{value:.2f}") for value in scores[name][positions].tolist()] for name in SCORE_COLUMNS},
+            "changed": changed[positions].tolist(),
+        })
+
+    return ScoringResult(
+        mode="incremental" if incremental else "full",
+        scored=len(ids),
+        written=len(positions),
+        changed=int(np.count_nonzero(changed[positions])),
+    )
@@ -0,0 +1,383 @@
+"""
+Similarity Service
+Precomputed "similar properties" neighbours
+
+Each property becomes a weighted feature vector:
+- log price, log carpet area and bedroom count (standardised)
+- position in km (so distance between vectors tracks distance on the map)
+- location one-hot and amenities multi-hot (unit length)
+
+Neighbours are the K nearest vectors by Euclidean distance, computed with
+NumPy in blocks (one matrix product per block of rows, sized to a memory
+budget) and kept per property, so a request is a dict lookup. Full loads
+run in a worker thread and swap in when done, so the event loop keeps
+serving; an admin write re-embeds one property and patches only the
+neighbour lists it can affect. Catching up with writes made elsewhere runs
+in the background while requests read the current neighbours.
+"""
+
+import asyncio
+import math
+import re
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session_maker
+from app.models.property import Property
+
+
+# Neighbours kept per property (the most an endpoint can ask for)
+SIMILAR_TOP_K = 20
+
+# Relative importance of each feature group in the distance
+FEATURE_WEIGHTS = {
+    "price": 2.0,
+    "carpet_area": 1.5,
+    "bedrooms": 1.5,
+    "position": 1.5,
+    "location": 1.0,
+    "amenities": 1.0,
+}
+
+# Distance on the map that counts as one unit (like one standard deviation of price)
+POSITION_SCALE_KM = 5.0
+KM_PER_DEGREE = 111.32
+
+# Memory for the block x N float64 working arrays of a neighbour computation
+BLOCK_BYTES = 64 * 1024 * 1024
+
+# block x N arrays alive at once in _distances and _compute_neighbours
+BLOCK_ARRAYS = 4
+
+# A refresh that finds more than this share of rows changed (e.g. after a
+# scoring run) reloads in a worker thread instead of patching row by row
+RELOAD_FRACTION = 0.05
+
+ROW_FIELDS = [
+    "id", "price", "carpet_area_sqft", "configuration", "location",
+    "latitude", "longitude", "amenities", "updated_at",
+]
+
+_BEDROOMS = re.compile(r"(\d+)")
+
+
+def _bedrooms(configuration: Optional[str]) -> float:
+    match = _BEDROOMS.search(configuration or "")
+    return float(match.group(1)) if match else np.nan
+
+
+class SimilarityIndex:
+    """
+    Feature matrix plus top-K neighbour lists
+
+    Row i of the matrix belongs to ids[i]; deleting a row moves the last row
+    into its slot. Standardisation uses the statistics of the last full load.
+    """
+
+    def __init__(self, top_k: int = SIMILAR_TOP_K):
+        self.top_k = top_k
+        self.ids: List[UUID] = []
+        self._positions: Dict[UUID, int] = {}
+        self._vectors = np.zeros((0, 0))
+        self._neighbours: Dict[UUID, List[Tuple[UUID, float]]] = {}
+
+        self._locations: Dict[str, int] = {}
+        self._amenities: Dict[str, int] = {}
+        self._stats: Dict[str, Tuple[float, float]] = {}
+        self._reference_latitude = 0.0
+
+        # Catalog version this index reflects: (max updated_at, row count)
+        self.max_updated_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def is_current(self, max_updated_at: Optional[datetime], count: int) -> bool:
+        return self.max_updated_at == max_updated_at and self.size == count
+
+    # Features
+
+    def _numeric(self, row: dict) -> Dict[str, float]:
+        carpet_area = row["carpet_area_sqft"]
+        return {
+            "price": math.log(row["price"]) if row["price"] and row["price"] > 0 else np.nan,
+            "carpet_area": math.log(carpet_area) if carpet_area and carpet_area > 0 else np.nan,
+            "bedrooms": _bedrooms(row["configuration"]),
+        }
+
+    def _vocabulary_code(self, vocabulary: Dict[str, int], value: str) -> int:
+        """Code for a category, widening the matrix for a value not seen before"""
+        if value not in vocabulary:
+            vocabulary[value] = self._vectors.shape[1]
+            self._vectors = np.pad(self._vectors, ((0, 0), (0, 1)))
+        return vocabulary[value]
+
+    def _embed(self, row: dict) -> np.ndarray:
+        """Weighted feature vector for one property (same width as the matrix)"""
+        w = FEATURE_WEIGHTS
+        numeric = self._numeric(row)
+        location_code = self._vocabulary_code(self._locations, (row["location"] or "").strip().lower())
+        amenity_codes = [
+            self._vocabulary_code(self._amenities, amenity.strip().lower())
+            for amenity in (row["amenities"] or []) if amenity and amenity.strip()
+        ]
+
+        vector = np.zeros(self._vectors.shape[1])
+        for k, name in enumerate(("price", "carpet_area", "bedrooms")):
+            mean, std = self._stats[name]
+            value = numeric[name]
+            # Missing values sit at the mean, contributing no distance
+            vector[k] = 0.0 if np.isnan(value) else w[name] * (value - mean) / std
+
+        scale = w["position"] / POSITION_SCALE_KM
+        vector[3] = float(row["latitude"]) * KM_PER_DEGREE * scale
+        vector[4] = float(row["longitude"]) * KM_PER_DEGREE * math.cos(math.radians(self._reference_latitude)) * scale
+
+        # Two different one-hot locations are w["location"] apart
+        vector[location_code] = w["location"] / math.sqrt(2)
+        if amenity_codes:
+            vector[amenity_codes] = w["amenities"] / math.sqrt(len(amenity_codes))
+
+        return vector
+
+    # Loading
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Embed every property and compute all neighbour lists
+
+        The O(N^2) build runs on a fresh index in a worker thread; this one
+        keeps answering until the result replaces its state.
+        """
+        result = await db.execute(select(*[getattr(Property, name) for name in ROW_FIELDS]))
+        rows = [dict(zip(ROW_FIELDS, row)) for row in result.all()]
+
+        fresh = SimilarityIndex(self.top_k)
+        await asyncio.to_thread(fresh.load_rows, rows)
+        for name, value in vars(fresh).items():
+            if name not in ("_lock", "_refresh_task"):
+                setattr(self, name, value)
+
+    def load_rows(self, rows: List[dict]) -> None:
+        self.ids = [row["id"] for row in rows]
+        self._positions = {property_id: i for i, property_id in enumerate(self.ids)}
+        self._locations, self._amenities = {}, {}
+
+        numeric = [self._numeric(row) for row in rows]
+        for name in ("price", "carpet_area", "bedrooms"):
+            values = np.array([entry[name] for entry in numeric], dtype=np.float64)
+            values = values[~np.isnan(values)]
+            mean = float(values.mean()) if len(values) else 0.0
+            std = float(values.std()) if len(values) else 0.0
+            self._stats[name] = (mean, std if std > 0 else 1.0)
+
+        latitudes = [float(row["latitude"]) for row in rows]
+        self._reference_latitude = float(np.mean(latitudes)) if latitudes else 0.0
+
+        # Columns 0-4 are numeric; categories append columns as they appear,
+        # so earlier vectors are shorter and padded with zeros at the end
+        self._vectors = np.zeros((0, 5))
+        vectors = [self._embed(row) for row in rows]
+        self._vectors = np.zeros((len(vectors), self._vectors.shape[1]))
+        for i, vector in enumerate(vectors):
+            self._vectors[i, :len(vector)] = vector
+
+        self._neighbours = {}
+        self._compute_neighbours(np.arange(self.size))
+
+        updated = [row["updated_at"] for row in rows if row["updated_at"] is not None]
+        self.max_updated_at = max(updated) if updated else None
+
+    # Neighbour computation
+
+    def _distances(self, positions: np.ndarray) -> np.ndarray:
+        """Euclidean distances from the given rows to every row (len(positions) x N)"""
+        block = self._vectors[positions]
+        squared = (
+            np.einsum("ij,ij->i", block, block)[:, None]
+            + np.einsum("ij,ij->i", self._vectors, self._vectors)[None, :]
+            - 2.0 * block @ self._vectors.T
+        )
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def _block_rows(self) -> int:
+        """Rows per block so the block x N working arrays fit in BLOCK_BYTES"""
+        return max(1, BLOCK_BYTES // (BLOCK_ARRAYS * 8 * max(self.size, 1)))
+
+    def _compute_neighbours(self, positions: np.ndarray) -> None:
+        """Recompute the neighbour lists of the given rows, block by block"""
+        block_rows = self._block_rows()
+        for start in range(0, len(positions), block_rows):
+            self._compute_block(positions[start:start + block_rows])
+
+    def _compute_block(self, positions: np.ndarray) -> None:
+        if len(positions) == 0:
+            return
+
+        distances = self._distances(positions)
+        distances[np.arange(len(positions)), positions] = np.inf  # not its own neighbour
+
+        k = min(self.top_k, self.size - 1)
+        if k <= 0:
+            for position in positions:
+                self._neighbours[self.ids[position]] = []
+            return
+
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances = np.take_along_axis(nearest_distances, order, axis=1)
+
+        for i, position in enumerate(positions):
+            self._neighbours[self.ids[position]] = [
+                (self.ids[j], float(d)) for j, d in zip(nearest[i].tolist(), nearest_distances[i].tolist())
+            ]
+
+    def neighbours(self, property_id: UUID, limit: int) -> Optional[List[Tuple[UUID, float]]]:
+        """Up to limit (id, distance) pairs, nearest first; None for an unknown property"""
+        neighbours = self._neighbours.get(property_id)
+        return neighbours[:limit] if neighbours is not None else None
+
+    # Incremental updates (admin writes)
+
+    def upsert(self, property_obj: Property) -> None:
+        self.upsert_row({name: getattr(property_obj, name) for name in ROW_FIELDS})
+
+    def upsert_row(self, row: dict) -> None:
+        """Re-embed one property and patch the neighbour lists it can change"""
+        property_id = row["id"]
+        if not self._stats:
+            self.load_rows([row])
+            return
+
+        vector = self._embed(row)
+        position = self._positions.get(property_id)
+        if position is None:
+            position = self.size
+            self.ids.append(property_id)
+            self._positions[property_id] = position
+            self._vectors = np.vstack([self._vectors, vector])
+        else:
+            self._vectors[position] = vector
+
+        # Lists that held the property may now need a different member
+        dirty = {
+            self._positions[owner]
+            for owner, neighbours in self._neighbours.items()
+            if owner != property_id and any(neighbour == property_id for neighbour, _ in neighbours)
+        }
+
+        # Other lists only change if the property now beats their farthest member
+        distances = self._distances(np.array([position]))[0]
+        for owner, neighbours in self._neighbours.items():
+            owner_position = self._positions[owner]
+            if owner == property_id or owner_position in dirty:
+                continue
+            if len(neighbours) < min(self.top_k, self.size - 1) or distances[owner_position] < neighbours[-1][1]:
+                dirty.add(owner_position)
+
+        self._compute_neighbours(np.array(sorted(dirty | {position})))
+
+        updated_at = row["updated_at"]
+        if updated_at is not None and (self.max_updated_at is None or updated_at > self.max_updated_at):
+            self.max_updated_at = updated_at
+
+    def remove(self, property_id: UUID) -> None:
+        """Drop one property and recompute the lists that contained it"""
+        position = self._positions.pop(property_id, None)
+        if position is None:
+            return
+
+        last = self.size - 1
+        if position != last:
+            moved = self.ids[last]
+            self.ids[position] = moved
+            self._positions[moved] = position
+            self._vectors[position] = self._vectors[last]
+        self.ids.pop()
+        self._vectors = self._vectors[:last]
+        self._neighbours.pop(property_id, None)
+
+        dirty = [
+            self._positions[owner]
+            for owner, neighbours in self._neighbours.items()
+            if any(neighbour == property_id for neighbour, _ in neighbours)
+        ]
+        self._compute_neighbours(np.array(sorted(dirty), dtype=np.int64))
+
+    # Cross-worker refresh
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """
+        Catch up with the database: upsert the few rows updated since the
+        last load, or reload everything on first use, when more than
+        RELOAD_FRACTION of the rows changed, or when the row count disagrees
+        (a delete made through another worker)
+        """
+        async with self._lock:
+            changed_count = func.count(Property.id)
+            if self.max_updated_at is not None:
+                changed_count = changed_count.filter(Property.updated_at > self.max_updated_at)
+            result = await db.execute(select(func.count(Property.id), func.max(Property.updated_at), changed_count))
+            count, max_updated_at, changed_count = result.one()
+
+            if self.is_current(max_updated_at, count):
+                return
+
+            if not self._stats or changed_count > RELOAD_FRACTION * self.size:
+                await self.load(db)
+                return
+
+            if changed_count:
+                changed = await db.execute(
+                    select(*[getattr(Property, name) for name in ROW_FIELDS])
+                    .where(Property.updated_at > self.max_updated_at)
+                )
+                for row in changed.all():
+                    self.upsert_row(dict(zip(ROW_FIELDS, row)))
+
+            if self.size != count:
+                await self.load(db)
+            else:
+                # Every row newer than the old mark is in; a delete of the
+                # newest row can still leave the mark above the table's
+                self.max_updated_at = max_updated_at
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh in its own session unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with get_session_maker()() as session:
+                await self.refresh(session)
+        except Exception as e:
+            print(f"⚠️  Similarity index refresh failed: {e}")
+
+
+# Singleton instance
+_similarity_index: Optional[SimilarityIndex] = None
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Get or create the SimilarityIndex singleton (loaded on first use)"""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = SimilarityIndex()
+    return _similarity_index
+
+
+def reset_similarity_index() -> None:
+    """Drop the index (e.g. after a failed update); it reloads on next use"""
+    global _similarity_index
+    _similarity_index = None
@@ -0,0 +1,116 @@
+"""
+Benchmark the in-memory autocomplete index
+
+Builds AutocompleteIndex over a synthetic catalog with varied project names
+and times suggest() for prefixes typed one keystroke at a time, as the
+search box sends them. Also reports the full build time and what an admin
+write pays to update one property.
+
+Run:
+    python scripts/benchmark_autocomplete.py
+    python scripts/benchmark_autocomplete.py --sizes 10000 100000
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.property import Property
+from app.services.autocomplete import AutocompleteIndex
+
+from benchmark_catalog_engine import LOCATIONS, summarise
+
+
+BRANDS = [
+    "Prestige", "Aparna", "My Home", "Rajapushpa", "Lodha", "Sobha", "Ramky", "Vasavi",
+    "Honer", "Candeur", "Aliens", "Cybercity", "Muppa", "Ashoka", "Praneeth", "Sumadhura",
+]
+NAMES = [
+    "Lakeside", "Habitat", "Skyline", "Gardens", "Heights", "Meadows", "Serene", "Altius",
+    "Bhooja", "Avatar", "Atlantis", "Provincia", "Eternity", "Regalia", "Vista", "Pinnacle",
+]
+SUFFIXES = ["", "Phase 2", "Towers", "Residences", "Villas", "Enclave"]
+
+
+def synthetic_rows(size: int, seed: int = 7):
+    """(property rows, builder rows) shaped like AutocompleteIndex.load_rows expects"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    builders = [(uuid.uuid4(), f"{brand} Constructions") for brand in BRANDS]
+    properties = []
+    for i in range(size):
+        builder_id, builder_name = rng.choice(builders)
+        brand = builder_name.split(" Constructions")[0]
+        name = " ".join(part for part in (brand, rng.choice(NAMES), rng.choice(SUFFIXES), str(i % 97 or "")) if part)
+        properties.append((uuid.uuid4(), name, rng.choice(LOCATIONS), builder_id, rng.uniform(40, 95), now))
+    return properties, builders
+
+
+def keystrokes(properties, builders, count: int, seed: int = 11):
+    """Prefixes of real names, 1 to 10 characters, as typed"""
+    rng = random.Random(seed)
+    texts = [row[1] for row in properties] + [row[1] for row in builders] + LOCATIONS
+    prefixes = []
+    while len(prefixes) < count:
+        text = rng.choice(texts)
+        words = text.split()
+        start = " ".join(words[rng.randrange(len(words)):])
+        for length in range(1, min(len(start), 10) + 1):
+            prefixes.append(start[:length])
+    return prefixes[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("AUTOCOMPLETE INDEX BENCHMARK")
+    print("=" * 70)
+
+    for size in args.sizes:
+        properties, builders = synthetic_rows(size)
+        index = AutocompleteIndex()
+
+        start = time.perf_counter()
+        index.load_rows(properties, builders)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        prefixes = keystrokes(properties, builders, args.requests)
+        samples = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix, 8)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # Admin writes: rename a property and move it to another location
+        rng = random.Random(13)
+        writes = []
+        for row in rng.sample(properties, min(200, size)):
+            property_obj = Property(
+                id=row[0], name=f"{row[1]} Renamed", location=rng.choice(LOCATIONS),
+                builder_id=row[3], smart_score=row[4], updated_at=row[5],
+            )
+            start = time.perf_counter()
+            index.upsert(property_obj)
+            writes.append((time.perf_counter() - start) * 1000)
+
+        print(f"\n{size:,} properties, {len(index._keys):,} keys, build {build_ms:.0f} ms")
+        print(f"    suggest (limit 8)   {summarise(samples)}")
+        print(f"    upsert (one write)  {summarise(writes)}")
+        print(f"    e.g. 'pre' -> {[s['text'] for s in index.suggest('pre', 4)]}")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
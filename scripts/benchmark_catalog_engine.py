@@ -0,0 +1,181 @@
+"""
+Benchmark the in-memory catalog engine against the SQL search path
+
+Generates synthetic properties at 50, 10k and 1M rows and times the same
+search requests through CatalogEngine.search and (with --sql) through the
+Postgres path used by GET /properties.
+
+The SQL run inserts the synthetic rows inside a transaction that is rolled
+back at the end, so point DATABASE_URL at a scratch database: the existing
+catalog rows are searched too, and the inserts hold locks while it runs.
+
+Run:
+    python scripts/benchmark_catalog_engine.py
+    python scripts/benchmark_catalog_engine.py --sql --sizes 50 10000
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.database import async_session_maker
+from app.models.property import Property, amenity_keys
+from app.models.builder import Builder
+from app.schemas.property import PropertyFilters
+from app.services.catalog_engine import CatalogEngine, RECORD_FIELDS, NUMERIC_FIELDS
+from app.api.properties import SORT_COLUMNS, _search_database
+
+
+LOCATIONS = [
+    "Gachibowli", "Kondapur", "Madhapur", "Hitech City", "Manikonda",
+    "Kokapet", "Neopolis", "Financial District", "Narsingi", "Tellapur",
+]
+CONFIGURATIONS = ["2BHK", "3BHK", "4BHK"]
+
+# (label, filters, sort_by, descending, page) - a deep page shows OFFSET cost
+QUERIES = [
+    ("default page 1", PropertyFilters(), "price", False, 1),
+    ("default page 500", PropertyFilters(), "price", False, 500),
+    ("location + 3BHK by smart_score", PropertyFilters(location="Gachibowli", configuration="3BHK"), "smart_score", True, 1),
+    ("price + area range, newest", PropertyFilters(min_price=50000000, max_price=120000000, min_carpet_area=1400), "created_at", True, 1),
+    ("group buying only", PropertyFilters(group_buying_only=True), "price", False, 3),
+]
+
+LIMIT = 20
+
+
+def synthetic_catalog(size: int, seed: int = 42):
+    """(builder rows, property rows) shaped like CatalogEngine.load_rows expects"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    builders = [
+        (uuid.uuid4(), f"Benchmark Builder {i}", f"{rng.uniform(3.5, 5):.1f}", f"{rng.uniform(70, 99):.1f}")
+        for i in range(20)
+    ]
+
+    properties = []
+    for i in range(size):
+        carpet_area = rng.randint(900, 3500)
+        price = carpet_area * rng.randint(4500, 9000)
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        values = {
+            "id": uuid.uuid4(),
+            "builder_id": rng.choice(builders)[0],
+            "name": f"Benchmark Residency {i}",
+            "location": rng.choice(LOCATIONS),
+            "description": "Synthetic benchmark property",
+            "latitude": Decimal(f"{rng.uniform(17.35, 17.50):.6f}"),
+            "longitude": Decimal(f"{rng.uniform(78.30, 78.45):.6f}"),
+            "configuration": rng.choice(CONFIGURATIONS),
+            "carpet_area": str(carpet_area),
+            "price": price,
+            "price_per_sqft": str(price // carpet_area),
+            "amenities": ["Swimming Pool", "Gym"],
+            "images": [],
+            "smart_score": Decimal(f"{rng.uniform(0, 100):.2f}"),
+            "location_score": Decimal("0.00"),
+            "builder_score": Decimal("0.00"),
+            "price_score": Decimal("0.00"),
+            "commute_score": Decimal("0.00"),
+            "supports_group_buying": rng.choice(["true", "false"]),
+            "group_discount_percentage": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "carpet_area_sqft": carpet_area,
+            "price_per_sqft_inr": price // carpet_area,
+        }
+        properties.append(tuple(values[name] for name in RECORD_FIELDS + NUMERIC_FIELDS))
+
+    return builders, properties
+
+
+def summarise(samples_ms):
+    samples_ms = sorted(samples_ms)
+    p99 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.99))]
+    return f"p50 {statistics.median(samples_ms):8.3f} ms   p99 {p99:8.3f} ms"
+
+
+def bench_engine(engine: CatalogEngine, repeat: int):
+    for label, filters, sort_by, descending, page in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.search(filters, sort_by, descending, page, LIMIT)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"    engine  {label:34s} {summarise(samples)}")
+
+
+async def bench_sql(builders, properties, repeat: int):
+    async with async_session_maker()() as session:
+        try:
+            await session.execute(insert(Builder), [
+                {"id": b[0], "name": b[1], "rating": b[2], "on_time_delivery_percentage": b[3]}
+                for b in builders
+            ])
+
+            columns = RECORD_FIELDS + NUMERIC_FIELDS
+            batch = 5000
+            for start in range(0, len(properties), batch):
+                rows = [dict(zip(columns, row)) for row in properties[start:start + batch]]
+                for row in rows:
+                    # Core inserts skip the model's validators
+                    row["amenities_lower"] = amenity_keys(row["amenities"])
+                await session.execute(insert(Property), rows)
+            await session.execute(text("ANALYZE properties"))
+
+            for label, filters, sort_by, descending, page in QUERIES:
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await _search_database(
+                        session, filters, SORT_COLUMNS[sort_by][0], descending, page, LIMIT, None, True
+                    )
+                    samples.append((time.perf_counter() - start) * 1000)
+                    session.expunge_all()
+                print(f"    sql     {label:34s} {summarise(samples)}")
+        finally:
+            await session.rollback()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--sql", action="store_true", help="Also time the Postgres path (needs DATABASE_URL)")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("CATALOG ENGINE BENCHMARK")
+    print("=" * 70)
+
+    for size in args.sizes:
+        builders, properties = synthetic_catalog(size)
+
+        engine = CatalogEngine()
+        start = time.perf_counter()
+        engine.load_rows(properties, builders)
+        print(f"\n{size:,} properties (engine load {time.perf_counter() - start:.2f} s)")
+
+        bench_engine(engine, args.repeat)
+
+        if args.sql:
+            await bench_sql(builders, properties, max(5, args.repeat // 5))
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
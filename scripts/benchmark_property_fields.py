@@ -0,0 +1,156 @@
+"""
+Benchmark sparse fieldsets (fields=) on the property list at limit=100
+
+Compares the full PropertyListResponse with fields=card and a minimal
+fields=id,name,price page:
+- Payload: JSON bytes and model build + serialisation time per page
+- Database (with --sql): _search_database time selecting every response
+  column against the card and minimal projections
+
+Synthetic properties carry seed-like descriptions, amenities and images so
+the dropped columns weigh what they do in production. The SQL run inserts
+them inside a transaction that is rolled back (see benchmark_catalog_engine).
+
+Run:
+    python scripts/benchmark_property_fields.py
+    python scripts/benchmark_property_fields.py --sql --size 10000
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+
+from app.database import async_session_maker
+from app.models.property import Property
+from app.models.builder import Builder
+from app.schemas.property import PropertyFilters, PropertyListResponse, property_fields_models
+from app.services.catalog_engine import CatalogEngine, RECORD_FIELDS, NUMERIC_FIELDS
+from app.api.properties import SORT_COLUMNS, _search_database, _parse_fields
+
+from benchmark_catalog_engine import synthetic_catalog, summarise
+
+
+LIMIT = 100
+
+FIELDSETS = [
+    ("full", None),
+    ("fields=card", "card"),
+    ("fields=id,name,price", "id,name,price"),
+]
+
+DESCRIPTION = (
+    "Premium residential project with world-class amenities, landscaped podium gardens, "
+    "a 40,000 sqft clubhouse and direct access to the ORR. Vastu-compliant 3-side open homes "
+    "with large balconies, high ceilings and premium vitrified flooring throughout. "
+)
+AMENITIES = [
+    "Swimming Pool", "Gym", "Clubhouse", "Children's Play Area", "24/7 Security",
+    "Power Backup", "Landscaped Gardens", "Jogging Track", "Indoor Games", "Multi-purpose Hall",
+]
+IMAGES = [f"https://images.hyrebuy.com/properties/sample-{i}/800x600.jpg" for i in range(5)]
+
+
+def realistic(properties):
+    """Give synthetic rows seed-sized description/amenities/images"""
+    index = {name: i for i, name in enumerate(RECORD_FIELDS)}
+    out = []
+    for row in properties:
+        row = list(row)
+        row[index["description"]] = DESCRIPTION
+        row[index["amenities"]] = AMENITIES
+        row[index["images"]] = IMAGES
+        out.append(tuple(row))
+    return out
+
+
+def bench_payload(engine: CatalogEngine, repeat: int):
+    page, _, _ = engine.search(PropertyFilters(), "price", False, 1, LIMIT)
+    full_bytes = None
+
+    for label, fields in FIELDSETS:
+        if fields:
+            field_names = _parse_fields(fields)
+            model = property_fields_models(field_names)[1]
+            properties = [{name: record[name] for name in field_names} for record in page]
+        else:
+            model = PropertyListResponse
+            properties = page
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = model(properties=properties, total=len(page), page=1, limit=LIMIT).model_dump_json()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        size = len(body.encode())
+        full_bytes = full_bytes or size
+        print(f"    payload {label:24s} {size:9,d} bytes ({size / full_bytes:6.1%})   {summarise(samples)}")
+
+
+async def bench_sql(builders, properties, repeat: int):
+    async with async_session_maker()() as session:
+        try:
+            await session.execute(insert(Builder), [
+                {"id": b[0], "name": b[1], "rating": b[2], "on_time_delivery_percentage": b[3]}
+                for b in builders
+            ])
+
+            columns = RECORD_FIELDS + NUMERIC_FIELDS
+            batch = 5000
+            for start in range(0, len(properties), batch):
+                await session.execute(
+                    insert(Property),
+                    [dict(zip(columns, row)) for row in properties[start:start + batch]],
+                )
+            await session.execute(text("ANALYZE properties"))
+
+            for label, fields in FIELDSETS:
+                field_names = _parse_fields(fields) if fields else None
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await _search_database(
+                        session, PropertyFilters(), SORT_COLUMNS["price"][0], False, 1, LIMIT, None, True, field_names
+                    )
+                    samples.append((time.perf_counter() - start) * 1000)
+                    session.expunge_all()
+                print(f"    sql     {label:24s} {summarise(samples)}")
+        finally:
+            await session.rollback()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--sql", action="store_true", help="Also time the Postgres path (needs DATABASE_URL)")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print(f"PROPERTY FIELDS BENCHMARK (limit={LIMIT})")
+    print("=" * 70)
+
+    builders, properties = synthetic_catalog(args.size)
+    properties = realistic(properties)
+
+    engine = CatalogEngine()
+    engine.load_rows(properties, builders)
+    print(f"\n{args.size:,} properties")
+
+    bench_payload(engine, args.repeat)
+
+    if args.sql:
+        await bench_sql(builders, properties, max(5, args.repeat // 10))
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Microbenchmark property list serialisation at limit=20 and limit=100
+
+Times one search page from fetched rows to response bytes:
+- orm: ORM entities -> PropertyListResponse (from_attributes) -> FastAPI's
+  response_model serialisation -> JSONResponse (the previous search path)
+- dicts: response dicts from Core rows -> prebuilt TypeAdapter ->
+  pydantic-core JSON (the current search path)
+- dicts+orjson: the same dicts dumped to JSON-mode Python, then orjson
+
+and checks that every path produces identical bytes.
+
+Run:
+    python scripts/benchmark_serialisation.py
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.property import Property
+from app.models.builder import Builder
+from app.schemas.property import PropertyFilters, PropertyListResponse
+from app.services.catalog_engine import CatalogEngine
+from app.api.properties import _encode_list_response, _list_adapter
+
+from benchmark_catalog_engine import synthetic_catalog, summarise
+from benchmark_property_fields import realistic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+LIMITS = [20, 100]
+
+
+def orm_page(records):
+    """Transient ORM entities equivalent to the response dicts"""
+    page = []
+    for record in records:
+        values = {name: value for name, value in record.items() if name != "builder"}
+        property_obj = Property(**values)
+        if record["builder"] is not None:
+            property_obj.builder = Builder(**record["builder"])
+        page.append(property_obj)
+    return page
+
+
+async def orm_path(page, limit):
+    response_field = create_response_field(name="response", type_=PropertyListResponse)
+    model = PropertyListResponse(properties=page, total=len(page), page=1, limit=limit, total_pages=1)
+    content = await serialize_response(field=response_field, response_content=model)
+    return JSONResponse(content).body
+
+
+def dicts_path(records, limit):
+    content = {"properties": records, "total": len(records), "page": 1, "limit": limit, "total_pages": 1, "next_cursor": None}
+    return _encode_list_response(PropertyListResponse, content)
+
+
+def orjson_path(records, limit):
+    adapter = _list_adapter(PropertyListResponse)
+    content = {"properties": records, "total": len(records), "page": 1, "limit": limit, "total_pages": 1, "next_cursor": None}
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(content), mode="json"))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("PROPERTY SERIALISATION BENCHMARK")
+    print("=" * 70)
+
+    builders, properties = synthetic_catalog(1000)
+    engine = CatalogEngine()
+    engine.load_rows(realistic(properties), builders)
+
+    for limit in LIMITS:
+        records, _, _ = engine.search(PropertyFilters(), "price", False, 1, limit)
+        page = orm_page(records)
+
+        paths = [
+            ("orm", lambda: orm_path(page, limit)),
+            ("dicts", lambda: dicts_path(records, limit)),
+        ]
+        if orjson is not None:
+            paths.append(("dicts+orjson", lambda: orjson_path(records, limit)))
+
+        print(f"\nlimit={limit}")
+        reference = None
+        for label, run in paths:
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = run()
+                if asyncio.iscoroutine(body):
+                    body = await body
+                samples.append((time.perf_counter() - start) * 1000)
+
+            reference = reference or body
+            identical = "identical" if body == reference else "DIFFERENT"
+            print(f"    {label:14s} {len(body):8,d} bytes {identical:9s}   {summarise(samples)}")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
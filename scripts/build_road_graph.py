@@ -0,0 +1,68 @@
+"""
+Compile an OpenStreetMap extract into a road graph for local routing
+Parses the road network out of an OSM XML extract (.osm, .osm.gz, .osm.bz2)
+once and saves it as .npz, the only format the "local" maps backend loads
+(at API startup, without an XML parse).
+
+Run:
+    python scripts/build_road_graph.py hyderabad.osm.gz hyderabad_roads.npz
+    python scripts/build_road_graph.py hyderabad.osm.gz hyderabad_roads.npz --check 17.4401,78.3489 17.4126,78.3398
+
+Then serve commutes from it:
+    MAPS_BACKEND=local ROAD_GRAPH_PATH=hyderabad_roads.npz
+
+PBF extracts: convert first with `osmium cat hyderabad.osm.pbf -o hyderabad.osm.gz`.
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.routing import RoadGraph, RoadRouter
+
+
+def parse_point(value: str):
+    lat, lng = (float(part) for part in value.split(","))
+    return lat, lng
+
+
+def build_road_graph(source: str, output: str, check=None):
+    print("=" * 70)
+    print(f"🗺️  Building road graph from {source}")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    graph = RoadGraph.from_osm(source)
+    print(f"  ✅ {graph.node_count:,} nodes, {graph.segment_count:,} segments "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    graph.save(output)
+    print(f"  💾 Saved {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+    if check:
+        origin, destination = check
+        router = RoadRouter(RoadGraph.load(output))
+        for mode in ("driving", "walking"):
+            start = time.perf_counter()
+            route = router.route(*origin, *destination, mode=mode)
+            elapsed = (time.perf_counter() - start) * 1000
+            if route is None:
+                print(f"  ⚠️  {mode}: no route")
+            else:
+                seconds, meters = route
+                print(f"  🚗 {mode}: {meters / 1000:.1f} km, {seconds / 60:.1f} min ({elapsed:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="OSM XML extract (.osm, .osm.gz, .osm.bz2)")
+    parser.add_argument("output", help="Graph file to write (.npz)")
+    parser.add_argument("--check", nargs=2, type=parse_point, metavar="LAT,LNG",
+                        help="Route between two points after building")
+    args = parser.parse_args()
+
+    build_road_graph(args.source, args.output, args.check)
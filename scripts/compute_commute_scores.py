@@ -0,0 +1,57 @@
+"""
+Precompute commute_scores
+Calculates the driving commute from every GCC office to every property and
+upserts it into commute_scores, a chunk of properties at a time. Commutes
+come from the configured maps backend (MAPS_BACKEND: mock, local or google).
+
+Run:
+    python scripts/compute_commute_scores.py                 # every pair
+    python scripts/compute_commute_scores.py --incremental   # only pairs without a score
+
+Run the incremental mode after adding properties or offices (and on a
+schedule); follow it with compute_smart_scores.py --incremental so
+commute_score picks the new times up.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_session_maker
+from app.services.commute_scores import refresh_commute_scores, DEFAULT_CHUNK_SIZE
+from app.services.maps import get_maps_service, close_maps_service
+
+
+async def compute_commute_scores(incremental: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Fill commute_scores for all (or only missing) office/property pairs"""
+    maps_service = get_maps_service()
+    print(f"🚗 Computing commute scores ({'incremental' if incremental else 'full'}, {maps_service.backend} backend)...")
+    start = time.perf_counter()
+
+    async with async_session_maker()() as session:
+        try:
+            result = await refresh_commute_scores(session, incremental=incremental, chunk_size=chunk_size, maps_service=maps_service)
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Commute scores failed: {e}")
+            raise
+        finally:
+            await close_maps_service()
+
+    print(f"  ✅ {result.pairs} pairs, wrote {result.written}, {result.failed} without a route")
+    print(f"  ⏱️  {time.perf_counter() - start:.2f} s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incremental", action="store_true", help="Only pairs without a score (new properties or offices)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Properties per maps call and upsert")
+    args = parser.parse_args()
+
+    asyncio.run(compute_commute_scores(incremental=args.incremental, chunk_size=args.chunk_size))
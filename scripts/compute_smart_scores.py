@@ -0,0 +1,56 @@
+"""
+Recompute property smart scores
+Scores every property from builders, GCC offices and commute_scores in one
+NumPy pass and writes the results back with a single bulk UPDATE.
+
+Run:
+    python scripts/compute_smart_scores.py                 # full catalog
+    python scripts/compute_smart_scores.py --incremental   # only touched since last run
+
+Schedule the incremental run often (e.g. every 10 minutes) and a full run
+nightly: price and location scores are relative to the rest of the catalog.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_session_maker
+from app.services.scoring import score_properties
+from app.services.cache import get_response_cache, close_redis, CATALOG_ROUTES, invalidation_skipped_message
+
+
+async def compute_smart_scores(incremental: bool = False):
+    """Score the catalog and invalidate cached catalog responses if anything changed"""
+    print(f"🧮 Computing smart scores ({'incremental' if incremental else 'full'})...")
+    start = time.perf_counter()
+
+    async with async_session_maker()() as session:
+        try:
+            result = await score_properties(session, incremental=incremental)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Scoring failed: {e}")
+            raise
+
+    if result.changed and not await get_response_cache().invalidate(*CATALOG_ROUTES):
+        print(invalidation_skipped_message(*CATALOG_ROUTES))
+    await close_redis()
+
+    print(f"  ✅ Scored {result.scored} properties, wrote {result.written}, {result.changed} changed")
+    print(f"  ⏱️  {time.perf_counter() - start:.2f} s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incremental", action="store_true", help="Only write properties touched since they were last scored")
+    args = parser.parse_args()
+
+    asyncio.run(compute_smart_scores(incremental=args.incremental))
@@ -0,0 +1,56 @@
+"""
+Refresh location price statistics
+Recomputes location_price_stats (count, min, median, p90 and median price
+per sqft per location and configuration) from the properties table.
+
+Run:
+    python scripts/refresh_price_stats.py                              # every location
+    python scripts/refresh_price_stats.py --location Gachibowli Kokapet
+
+Admin writes already refresh the locations they touch; schedule a full run
+(e.g. nightly) to pick up anything written outside the admin API.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_session_maker
+from app.services.price_stats import refresh_location_price_stats
+from app.services.cache import get_response_cache, close_redis, invalidation_skipped_message
+
+
+async def refresh_price_stats(locations=None):
+    """Rebuild the stats rows and drop cached price-stats responses"""
+    print(f"📊 Refreshing price stats ({', '.join(locations) if locations else 'all locations'})...")
+    start = time.perf_counter()
+
+    async with async_session_maker()() as session:
+        try:
+            written = await refresh_location_price_stats(session, locations)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            print(f"❌ Refresh failed: {e}")
+            raise
+
+    if not await get_response_cache().invalidate("price_stats"):
+        print(invalidation_skipped_message("price_stats"))
+    await close_redis()
+
+    print(f"  ✅ Wrote {written} stats rows")
+    print(f"  ⏱️  {time.perf_counter() - start:.2f} s")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", nargs="+", help="Only refresh these locations")
+    args = parser.parse_args()
+
+    asyncio.run(refresh_price_stats(args.location))